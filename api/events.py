@@ -0,0 +1,95 @@
+import json
+import queue
+import threading
+import time
+import redis
+from datetime import datetime
+from app import app
+
+
+def publish_ticket_event(ticket, step=None):
+    event = {
+        "ticket_id": ticket.id,
+        "booking_id": ticket.booking_id,
+        "user_id": ticket.user_id,
+        "status": ticket.status,
+        "step": step,
+        "at": datetime.utcnow().isoformat(),
+    }
+    try:
+        app.config["EVENTS_REDIS"].publish(app.config["TICKET_EVENTS_CHANNEL"], json.dumps(event))
+    except redis.RedisError as error:
+        app.logger.info(f"could not publish ticket event for ticket {ticket.id}: {error}")
+    return event
+
+
+def format_sse(event):
+    return f"event: ticket\ndata: {json.dumps(event, separators=(',', ':'))}\n\n"
+
+
+class TicketEventHub(object):
+
+    def __init__(self, redis_client, channel):
+        self.redis = redis_client
+        self.channel = channel
+        self.listeners = {}
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def subscribe(self, user_id):
+        listener = queue.Queue(maxsize=app.config["TICKET_EVENTS_BUFFER"])
+        with self.lock:
+            self.listeners.setdefault(user_id, set()).add(listener)
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self.run, name="ticket-event-hub", daemon=True)
+                self.thread.start()
+        return listener
+
+    def unsubscribe(self, user_id, listener):
+        with self.lock:
+            listeners = self.listeners.get(user_id, set())
+            listeners.discard(listener)
+            if not listeners:
+                self.listeners.pop(user_id, None)
+
+    def run(self):
+        delay = 0.5
+        while True:
+            started = time.monotonic()
+            try:
+                self.listen()
+                app.logger.info(f"{self.channel} subscription ended, resubscribing")
+            except redis.RedisError as error:
+                app.logger.info(f"lost {self.channel} subscription, reconnecting in {delay}s: {error}")
+            if time.monotonic() - started > app.config["TICKET_EVENTS_RECONNECT_MAX_SECONDS"]:
+                delay = 0.5
+            time.sleep(delay)
+            delay = min(delay * 2, app.config["TICKET_EVENTS_RECONNECT_MAX_SECONDS"])
+
+    def listen(self):
+        pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(self.channel)
+        app.logger.info(f"subscribed to {self.channel}")
+        for message in pubsub.listen():
+            self.deliver(json.loads(message["data"]))
+
+    def deliver(self, event):
+        with self.lock:
+            listeners = list(self.listeners.get(event.get("user_id"), ()))
+        for listener in listeners:
+            try:
+                listener.put_nowait(event)
+            except queue.Full:
+                app.logger.info(f"dropping ticket event for slow listener of user {event.get('user_id')}")
+
+    def stream(self, user_id):
+        listener = self.subscribe(user_id)
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                try:
+                    yield format_sse(listener.get(timeout=app.config["TICKET_EVENTS_HEARTBEAT_SECONDS"]))
+                except queue.Empty:
+                    yield ": keepalive\n\n"
+        finally:
+            self.unsubscribe(user_id, listener)
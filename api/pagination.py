@@ -0,0 +1,77 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from flask import request, abort, url_for
+from sqlalchemy import or_, and_
+from app import app
+
+
+def get_page_limit():
+    limit = request.args.get("limit", app.config["LISTING_PAGE_SIZE"], type=int)
+    return max(1, min(limit, app.config["LISTING_MAX_PAGE_SIZE"]))
+
+
+def get_datetime_arg(name):
+    value = request.args.get(name)
+    if value is None:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        abort(400, f"{name} must be an ISO 8601 datetime")
+
+
+def filter_datetime_range(query, column):
+    start = get_datetime_arg("from")
+    end = get_datetime_arg("to")
+    if start is not None:
+        query = query.filter(column >= start)
+    if end is not None:
+        query = query.filter(column < end)
+    return query
+
+
+def encode_cursor(values):
+    raw = json.dumps([value.isoformat() if isinstance(value, datetime) else value for value in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor, sort_column):
+    try:
+        sort_value, id_value = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if sort_column.type.python_type is datetime:
+            sort_value = datetime.fromisoformat(sort_value)
+        return sort_value, int(id_value)
+    except (ValueError, TypeError, binascii.Error):
+        abort(400, "invalid cursor")
+
+
+def paginate(query, sort_column, id_column):
+    limit = get_page_limit()
+    cursor = request.args.get("cursor")
+    if cursor:
+        sort_value, id_value = decode_cursor(cursor, sort_column)
+        query = query.filter(or_(sort_column < sort_value, and_(sort_column == sort_value, id_column < id_value)))
+    rows = query.order_by(sort_column.desc(), id_column.desc()).limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    next_cursor = encode_cursor([getattr(last, sort_column.key), getattr(last, id_column.key)])
+    return rows, next_cursor
+
+
+def get_next_url(next_cursor):
+    if next_cursor is None:
+        return None
+    args = request.args.to_dict()
+    args["cursor"] = next_cursor
+    return url_for(request.endpoint, **args)
+
+
+def add_next_link(response, next_cursor):
+    next_url = get_next_url(next_cursor)
+    if next_url is not None:
+        response.headers["Link"] = f'<{next_url}>; rel="next"'
+    return response
@@ -0,0 +1,105 @@
+import hashlib
+import json
+import pytz
+from datetime import date, datetime, time
+from flask import request
+from sqlalchemy import func
+from app import app
+from model.models import Booking, Ticket, Venue
+
+
+class Field(object):
+
+    def __init__(self, name, column, transform=None):
+        self.name = name
+        self.column = column
+        self.transform = transform
+
+
+class Schema(object):
+
+    def __init__(self, *fields):
+        self.fields = fields
+
+    @property
+    def columns(self):
+        return [field.column.label(field.name) for field in self.fields]
+
+    def dump(self, row):
+        obj = {}
+        for field in self.fields:
+            value = getattr(row, field.name)
+            if field.transform is not None and value is not None:
+                value = field.transform(value)
+            obj[field.name] = value
+        return obj
+
+    def dump_many(self, rows):
+        return [self.dump(row) for row in rows]
+
+
+def to_cet(value):
+    return value.astimezone(pytz.timezone('CET'))
+
+
+booking_schema = Schema(
+    Field('id', Booking.id),
+    Field('venue_id', Booking.venue_id),
+    Field('datetime_event', Booking.datetime_event, to_cet),
+    Field('earliest_ticket_datetime', Booking.earliest_ticket_datetime, to_cet),
+    Field('user_id', Booking.user_id),
+    Field('created_at', Booking.created_at),
+    Field('confirmation_code', Booking.confirmation_code),
+    Field('ticket_id', Ticket.id),
+    Field('ticket_status', Ticket.status),
+)
+
+ticket_schema = Schema(
+    Field('id', Ticket.id),
+    Field('booking_id', Ticket.booking_id),
+    Field('created_at', Ticket.created_at),
+    Field('user_id', Ticket.user_id),
+    Field('status', Ticket.status),
+)
+
+venue_schema = Schema(
+    Field('id', Venue.id),
+    Field('venue_name', Venue.venue_name),
+    Field('venue_url', Venue.venue_url),
+    Field('venue_type', Venue.venue_type),
+    Field('created_at', Venue.created_at),
+)
+
+
+def encode_value(value):
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    raise TypeError(f"cannot serialize {type(value).__name__}")
+
+
+def json_response(data, etag=None):
+    response = app.response_class(
+        response=json.dumps(data, default=encode_value, separators=(",", ":")),
+        status=200,
+        mimetype='application/json'
+    )
+    if etag is not None:
+        response.set_etag(etag)
+    return response
+
+
+def get_watermark(query, *updated_columns):
+    aggregates = [func.max(column) for column in updated_columns]
+    return query.with_entities(func.count(), *aggregates).order_by(None).one()
+
+
+def compute_etag(*parts):
+    return hashlib.sha1("|".join(str(part) for part in parts).encode()).hexdigest()
+
+
+def not_modified_response(etag):
+    if not request.if_none_match.contains(etag):
+        return None
+    response = app.response_class(status=304)
+    response.set_etag(etag)
+    return response
@@ -0,0 +1,157 @@
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from app import app
+from model.models import db, User, Venue, Booking, Ticket
+from model.context import load_booking_context
+from benchmarks.pretix_server import StandinVenue, StandinServer, create_pretix_app
+from benchmarks.bouldering_server import StandinCalendar, create_bouldering_app
+from browser.pool import DriverPool
+import views
+
+
+def get_process_tree_rss(pid):
+    total = 0
+    pending = [pid]
+    while pending:
+        current = pending.pop()
+        try:
+            with open(f"/proc/{current}/status") as status:
+                for line in status:
+                    if line.startswith("VmRSS:"):
+                        total += int(line.split()[1]) * 1024
+            with open(f"/proc/{current}/task/{current}/children") as children:
+                pending.extend(int(child) for child in children.read().split())
+        except (FileNotFoundError, ProcessLookupError):
+            continue
+    return total
+
+
+class MemorySampler(object):
+
+    def __init__(self, interval=0.25):
+        self.interval = interval
+        self.peak = 0
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def run(self):
+        while not self.stopped.is_set():
+            self.peak = max(self.peak, get_process_tree_rss(os.getpid()))
+            self.stopped.wait(self.interval)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stopped.set()
+        self.thread.join()
+
+
+def create_standin(venue_type, datetime_event, capacity, latency, users):
+    if venue_type == "bouldering":
+        venue_time = views.to_venue_time(datetime_event)
+        slot = f"{venue_time.date()}T{venue_time.strftime('%H:%M')}"
+        calendar = StandinCalendar({slot: capacity}, datetime.utcnow(), latency=latency)
+        return calendar, create_bouldering_app(calendar), "/courses/"
+    slot = views.generate_slot_time(datetime_event)
+    venue = StandinVenue({slot: capacity}, users, voucher=app.config["PRETIX_VOUCHER_CODE"], latency=latency)
+    return venue, create_pretix_app(venue), "/Baeder/74/"
+
+
+def seed(venue_type, venue_url, datetime_event, tickets):
+    db.drop_all()
+    db.create_all()
+    venue = Venue("standin", venue_url, venue_type)
+    users = [
+        User(email=f"user{index}@example.com", first_name="Bench", last_name=f"User{index}",
+             venue_email=f"user{index}@example.com", venue_password="password",
+             urban_sports_membership_no=f"{index:08d}")
+        for index in range(tickets)
+    ]
+    db.session.add(venue)
+    db.session.add_all(users)
+    db.session.flush()
+    bookings = [Booking(venue.id, datetime_event, user.id) for user in users]
+    for booking in bookings:
+        booking.earliest_ticket_datetime = datetime.utcnow() - timedelta(minutes=1)
+    db.session.add_all(bookings)
+    db.session.commit()
+    return [(booking.id, booking.user_id) for booking in bookings]
+
+
+def run_ticket(booking_id, user_id):
+    with app.app_context():
+        user = db.session.query(User).filter_by(id=user_id).first()
+        started = time.monotonic()
+        views.start_ticket(load_booking_context(booking_id), user)
+        elapsed = time.monotonic() - started
+        status = db.session.query(Ticket.status).filter_by(booking_id=booking_id).scalar()
+        db.session.remove()
+        return status, elapsed
+
+
+def report(results, elapsed, peak_rss):
+    durations = sorted(duration for status, duration in results if status == "CONFIRMED")
+    statuses = {}
+    for status, duration in results:
+        statuses[status] = statuses.get(status, 0) + 1
+    print(f"tickets: {len(results)} {statuses}")
+    print(f"elapsed: {elapsed:.2f}s, throughput: {len(results) / elapsed:.2f} tickets/s")
+    if len(durations) > 1:
+        quantiles = statistics.quantiles(durations, n=100)
+        print(f"time to confirm p50: {quantiles[49] * 1000:.0f}ms p95: {quantiles[94] * 1000:.0f}ms p99: {quantiles[98] * 1000:.0f}ms")
+    elif durations:
+        print(f"time to confirm: {durations[0] * 1000:.0f}ms")
+    print(f"peak rss including browsers: {peak_rss / 1024 / 1024:.0f}MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="run concurrent tickets through start_ticket against local venue stand-ins")
+    parser.add_argument("--venue-type", choices=["swimming", "bouldering"], default="swimming")
+    parser.add_argument("--tickets", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--capacity", type=int, default=10, help="free places in the contended slot")
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds added to every stand-in response")
+    parser.add_argument("--browser", action="store_true", help="skip the pretix http path and book with chrome")
+    parser.add_argument("--no-lean", action="store_true", help="run chrome with the full profile to compare against lean mode")
+    parser.add_argument("--database-url", default="sqlite:///bench_booking.db")
+    args = parser.parse_args()
+
+    app.config["SQLALCHEMY_DATABASE_URI"] = args.database_url
+    app.config["PRETIX_HTTP_ENABLED"] = not args.browser
+    app.config["CHROME_LEAN_MODE"] = not args.no_lean
+    app.config["PDF_DOWNLOAD_DIR"] = os.path.join(os.getcwd(), "bench_downloads")
+    datetime_event = (datetime.utcnow() + timedelta(days=2)).replace(hour=18, minute=0, second=0, microsecond=0)
+    users = {f"user{index}@example.com": "password" for index in range(args.tickets)}
+    standin, standin_app, path = create_standin(args.venue_type, datetime_event, args.capacity, args.latency, users)
+
+    with StandinServer(standin_app) as server:
+        entries = seed(args.venue_type, f"{server.url}{path}", datetime_event, args.tickets)
+        views.driver_pool = DriverPool(views.initialize_chrome_driver, args.concurrency)
+        if args.browser or args.venue_type == "bouldering":
+            views.driver_pool.warm()
+        with MemorySampler() as sampler:
+            started = time.monotonic()
+            with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+                results = list(executor.map(lambda entry: run_ticket(*entry), entries))
+            elapsed = time.monotonic() - started
+        views.driver_pool.close()
+
+    report(results, elapsed, sampler.peak)
+    confirmed = sum(1 for status, duration in results if status == "CONFIRMED")
+    if confirmed != min(args.tickets, args.capacity):
+        print(f"expected {min(args.tickets, args.capacity)} confirmed tickets, got {confirmed}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    with app.app_context():
+        sys.exit(main())
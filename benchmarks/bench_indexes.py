@@ -0,0 +1,91 @@
+import argparse
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine
+from app import app
+from model.models import db, User, Venue, Booking, Ticket, ScheduledTicket
+from benchmarks.query_plans import get_key_queries, explain, find_plan_regressions
+
+
+CHUNK_SIZE = 10000
+
+
+def seed(engine, bookings, users, venues, current_datetime):
+    db.metadata.drop_all(engine)
+    db.metadata.create_all(engine)
+    rng = random.Random(42)
+    with engine.begin() as connection:
+        connection.execute(User.__table__.insert(), [{"id": user_id, "email": f"user{user_id}@example.com"} for user_id in range(1, users + 1)])
+        connection.execute(Venue.__table__.insert(), [{"id": venue_id, "venue_type": "swimming"} for venue_id in range(1, venues + 1)])
+        for start in range(1, bookings + 1, CHUNK_SIZE):
+            booking_rows, ticket_rows, scheduled_rows = [], [], []
+            for booking_id in range(start, min(start + CHUNK_SIZE, bookings + 1)):
+                user_id = rng.randint(1, users)
+                datetime_event = current_datetime + timedelta(minutes=rng.randint(-60 * 24 * 365, 60 * 24 * 30))
+                release_at = datetime_event - timedelta(hours=96)
+                booking_rows.append({
+                    "id": booking_id, "venue_id": rng.randint(1, venues), "user_id": user_id,
+                    "datetime_event": datetime_event, "earliest_ticket_datetime": release_at,
+                    "created_at": release_at - timedelta(days=1), "updated_at": release_at,
+                })
+                if release_at <= current_datetime:
+                    ticket_rows.append({
+                        "booking_id": booking_id, "user_id": user_id, "created_at": release_at,
+                        "updated_at": release_at, "status": rng.choice(["CONFIRMED", "ABORTED"]),
+                    })
+                else:
+                    scheduled_rows.append({"booking_id": booking_id, "user_id": user_id, "release_at": release_at, "status": "PENDING"})
+            connection.execute(Booking.__table__.insert(), booking_rows)
+            if ticket_rows:
+                connection.execute(Ticket.__table__.insert(), ticket_rows)
+            if scheduled_rows:
+                connection.execute(ScheduledTicket.__table__.insert(), scheduled_rows)
+        connection.exec_driver_sql("ANALYZE")
+
+
+def check_plans(engine, current_datetime, repeat):
+    regressions = {}
+    with engine.connect() as connection:
+        for name, query in get_key_queries(current_datetime).items():
+            plan = explain(connection, query)
+            started = time.perf_counter()
+            for _ in range(repeat):
+                connection.execute(query.statement).fetchall()
+            elapsed_ms = (time.perf_counter() - started) * 1000 / repeat
+            print(f"{name}: {elapsed_ms:.2f}ms")
+            for line in plan:
+                print(f"    {line}")
+            offending = find_plan_regressions(connection.dialect.name, plan)
+            if offending:
+                regressions[name] = offending
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="seed bookings and assert the key queries stay index scans")
+    parser.add_argument("--database-url", default="sqlite:///bench_indexes.db")
+    parser.add_argument("--bookings", type=int, default=1000000)
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--venues", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--skip-seed", action="store_true")
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url)
+    current_datetime = datetime(2022, 4, 1, 20, 0)
+    if not args.skip_seed:
+        started = time.perf_counter()
+        seed(engine, args.bookings, args.users, args.venues, current_datetime)
+        print(f"seeded {args.bookings} bookings in {time.perf_counter() - started:.1f}s")
+
+    regressions = check_plans(engine, current_datetime, args.repeat)
+    for name, offending in regressions.items():
+        print(f"REGRESSION {name}: {offending}")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    with app.app_context():
+        sys.exit(main())
@@ -0,0 +1,53 @@
+import argparse
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from app import app
+from pretix.client import PretixClient, PretixError
+from benchmarks.pretix_server import StandinVenue, StandinServer, create_pretix_app
+
+
+SLOT = "2022-03-07T19:15:00+00:00"
+
+
+def book(venue_url, index):
+    started = time.monotonic()
+    client = PretixClient(venue_url)
+    try:
+        client.choose_slot(SLOT)
+        client.apply_voucher("urbansportsclub")
+        client.login(f"user{index}@example.com", "password")
+        client.checkout()
+        confirmed = True
+    except PretixError:
+        confirmed = False
+    return confirmed, time.monotonic() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="benchmark the pretix http booking path against a local stand-in")
+    parser.add_argument("--tickets", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--capacity", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.0)
+    args = parser.parse_args()
+
+    users = {f"user{index}@example.com": "password" for index in range(args.tickets)}
+    venue = StandinVenue({SLOT: args.capacity}, users, latency=args.latency)
+    with StandinServer(create_pretix_app(venue)) as server:
+        venue_url = f"{server.url}/Baeder/74/"
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+            results = list(executor.map(lambda index: book(venue_url, index), range(args.tickets)))
+        elapsed = time.monotonic() - started
+
+    durations = sorted(duration for confirmed, duration in results if confirmed)
+    print(f"confirmed: {len(durations)}/{args.tickets} in {elapsed:.2f}s ({args.tickets / elapsed:.1f} tickets/s)")
+    if len(durations) > 1:
+        quantiles = statistics.quantiles(durations, n=100)
+        print(f"time to confirm p50: {quantiles[49] * 1000:.1f}ms p95: {quantiles[94] * 1000:.1f}ms p99: {quantiles[98] * 1000:.1f}ms")
+
+
+if __name__ == '__main__':
+    with app.app_context():
+        main()
@@ -0,0 +1,138 @@
+import calendar
+import json
+import threading
+import time
+from datetime import datetime, timedelta
+from flask import Flask, request, render_template_string, abort
+from benchmarks.pretix_server import PAGE
+
+
+CALENDAR = """<button type="button" class="drp-course-month-selector-next">&gt;</button>
+<div id="drp-calendar"></div>
+<div id="drp-courses"></div>
+<script>
+const months = MONTHS;
+const slotTimes = SLOT_TIMES;
+let monthIndex = 0;
+
+function renderMonth() {
+    const month = months[monthIndex];
+    const calendar = document.getElementById("drp-calendar");
+    calendar.innerHTML = "";
+    document.getElementById("drp-courses").innerHTML = "";
+    for (let day = 1; day <= month.days; day++) {
+        const cell = document.createElement("div");
+        cell.className = "drp-calendar-day";
+        cell.textContent = day;
+        cell.addEventListener("click", function () { renderCourses(month.value, day); });
+        calendar.appendChild(cell);
+    }
+}
+
+function renderCourses(month, day) {
+    const courses = document.getElementById("drp-courses");
+    courses.innerHTML = "";
+    const date = month + "-" + String(day).padStart(2, "0");
+    for (const slotTime of slotTimes) {
+        const button = document.createElement("button");
+        button.type = "button";
+        button.className = "drp-course-booking-button";
+        button.textContent = slotTime;
+        button.addEventListener("click", function () { window.location = "book?slot=" + date + "T" + slotTime; });
+        courses.appendChild(button);
+    }
+}
+
+document.querySelector(".drp-course-month-selector-next").addEventListener("click", function () {
+    monthIndex = Math.min(monthIndex + 1, months.length - 1);
+    renderMonth();
+});
+renderMonth();
+</script>"""
+
+BOOKING_FORM = """<form method="post" action="details">
+<input type="hidden" name="slot" value="{{ slot }}">
+<input type="text" name="first-name">
+<input type="text" name="last-name">
+<input type="email" name="email">
+<select name="participant-additional-field-type"><option value="0">-</option><option value="155589630">Urban Sports Club</option></select>
+<input type="text" name="participant-additional-field-value">
+<button type="submit">Continue</button>
+</form>"""
+
+PRIVACY_FORM = """<form method="post" action="confirm">
+{% for name, value in fields.items() %}<input type="hidden" name="{{ name }}" value="{{ value }}">{% endfor %}
+<input type="checkbox" id="drp-booking-data-processing-cb" name="data-processing">
+<button type="submit">Book now</button>
+</form>"""
+
+
+class StandinCalendar(object):
+
+    def __init__(self, slots, start_month, default_capacity=0, latency=0.0):
+        self.slots = dict(slots)
+        self.start_month = start_month
+        self.default_capacity = default_capacity
+        self.latency = latency
+        self.bookings = []
+        self.lock = threading.Lock()
+
+    def reserve(self, slot, participant):
+        with self.lock:
+            remaining = self.slots.get(slot, self.default_capacity)
+            if remaining <= 0:
+                return False
+            self.slots[slot] = remaining - 1
+            self.bookings.append({"slot": slot, "participant": participant})
+            return True
+
+    def get_months(self):
+        first = self.start_month.replace(day=1)
+        following = (first + timedelta(days=32)).replace(day=1)
+        return [
+            {"value": month.strftime("%Y-%m"), "days": calendar.monthrange(month.year, month.month)[1]}
+            for month in (first, following)
+        ]
+
+
+def get_slot_times():
+    start = datetime(2000, 1, 1, 14, 0)
+    return [(start + timedelta(minutes=15 * index)).strftime("%H:%M") for index in range(40)]
+
+
+def create_bouldering_app(venue):
+    standin = Flask(__name__)
+
+    def render(title, body, **context):
+        return render_template_string(PAGE, title=title, body=render_template_string(body, **context))
+
+    @standin.before_request
+    def simulate_latency():
+        if venue.latency:
+            time.sleep(venue.latency)
+
+    @standin.route("/courses/")
+    def courses():
+        body = CALENDAR.replace("MONTHS", json.dumps(venue.get_months())).replace("SLOT_TIMES", json.dumps(get_slot_times()))
+        return render("courses", body)
+
+    @standin.route("/courses/book")
+    def book():
+        slot = request.args.get("slot")
+        if slot is None:
+            abort(404)
+        return render("book", BOOKING_FORM, slot=slot)
+
+    @standin.route("/courses/details", methods=["POST"])
+    def details():
+        return render("details", PRIVACY_FORM, fields=request.form.to_dict())
+
+    @standin.route("/courses/confirm", methods=["POST"])
+    def confirm():
+        if request.form.get("data-processing") != "on":
+            abort(400)
+        if venue.reserve(request.form["slot"], request.form.get("email")):
+            return render("confirm", "<h1>Glückwunsch! Deine Buchung war erfolgreich.</h1>")
+        return render("confirm", "<h1>Leider ausgebucht.</h1>")
+
+    return standin
@@ -0,0 +1,208 @@
+import secrets
+import string
+import threading
+import time
+from flask import Flask, request, redirect, session, render_template_string, abort
+from werkzeug.serving import make_server
+
+
+PAGE = """<!DOCTYPE html>
+<html>
+<head><title>{{ title }}</title></head>
+<body>
+{% if error %}<div class="alert alert-danger">{{ error }}</div>{% endif %}
+{{ body|safe }}
+</body>
+</html>"""
+
+
+TICKET_PDF = b"%PDF-1.4\n1 0 obj << /Type /Catalog >> endobj\ntrailer << /Root 1 0 R >>\n%%EOF\n"
+
+
+class StandinVenue(object):
+
+    def __init__(self, slots, users, voucher="urbansportsclub", latency=0.0):
+        self.slots = dict(slots)
+        self.subevents = {str(101 + index): data_time for index, data_time in enumerate(sorted(self.slots))}
+        self.users = dict(users)
+        self.voucher = voucher
+        self.latency = latency
+        self.orders = {}
+        self.lock = threading.Lock()
+
+    def reserve(self, subevent):
+        with self.lock:
+            data_time = self.subevents[subevent]
+            if self.slots[data_time] <= 0:
+                return False
+            self.slots[data_time] -= 1
+            return True
+
+    def create_order(self, subevent, email):
+        code = "".join(secrets.choice(string.ascii_uppercase + string.digits) for _ in range(5))
+        with self.lock:
+            self.orders[code] = {"subevent": subevent, "email": email}
+        return code
+
+
+def create_pretix_app(venue, organizer="Baeder", event="74"):
+    standin = Flask(__name__)
+    standin.secret_key = secrets.token_hex(16)
+    prefix = f"/{organizer}/{event}"
+
+    def render(title, body, error=None):
+        return render_template_string(PAGE, title=title, body=body, error=error)
+
+    def csrf_input():
+        if "csrf" not in session:
+            session["csrf"] = secrets.token_hex(8)
+        return f'<input type="hidden" name="csrfmiddlewaretoken" value="{session["csrf"]}">'
+
+    def check_csrf():
+        if request.form.get("csrfmiddlewaretoken") != session.get("csrf"):
+            abort(403)
+
+    @standin.before_request
+    def simulate_latency():
+        if venue.latency:
+            time.sleep(venue.latency)
+
+    @standin.route(f"{prefix}/")
+    def shop():
+        links = "".join(
+            f'<a class="event-time" data-time="{data_time}" href="{prefix}/{subevent}/">{data_time}</a>'
+            for subevent, data_time in venue.subevents.items()
+        )
+        return render("shop", links, error=session.pop("error", None))
+
+    @standin.route(f"{prefix}/<subevent>/")
+    def slot(subevent):
+        if subevent not in venue.subevents:
+            abort(404)
+        body = f"""<form method="get" action="{prefix}/redeem">
+<input type="text" id="voucher" name="voucher" value="">
+<input type="hidden" name="subevent" value="{subevent}">
+<button type="submit" class="btn btn-block btn-primary">Redeem</button>
+</form>"""
+        return render("slot", body)
+
+    @standin.route(f"{prefix}/redeem")
+    def redeem():
+        subevent = request.args.get("subevent")
+        if request.args.get("voucher") != venue.voucher or subevent not in venue.subevents:
+            return render("slot", "", error="invalid voucher")
+        body = f"""<form method="post" action="{prefix}/cart/add">
+{csrf_input()}
+<input type="hidden" name="_voucher_code" value="{venue.voucher}">
+<input type="hidden" name="subevent" value="{subevent}">
+<input type="hidden" name="item_1" value="1">
+<button type="submit" id="btn-add-to-cart">Add to cart</button>
+</form>"""
+        return render("redeem", body)
+
+    @standin.route(f"{prefix}/cart/add", methods=["POST"])
+    def cart_add():
+        check_csrf()
+        subevent = request.form.get("subevent")
+        if subevent not in venue.subevents or not venue.reserve(subevent):
+            session["error"] = "sold out"
+            return redirect(f"{prefix}/")
+        session["cart"] = subevent
+        return redirect(f"{prefix}/")
+
+    @standin.route(f"{prefix}/checkout/customer/", methods=["GET", "POST"])
+    def checkout_customer():
+        if "cart" not in session:
+            session["error"] = "your cart is empty"
+            return redirect(f"{prefix}/")
+        if request.method == "GET" and session.get("customer") in venue.users:
+            return redirect(f"{prefix}/checkout/questions/")
+        error = None
+        if request.method == "POST":
+            check_csrf()
+            email = request.form.get("login-email")
+            if request.form.get("customer_mode") == "login" and venue.users.get(email) == request.form.get("login-password"):
+                session["customer"] = email
+                return redirect(f"{prefix}/checkout/questions/")
+            error = "wrong email or password"
+        body = f"""<form method="post">
+{csrf_input()}
+<input type="radio" id="input_customer_login" name="customer_mode" value="login">
+<input type="email" id="id_login-email" name="login-email" value="">
+<input type="password" id="id_login-password" name="login-password" value="">
+<a href="{prefix}/account/forgot">Forgot password?</a>
+<a href="{prefix}/account/register">Create account</a>
+<button type="submit">Log in</button>
+</form>"""
+        return render("customer", body, error=error)
+
+    @standin.route(f"{prefix}/checkout/questions/", methods=["GET", "POST"])
+    def checkout_questions():
+        if "cart" not in session or "customer" not in session:
+            return redirect(f"{prefix}/checkout/customer/")
+        if request.method == "POST":
+            check_csrf()
+            return redirect(f"{prefix}/checkout/confirm/")
+        body = f"""<form method="post">
+{csrf_input()}
+<input type="checkbox" id="id_save_profile" name="save_profile">
+<a href="{prefix}/checkout/customer/">Back</a>
+<a href="{prefix}/">Continue shopping</a>
+<button type="submit">Continue</button>
+</form>"""
+        return render("questions", body)
+
+    @standin.route(f"{prefix}/checkout/confirm/", methods=["GET", "POST"])
+    def checkout_confirm():
+        if "cart" not in session or "customer" not in session:
+            return redirect(f"{prefix}/checkout/customer/")
+        if request.method == "POST":
+            check_csrf()
+            if request.form.get("confirm_confirm_text_0") == "on":
+                code = venue.create_order(session.pop("cart"), session["customer"])
+                return redirect(f"{prefix}/order/{code}/{secrets.token_hex(8)}/?thanks=1")
+        body = f"""<form method="post">
+{csrf_input()}
+<input type="checkbox" id="input_confirm_confirm_text_0" name="confirm_confirm_text_0">
+<button type="submit">Place binding order</button>
+</form>"""
+        return render("confirm", body)
+
+    @standin.route(f"{prefix}/order/<code>/<secret>/")
+    def order(code, secret):
+        if code not in venue.orders:
+            abort(404)
+        body = f"""<h1>Order {code}</h1>
+<form method="get" action="{prefix}/order/{code}/{secret}/download/">
+<button class="btn btn-sm btn-primary">Download PDF</button>
+</form>"""
+        return render("order", body)
+
+    @standin.route(f"{prefix}/order/<code>/<secret>/download/")
+    def download(code, secret):
+        if code not in venue.orders:
+            abort(404)
+        response = standin.response_class(TICKET_PDF, mimetype="application/pdf")
+        response.headers["Content-Disposition"] = f"attachment; filename=ticket-{code}.pdf"
+        return response
+
+    return standin
+
+
+class StandinServer(object):
+
+    def __init__(self, standin_app, host="127.0.0.1", port=0):
+        self.server = make_server(host, port, standin_app, threaded=True)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        return f"http://{self.server.host}:{self.server.port}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.thread.join()
@@ -0,0 +1,45 @@
+from datetime import timedelta
+from model.models import db, Booking, Ticket
+from scheduler.scheduler import query_due_tickets
+from api.serializers import ticket_schema
+from views import query_bookings
+
+
+def get_key_queries(current_datetime, user_id=1, page_size=50):
+    return {
+        "due scheduled tickets": query_due_tickets(current_datetime + timedelta(minutes=2)),
+        "bookings releasing before T": db.session.query(Booking.id, Booking.user_id, Booking.earliest_ticket_datetime)
+            .filter(Booking.earliest_ticket_datetime <= current_datetime + timedelta(hours=1),
+                    Booking.earliest_ticket_datetime > current_datetime)
+            .order_by(Booking.earliest_ticket_datetime),
+        "bookings of user U by time": query_bookings()
+            .filter(Booking.user_id == user_id)
+            .order_by(Booking.datetime_event.desc(), Booking.id.desc())
+            .limit(page_size + 1),
+        "tickets of user U by time": db.session.query(*ticket_schema.columns)
+            .filter(Ticket.user_id == user_id)
+            .order_by(Ticket.created_at.desc(), Ticket.id.desc())
+            .limit(page_size + 1),
+        "tickets of user U by status and time": db.session.query(*ticket_schema.columns)
+            .filter(Ticket.user_id == user_id, Ticket.status == "CONFIRMED")
+            .order_by(Ticket.created_at.desc(), Ticket.id.desc())
+            .limit(page_size + 1),
+        "ticket of booking B": db.session.query(Ticket.id, Ticket.status).filter(Ticket.booking_id == 1),
+    }
+
+
+def explain(connection, query):
+    compiled = query.statement.compile(dialect=connection.dialect)
+    if connection.dialect.name == "sqlite":
+        params = tuple(compiled.params[name] for name in compiled.positiontup)
+        rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}", params).fetchall()
+        return [row[-1] for row in rows]
+    rows = connection.exec_driver_sql(f"EXPLAIN {compiled}", compiled.params).fetchall()
+    return [row[0] for row in rows]
+
+
+def find_plan_regressions(dialect_name, plan):
+    if dialect_name == "sqlite":
+        return [line for line in plan
+                if (line.startswith("SCAN ") and line != "SCAN CONSTANT ROW") or "USE TEMP B-TREE" in line]
+    return [line for line in plan if "Seq Scan" in line]
@@ -0,0 +1,62 @@
+import random
+import time
+from datetime import datetime
+from selenium.common.exceptions import NoSuchElementException, WebDriverException
+from app import app
+
+
+PROBE_SCRIPT = """
+const marker = arguments[0];
+const done = arguments[arguments.length - 1];
+fetch(window.location.href, {cache: "no-store", credentials: "include"})
+    .then(response => response.text())
+    .then(text => done(text.includes(marker)))
+    .catch(() => done(false));
+"""
+
+
+def get_poll_deadline(release_at, current_datetime):
+    if release_at is None:
+        return None
+    window_end = (release_at - current_datetime).total_seconds() + app.config["RELEASE_POLL_WINDOW_SECONDS"]
+    if window_end <= 0:
+        return None
+    return time.monotonic() + window_end
+
+
+def get_poll_interval():
+    jitter = app.config["RELEASE_POLL_JITTER"]
+    return app.config["RELEASE_POLL_INTERVAL_SECONDS"] * random.uniform(1 - jitter, 1 + jitter)
+
+
+def probe_available(driver, marker):
+    try:
+        return bool(driver.execute_async_script(PROBE_SCRIPT, marker))
+    except WebDriverException as error:
+        app.logger.info(f"availability probe failed, reloading instead: {error}")
+        return True
+
+
+def poll_until_available(driver, release_at, step, marker=None, unavailable=(NoSuchElementException,)):
+    deadline = get_poll_deadline(release_at, datetime.utcnow())
+    attempts = 1
+    while True:
+        try:
+            result = step()
+            if attempts > 1:
+                app.logger.info(f"slot available after {attempts} attempts")
+            return result
+        except unavailable:
+            interval = get_poll_interval()
+            if deadline is None or time.monotonic() + interval >= deadline:
+                app.logger.info(f"slot still unavailable after {attempts} attempts, giving up")
+                raise
+        time.sleep(interval)
+        if driver is not None:
+            while marker is not None and not probe_available(driver, marker):
+                interval = get_poll_interval()
+                if time.monotonic() + interval >= deadline:
+                    break
+                time.sleep(interval)
+            driver.refresh()
+        attempts += 1
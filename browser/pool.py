@@ -0,0 +1,124 @@
+import queue
+import threading
+from contextlib import contextmanager
+from selenium.common.exceptions import WebDriverException
+from app import app
+
+
+class DriverPoolExhausted(Exception):
+    pass
+
+
+class DriverPool(object):
+
+    def __init__(self, driver_factory, size, checkout_timeout=30):
+        self.driver_factory = driver_factory
+        self.size = size
+        self.checkout_timeout = checkout_timeout
+        self.idle = queue.LifoQueue()
+        self.lock = threading.Lock()
+        self.created = 0
+
+    def warm(self):
+        while self._reserve_slot():
+            self.idle.put(self._create_driver())
+        app.logger.info(f"driver pool warmed, size: {self.size}")
+
+    @contextmanager
+    def checkout(self):
+        driver = self.acquire()
+        try:
+            yield driver
+        finally:
+            self.release(driver)
+
+    def acquire(self):
+        while True:
+            try:
+                driver = self.idle.get_nowait()
+            except queue.Empty:
+                driver = self._create_or_wait()
+            if is_driver_healthy(driver):
+                return driver
+            app.logger.info("discarding unhealthy driver from pool")
+            self._discard(driver)
+
+    def release(self, driver):
+        try:
+            reset_driver(driver)
+        except WebDriverException:
+            app.logger.info("driver reset failed, discarding driver")
+            self._discard(driver)
+            return
+        self.idle.put(driver)
+
+    def close(self):
+        while True:
+            try:
+                driver = self.idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(driver)
+        app.logger.info("driver pool closed")
+
+    def _create_or_wait(self):
+        if self._reserve_slot():
+            return self._create_driver()
+        try:
+            return self.idle.get(timeout=self.checkout_timeout)
+        except queue.Empty:
+            raise DriverPoolExhausted(f"no driver available after {self.checkout_timeout} seconds")
+
+    def _reserve_slot(self):
+        with self.lock:
+            if self.created >= self.size:
+                return False
+            self.created += 1
+            return True
+
+    def _create_driver(self):
+        try:
+            return self.driver_factory()
+        except Exception:
+            with self.lock:
+                self.created -= 1
+            raise
+
+    def _discard(self, driver):
+        with self.lock:
+            self.created -= 1
+        try:
+            driver.quit()
+        except WebDriverException:
+            pass
+
+
+def start_warmup(pool):
+    thread = threading.Thread(target=warm_quietly, args=(pool,), name="driver-pool-warmup", daemon=True)
+    thread.start()
+    return thread
+
+
+def warm_quietly(pool):
+    try:
+        pool.warm()
+    except Exception as error:
+        app.logger.info(f"driver pool warm-up failed, drivers will start on first checkout: {error}")
+
+
+def is_driver_healthy(driver):
+    try:
+        return driver.execute_script("return 1") == 1
+    except WebDriverException:
+        return False
+
+
+def reset_driver(driver):
+    handles = driver.window_handles
+    for handle in handles[1:]:
+        driver.switch_to.window(handle)
+        driver.close()
+    driver.switch_to.window(handles[0])
+    driver.execute_script("try { window.localStorage.clear(); window.sessionStorage.clear(); } catch (e) {}")
+    driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+    driver.get("about:blank")
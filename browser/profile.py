@@ -0,0 +1,48 @@
+import os
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+from app import app
+
+
+def build_chrome_options():
+    chrome_options = webdriver.ChromeOptions()
+    chrome_options.binary_location = os.environ.get("GOOGLE_CHROME_BIN")
+    chrome_options.add_argument("--headless")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    chrome_options.add_argument("--no-sandbox")
+    if not app.config["CHROME_LEAN_MODE"]:
+        return chrome_options
+    chrome_options.page_load_strategy = "eager"
+    chrome_options.add_argument(f"--window-size={app.config['CHROME_WINDOW_SIZE']}")
+    chrome_options.add_argument(f"--disk-cache-size={app.config['CHROME_DISK_CACHE_BYTES']}")
+    chrome_options.add_argument(f"--media-cache-size={app.config['CHROME_DISK_CACHE_BYTES']}")
+    chrome_options.add_argument("--disable-extensions")
+    chrome_options.add_argument("--disable-background-networking")
+    chrome_options.add_argument("--disable-component-update")
+    chrome_options.add_argument("--disable-default-apps")
+    chrome_options.add_argument("--disable-sync")
+    chrome_options.add_argument("--mute-audio")
+    chrome_options.add_argument("--no-first-run")
+    chrome_options.add_argument("--renderer-process-limit=2")
+    return chrome_options
+
+
+def get_blocked_urls(venue_type):
+    rules = app.config["VENUE_RESOURCE_RULES"].get(venue_type, {})
+    allowed = set(rules.get("allow", []))
+    patterns = app.config["CHROME_BLOCKED_URLS"] + rules.get("deny", [])
+    return [pattern for pattern in dict.fromkeys(patterns) if pattern not in allowed]
+
+
+def apply_resource_rules(driver, venue_type):
+    if not app.config["CHROME_LEAN_MODE"]:
+        return []
+    blocked_urls = get_blocked_urls(venue_type)
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": blocked_urls})
+    except WebDriverException as error:
+        app.logger.info(f"could not apply resource rules for {venue_type}: {error}")
+        return []
+    app.logger.info(f"blocking {len(blocked_urls)} url patterns for {venue_type}")
+    return blocked_urls
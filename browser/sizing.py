@@ -0,0 +1,63 @@
+import os
+
+
+MEMINFO_PATH = '/proc/meminfo'
+CGROUP_MEMORY_LIMIT_PATHS = ('/sys/fs/cgroup/memory.max', '/sys/fs/cgroup/memory/memory.limit_in_bytes')
+UNLIMITED_MEMORY_BYTES = 2 ** 60
+
+
+def get_host_memory_bytes():
+    with open(MEMINFO_PATH) as meminfo:
+        return next(int(line.split()[1]) * 1024 for line in meminfo if line.startswith('MemTotal:'))
+
+
+def get_cgroup_memory_limit_bytes():
+    for path in CGROUP_MEMORY_LIMIT_PATHS:
+        try:
+            with open(path) as limit_file:
+                limit = limit_file.read().strip()
+        except OSError:
+            continue
+        if not limit.isdigit() or int(limit) >= UNLIMITED_MEMORY_BYTES:
+            return None
+        return int(limit)
+    return None
+
+
+def get_memory_total_bytes():
+    limits = []
+    try:
+        limits.append(get_host_memory_bytes())
+    except (OSError, StopIteration):
+        pass
+    cgroup_limit = get_cgroup_memory_limit_bytes()
+    if cgroup_limit:
+        limits.append(cgroup_limit)
+    if not limits:
+        raise OSError('could not determine the memory available to this worker')
+    return min(limits)
+
+
+def get_browser_memory_bytes():
+    return int(os.getenv('CHROME_MEMORY_MB', 400)) * 1024 * 1024
+
+
+def get_browser_budget():
+    reserved_bytes = int(os.getenv('WORKER_RESERVED_MEMORY_MB', 512)) * 1024 * 1024
+    try:
+        total_bytes = get_memory_total_bytes()
+    except (OSError, StopIteration):
+        return None
+    return max(1, (total_bytes - reserved_bytes) // get_browser_memory_bytes())
+
+
+def get_browser_count():
+    budget = get_browser_budget()
+    if os.getenv('CHROME_POOL_SIZE'):
+        requested = int(os.getenv('CHROME_POOL_SIZE'))
+        return requested if budget is None else min(requested, budget)
+    return budget or 1
+
+
+def get_browser_concurrency():
+    return get_browser_count()
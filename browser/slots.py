@@ -0,0 +1,45 @@
+import re
+from selenium.common.exceptions import NoSuchElementException
+from app import app
+
+
+SLOT_MAP_SCRIPT = """
+return Array.from(document.querySelectorAll(arguments[0])).map(element => ({
+    text: element.textContent,
+    element: element,
+    disabled: element.disabled || element.getAttribute("aria-disabled") === "true"
+        || element.classList.contains("disabled"),
+}));
+"""
+
+SLOT_START_PATTERN = re.compile(r"(\d{1,2})[:.](\d{2})")
+
+
+def parse_slot_start(text):
+    match = SLOT_START_PATTERN.search(text or "")
+    if match is None:
+        return None
+    return f"{int(match.group(1)):02d}:{match.group(2)}"
+
+
+def read_slot_map(driver, selector):
+    slot_map = {}
+    for slot in driver.execute_script(SLOT_MAP_SCRIPT, selector):
+        start = parse_slot_start(slot["text"])
+        if start is None or slot["disabled"]:
+            continue
+        slot_map.setdefault(start, slot["element"])
+    return slot_map
+
+
+def find_slot(slot_map, start):
+    element = slot_map.get(start)
+    if element is None:
+        raise NoSuchElementException(f"no bookable slot starting at {start}, found {sorted(slot_map)}")
+    return element
+
+
+def click_slot(driver, selector, start):
+    slot_map = read_slot_map(driver, selector)
+    find_slot(slot_map, start).click()
+    app.logger.info(f"clicked slot {start} out of {len(slot_map)} bookable slots")
@@ -0,0 +1,41 @@
+import os
+import time
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.support.ui import WebDriverWait
+from app import app
+
+
+def get_step_settings(step):
+    settings = app.config["WAIT_STEPS"].get(step, {})
+    timeout = settings.get("timeout", app.config["WAIT_DEFAULT_TIMEOUT"])
+    poll = settings.get("poll", app.config["WAIT_DEFAULT_POLL"])
+    return timeout, poll
+
+
+def wait_for(driver, step, condition):
+    timeout, poll = get_step_settings(step)
+    started = time.monotonic()
+    try:
+        result = WebDriverWait(driver, timeout, poll_frequency=poll).until(condition)
+    except TimeoutException:
+        record_wait(step, time.monotonic() - started, "timeout")
+        raise
+    except Exception:
+        record_wait(step, time.monotonic() - started, "error")
+        raise
+    record_wait(step, time.monotonic() - started, "ok")
+    return result
+
+
+def record_wait(step, waited_seconds, outcome):
+    app.logger.info(f"step {step} waited {waited_seconds:.3f} seconds ({outcome})",
+                    extra={"step": step, "waited_seconds": waited_seconds, "outcome": outcome})
+
+
+def file_downloaded(download_dir, extension):
+    def condition(driver):
+        if not os.path.isdir(download_dir):
+            return False
+        finished = [name for name in os.listdir(download_dir) if name.endswith(extension)]
+        return finished or False
+    return condition
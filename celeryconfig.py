@@ -1,3 +1,35 @@
 import os
+from kombu import Queue
+from browser.sizing import get_browser_concurrency
 
-broker_url = os.getenv('REDIS_URL', 'redis://localhost:6379/3')
\ No newline at end of file
+
+broker_url = os.getenv('REDIS_URL', 'redis://localhost:6379/3')
+
+task_queues = (
+    Queue('scheduling'),
+    Queue('browser'),
+    Queue('housekeeping'),
+)
+task_default_queue = 'housekeeping'
+task_routes = {
+    'app.dispatch_due_tickets': {'queue': 'scheduling'},
+    'app.execute_ticket': {'queue': 'browser'},
+    'app.run_ticket': {'queue': 'browser'},
+    'app.warm_browsers': {'queue': 'browser'},
+    'app.prepare_capacity': {'queue': 'scheduling'},
+}
+worker_prefetch_multiplier = 1
+worker_direct = True
+worker_concurrency = get_browser_concurrency()
+broker_transport_options = {'visibility_timeout': int(os.getenv('BROKER_VISIBILITY_TIMEOUT', 3600))}
+
+beat_schedule = {
+    'dispatch-due-tickets': {
+        'task': 'app.dispatch_due_tickets',
+        'schedule': float(os.getenv('SCHEDULER_DISPATCH_INTERVAL_SECONDS', 15)),
+    },
+    'prepare-capacity': {
+        'task': 'app.prepare_capacity',
+        'schedule': float(os.getenv('CAPACITY_CHECK_INTERVAL_SECONDS', 60)),
+    },
+}
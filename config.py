@@ -1,5 +1,6 @@
 import os
 import redis
+from browser.sizing import get_browser_count
 
 
 class Config(object):
@@ -11,6 +12,64 @@ class Config(object):
     SESSION_TYPE = os.environ.get('SESSION_TYPE')
     FLASK_ENV = os.environ.get('FLASK_ENV')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SCHEDULER_DISPATCH_INTERVAL_SECONDS = float(os.environ.get('SCHEDULER_DISPATCH_INTERVAL_SECONDS', 15))
+    WARM_START_LEAD_SECONDS = int(os.environ.get('WARM_START_LEAD_SECONDS', 30))
+    WARM_START_SPIN_SECONDS = float(os.environ.get('WARM_START_SPIN_SECONDS', 0.05))
+    COORDINATOR_REDIS = redis.from_url(os.environ.get('COORDINATOR_REDIS', 'redis://localhost:6379/2'))
+    EXECUTION_LEASE_SECONDS = int(os.environ.get('EXECUTION_LEASE_SECONDS', 900))
+    CLOCK_SYNC_SAMPLES = int(os.environ.get('CLOCK_SYNC_SAMPLES', 5))
+    CLOCK_SYNC_TIMEOUT = float(os.environ.get('CLOCK_SYNC_TIMEOUT', 2))
+    CLOCK_SYNC_TTL_SECONDS = int(os.environ.get('CLOCK_SYNC_TTL_SECONDS', 600))
+    BROWSER_SLOTS_TTL_SECONDS = int(os.environ.get('BROWSER_SLOTS_TTL_SECONDS', 60))
+    RELEASE_SLOT_HOLD_SECONDS = int(os.environ.get('RELEASE_SLOT_HOLD_SECONDS', 180))
+    RELEASE_BATCH_TTL_SECONDS = int(os.environ.get('RELEASE_BATCH_TTL_SECONDS', 3600))
+    CHROME_POOL_SIZE = get_browser_count()
+    CHROME_POOL_CHECKOUT_TIMEOUT = int(os.environ.get('CHROME_POOL_CHECKOUT_TIMEOUT', 30))
+    CHROME_LEAN_MODE = os.environ.get('CHROME_LEAN_MODE', 'true') == 'true'
+    CHROME_WINDOW_SIZE = os.environ.get('CHROME_WINDOW_SIZE', '1024,768')
+    CHROME_DISK_CACHE_BYTES = int(os.environ.get('CHROME_DISK_CACHE_BYTES', 16 * 1024 * 1024))
+    CHROME_BLOCKED_URLS = [
+        "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",
+        "*.woff", "*.woff2", "*.ttf", "*.otf", "*.mp4", "*.webm",
+        "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+        "*facebook.net*", "*hotjar.com*", "*matomo*",
+    ]
+    VENUE_RESOURCE_RULES = {
+        "bouldering": {"allow": ["*.svg"], "deny": ["*fonts.googleapis.com*"]},
+        "swimming": {"deny": ["*fonts.googleapis.com*"]},
+    }
+    WAIT_DEFAULT_TIMEOUT = float(os.environ.get('WAIT_DEFAULT_TIMEOUT', 10))
+    WAIT_DEFAULT_POLL = float(os.environ.get('WAIT_DEFAULT_POLL', 0.05))
+    WAIT_STEPS = {
+        "complete_checkout": {"timeout": 20},
+        "download_pdf": {"timeout": 30, "poll": 0.25},
+    }
+    RELEASE_POLL_WINDOW_SECONDS = float(os.environ.get('RELEASE_POLL_WINDOW_SECONDS', 20))
+    RELEASE_POLL_INTERVAL_SECONDS = float(os.environ.get('RELEASE_POLL_INTERVAL_SECONDS', 0.25))
+    RELEASE_POLL_JITTER = float(os.environ.get('RELEASE_POLL_JITTER', 0.3))
+    PDF_DOWNLOAD_DIR = os.environ.get('PDF_DOWNLOAD_DIR', '/tmp/chelonia')
+    PRETIX_HTTP_ENABLED = os.environ.get('PRETIX_HTTP_ENABLED', 'true') == 'true'
+    PRETIX_HTTP_POOL_SIZE = int(os.environ.get('PRETIX_HTTP_POOL_SIZE', 10))
+    PRETIX_HTTP_TIMEOUT = float(os.environ.get('PRETIX_HTTP_TIMEOUT', 10))
+    PRETIX_HTTP_MAX_CHECKOUT_STEPS = int(os.environ.get('PRETIX_HTTP_MAX_CHECKOUT_STEPS', 5))
+    PRETIX_VOUCHER_CODE = os.environ.get('PRETIX_VOUCHER_CODE', 'urbansportsclub')
+    VENUE_SESSION_KEY = os.environ.get('VENUE_SESSION_KEY')
+    VENUE_SESSION_TTL_SECONDS = int(os.environ.get('VENUE_SESSION_TTL_SECONDS', 3 * 24 * 3600))
+    LISTING_PAGE_SIZE = int(os.environ.get('LISTING_PAGE_SIZE', 50))
+    LISTING_MAX_PAGE_SIZE = int(os.environ.get('LISTING_MAX_PAGE_SIZE', 200))
+    EVENTS_REDIS = redis.from_url(os.environ.get('EVENTS_REDIS', 'redis://localhost:6379/3'))
+    TICKET_EVENTS_CHANNEL = os.environ.get('TICKET_EVENTS_CHANNEL', 'ticket-events')
+    TICKET_EVENTS_BUFFER = int(os.environ.get('TICKET_EVENTS_BUFFER', 100))
+    TICKET_EVENTS_HEARTBEAT_SECONDS = float(os.environ.get('TICKET_EVENTS_HEARTBEAT_SECONDS', 15))
+    TICKET_EVENTS_RECONNECT_MAX_SECONDS = float(os.environ.get('TICKET_EVENTS_RECONNECT_MAX_SECONDS', 30))
+    METRICS_REDIS = redis.from_url(os.environ.get('METRICS_REDIS', 'redis://localhost:6379/4'))
+    METRICS_STEP_BUCKETS = [0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30]
+    CAPACITY_PLAN_HORIZON_HOURS = int(os.environ.get('CAPACITY_PLAN_HORIZON_HOURS', 168))
+    CAPACITY_PRESCALE_LEAD_SECONDS = int(os.environ.get('CAPACITY_PRESCALE_LEAD_SECONDS', 600))
+    CAPACITY_SPIKE_THRESHOLD = int(os.environ.get('CAPACITY_SPIKE_THRESHOLD', 2))
+    CAPACITY_SCALE_WEBHOOK_URL = os.environ.get('CAPACITY_SCALE_WEBHOOK_URL')
+    CAPACITY_SCALE_WEBHOOK_TIMEOUT = float(os.environ.get('CAPACITY_SCALE_WEBHOOK_TIMEOUT', 5))
+    RECURRING_MAX_OCCURRENCES = int(os.environ.get('RECURRING_MAX_OCCURRENCES', 52))
 
 
 class ProductionConfig(Config):
@@ -1,7 +1,8 @@
 from flask_wtf import FlaskForm
 from wtforms import StringField, PasswordField, IntegerField, SelectField, DateField, TimeField, RadioField
-from wtforms.validators import DataRequired, Length
+from wtforms.validators import DataRequired, Length, Optional
 from datetime import datetime
+from venues.adapters import get_venue_choices
 
 
 class RegistrationForm(FlaskForm):
@@ -28,10 +29,11 @@ class LoginForm(FlaskForm):
 class VenueForm(FlaskForm):
     venue_name = StringField("Venue name", validators=[DataRequired(), Length(max=150)])
     venue_url = StringField("Venue url", [DataRequired(), Length(max=150)])
-    venue_type = RadioField("Type", choices=[("bouldering", "bouldering"), ("swimming", "swimming")])
+    venue_type = RadioField("Type", choices=get_venue_choices())
 
 
 class BookingForm(FlaskForm):
     venue_id = SelectField("Venue name", coerce=int, validators=[DataRequired(), Length(max=150)])
     date_event = DateField("Date", format='%Y-%m-%d', default=datetime.today, validators=[DataRequired(), Length(max=150)])
     time_event = TimeField("Time", format='%H:%M', default=datetime.now(), validators=[DataRequired(), Length(max=150)])
+    repeat_until = DateField("Repeat weekly until", format='%Y-%m-%d', validators=[Optional()])
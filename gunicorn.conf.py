@@ -0,0 +1,14 @@
+import os
+
+
+worker_class = os.environ.get("WEB_WORKER_CLASS", "gevent")
+workers = int(os.environ.get("WEB_CONCURRENCY", 2))
+worker_connections = int(os.environ.get("WEB_WORKER_CONNECTIONS", 2000))
+threads = int(os.environ.get("WEB_THREADS", 8))
+
+
+def post_fork(server, worker):
+    if worker_class == "gevent":
+        from psycogreen.gevent import patch_psycopg
+        patch_psycopg()
+        server.log.info(f"worker {worker.pid} patched psycopg2 for gevent")
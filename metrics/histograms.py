@@ -0,0 +1,37 @@
+import redis
+from app import app
+
+
+def observe_histogram(key, seconds):
+    try:
+        pipeline = app.config["METRICS_REDIS"].pipeline(transaction=False)
+        for bucket in app.config["METRICS_STEP_BUCKETS"]:
+            if seconds <= bucket:
+                pipeline.hincrby(key, f"le:{bucket}", 1)
+        pipeline.hincrby(key, "count", 1)
+        pipeline.hincrbyfloat(key, "sum", seconds)
+        pipeline.execute()
+    except redis.RedisError as error:
+        app.logger.info(f"could not record {key}: {error}")
+
+
+def render_histogram(redis_client, metric, help_text, key_prefix, label_names):
+    lines = [
+        f"# HELP {metric} {help_text}",
+        f"# TYPE {metric} histogram",
+    ]
+    for key in sorted(redis_client.scan_iter(f"{key_prefix}*")):
+        if isinstance(key, bytes):
+            key = key.decode()
+        label_values = key[len(key_prefix):].split("|")
+        values = {
+            (field.decode() if isinstance(field, bytes) else field): float(value)
+            for field, value in redis_client.hgetall(key).items()
+        }
+        labels = ",".join(f'{name}="{value}"' for name, value in zip(label_names, label_values))
+        for bucket in app.config["METRICS_STEP_BUCKETS"]:
+            lines.append(f'{metric}_bucket{{{labels},le="{bucket}"}} {int(values.get(f"le:{bucket}", 0))}')
+        lines.append(f'{metric}_bucket{{{labels},le="+Inf"}} {int(values.get("count", 0))}')
+        lines.append(f'{metric}_sum{{{labels}}} {values.get("sum", 0.0)}')
+        lines.append(f'{metric}_count{{{labels}}} {int(values.get("count", 0))}')
+    return lines
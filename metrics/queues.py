@@ -0,0 +1,56 @@
+import time
+from datetime import datetime, timezone
+from app import app
+from metrics.histograms import observe_histogram, render_histogram
+
+
+QUEUE_LATENCY_METRIC = "chelonia_queue_latency_seconds"
+QUEUE_DEPTH_METRIC = "chelonia_queue_depth"
+QUEUE_KEY_PREFIX = "metrics:queue_latency:"
+
+
+def get_task_latency(request, current_time):
+    published_at = getattr(request, "published_at", None)
+    if published_at is None:
+        return None
+    due_at = float(published_at)
+    if request.eta:
+        eta = request.eta
+        if isinstance(eta, str):
+            eta = datetime.fromisoformat(eta)
+        if eta.tzinfo is None:
+            eta = eta.replace(tzinfo=timezone.utc)
+        due_at = max(due_at, eta.timestamp())
+    return max(0.0, current_time - due_at)
+
+
+def observe_task_start(task):
+    latency = get_task_latency(task.request, time.time())
+    if latency is None:
+        return None
+    queue = (task.request.delivery_info or {}).get("routing_key") or "unknown"
+    observe_histogram(f"{QUEUE_KEY_PREFIX}{queue}|{task.name}", latency)
+    app.logger.info(f"task {task.name} started {latency * 1000:.0f}ms after it was due on {queue}",
+                    extra={"queue": queue, "task": task.name, "latency_seconds": latency})
+    return latency
+
+
+def get_queue_depths(celery, queues):
+    depths = {}
+    with celery.connection_for_read() as connection:
+        channel = connection.default_channel
+        for queue in queues:
+            depths[queue] = channel.queue_declare(queue=queue, passive=True).message_count
+    return depths
+
+
+def render_queue_metrics(redis_client, depths):
+    lines = [
+        f"# HELP {QUEUE_DEPTH_METRIC} Messages waiting in each celery queue.",
+        f"# TYPE {QUEUE_DEPTH_METRIC} gauge",
+    ]
+    for queue, depth in sorted(depths.items()):
+        lines.append(f'{QUEUE_DEPTH_METRIC}{{queue="{queue}"}} {depth}')
+    lines += render_histogram(redis_client, QUEUE_LATENCY_METRIC, "Time from a task being due to a worker starting it.",
+                              QUEUE_KEY_PREFIX, ["queue", "task"])
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,75 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from selenium.common.exceptions import TimeoutException
+from app import app
+from metrics.histograms import observe_histogram, render_histogram
+
+try:
+    from ddtrace import tracer
+except ImportError:
+    tracer = None
+
+
+STEP_METRIC = "chelonia_booking_step_seconds"
+STEP_KEY_PREFIX = "metrics:booking_step:"
+
+current_venue = ContextVar("current_venue", default="unknown")
+
+
+def set_step_venue(venue_type):
+    current_venue.set(venue_type or "unknown")
+
+
+def get_outcome(error):
+    if error is None:
+        return "ok"
+    if isinstance(error, TimeoutException):
+        return "timeout"
+    return "error"
+
+
+@contextmanager
+def step_timer(step):
+    venue = current_venue.get()
+    span = tracer.trace("booking.step", service="chelonia", resource=step) if tracer is not None else None
+    started = time.perf_counter()
+    error = None
+    try:
+        yield
+    except Exception as raised:
+        error = raised
+        raise
+    finally:
+        seconds = time.perf_counter() - started
+        outcome = get_outcome(error)
+        if span is not None:
+            span.set_tag("venue", venue)
+            span.set_tag("outcome", outcome)
+            if error is not None:
+                span.set_exc_info(type(error), error, error.__traceback__)
+            span.finish()
+        observe_step(step, venue, outcome, seconds)
+
+
+def timed_step(step):
+    def decorator(function):
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            with step_timer(step):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def observe_step(step, venue, outcome, seconds):
+    observe_histogram(f"{STEP_KEY_PREFIX}{step}|{venue}|{outcome}", seconds)
+    app.logger.info(f"step {step} took {seconds:.3f} seconds ({outcome})",
+                    extra={"step": step, "venue": venue, "outcome": outcome, "seconds": seconds})
+
+
+def render_step_metrics(redis_client):
+    lines = render_histogram(redis_client, STEP_METRIC, "Duration of booking flow steps by venue and outcome.",
+                             STEP_KEY_PREFIX, ["step", "venue", "outcome"])
+    return "\n".join(lines) + "\n"
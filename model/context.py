@@ -0,0 +1,35 @@
+from model.models import db, Booking, Venue
+
+
+class BookingContext(object):
+
+    __slots__ = ("booking_id", "user_id", "venue_id", "venue_type", "venue_url", "datetime_event", "created_at", "earliest_ticket_datetime")
+
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            object.__setattr__(self, name, fields[name])
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"BookingContext is immutable, cannot set {name}")
+
+    def __repr__(self):
+        return f"<BookingContext booking_id={self.booking_id} venue_type={self.venue_type}>"
+
+
+def load_booking_context(booking_id):
+    row = db.session.query(
+        Booking.id, Booking.user_id, Booking.venue_id, Venue.venue_type, Venue.venue_url,
+        Booking.datetime_event, Booking.created_at, Booking.earliest_ticket_datetime
+    ).outerjoin(Venue, Booking.venue_id == Venue.id).filter(Booking.id == booking_id).first()
+    if row is None:
+        return None
+    return BookingContext(
+        booking_id=row[0],
+        user_id=row[1],
+        venue_id=row[2],
+        venue_type=row[3],
+        venue_url=row[4],
+        datetime_event=row[5],
+        created_at=row[6],
+        earliest_ticket_datetime=row[7],
+    )
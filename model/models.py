@@ -21,7 +21,7 @@ class User(UserMixin, db.Model):
     last_name = db.Column(db.String())
     email = db.Column(db.String(), unique=True)
     password_hash = db.Column(db.String())
-    created_at = db.Column(db.DateTime(), default=datetime.utcnow(), index=True)
+    created_at = db.Column(db.DateTime(), default=datetime.utcnow, index=True)
     authenticated = db.Column(db.Boolean, default=False)
     bookings = db.relationship("Booking", backref="user")
     tickets = db.relationship("Ticket", backref="user")
@@ -62,15 +62,19 @@ class User(UserMixin, db.Model):
 class Booking(db.Model):
 
     __tablename__ = "booking"
+    __table_args__ = (
+        db.Index("ix_booking_user_id_datetime_event", "user_id", "datetime_event", "id"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
-    venue_id = db.Column(db.Integer(), db.ForeignKey("venue.id"))
+    venue_id = db.Column(db.Integer(), db.ForeignKey("venue.id"), index=True)
     datetime_event = db.Column(db.DateTime())
-    created_at = db.Column(db.DateTime(), default=datetime.utcnow(), index=True)
+    created_at = db.Column(db.DateTime(), default=datetime.utcnow, index=True)
     user_id = db.Column(db.Integer, db.ForeignKey("user.id"))
     confirmation_code = db.Column(db.String())
     ticket = db.relationship("Ticket", backref="booking", uselist=False)
-    earliest_ticket_datetime = db.Column(db.DateTime())
+    earliest_ticket_datetime = db.Column(db.DateTime(), index=True)
+    updated_at = db.Column(db.DateTime(), default=datetime.utcnow, onupdate=datetime.utcnow)
 
     def __init__(self, venue_id, datetime_event, user_id):
         self.venue_id = venue_id
@@ -81,12 +85,17 @@ class Booking(db.Model):
 class Ticket(db.Model):
 
     __tablename__ = "ticket"
+    __table_args__ = (
+        db.Index("ix_ticket_user_id_created_at", "user_id", "created_at", "id"),
+        db.Index("ix_ticket_user_id_status_created_at", "user_id", "status", "created_at", "id"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
-    booking_id = db.Column(db.Integer(), db.ForeignKey("booking.id"))
-    created_at = db.Column(db.DateTime(), default=datetime.utcnow(), index=True)
+    booking_id = db.Column(db.Integer(), db.ForeignKey("booking.id"), index=True)
+    created_at = db.Column(db.DateTime(), default=datetime.utcnow, index=True)
     user_id = db.Column(db.Integer, db.ForeignKey("user.id"))
     status = db.Column(db.String())
+    updated_at = db.Column(db.DateTime(), default=datetime.utcnow, onupdate=datetime.utcnow)
 
     def __init__(self, booking_id, user_id):
         self.booking_id = booking_id
@@ -101,9 +110,10 @@ class Venue(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     venue_name = db.Column(db.String())
     venue_url = db.Column(db.String())
-    created_at = db.Column(db.DateTime(), default=datetime.utcnow(), index=True)
+    created_at = db.Column(db.DateTime(), default=datetime.utcnow, index=True)
     bookings = db.relationship("Booking", backref="venue")
     venue_type = db.Column(db.String())
+    updated_at = db.Column(db.DateTime(), default=datetime.utcnow, onupdate=datetime.utcnow)
 
     def __init__(self, venue_name, venue_url, venue_type):
         self.venue_name = venue_name
@@ -111,5 +121,30 @@ class Venue(db.Model):
         self.venue_type = venue_type
 
 
+class ScheduledTicket(db.Model):
+
+    __tablename__ = "scheduled_ticket"
+    __table_args__ = (
+        db.Index("ix_scheduled_ticket_status_release_at", "status", "release_at"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    booking_id = db.Column(db.Integer(), db.ForeignKey("booking.id"), unique=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("user.id"))
+    release_at = db.Column(db.DateTime(), index=True)
+    status = db.Column(db.String())
+    created_at = db.Column(db.DateTime(), default=datetime.utcnow)
+    dispatched_at = db.Column(db.DateTime())
+    lease_token = db.Column(db.Integer(), nullable=False, default=0, server_default="0")
+    lease_owner = db.Column(db.String())
+    lease_expires_at = db.Column(db.DateTime())
+
+    def __init__(self, booking_id, user_id, release_at):
+        self.booking_id = booking_id
+        self.user_id = user_id
+        self.release_at = release_at
+        self.status = "PENDING"
+
+
 db.create_all()
 app.logger.info("created all db tables - second")
@@ -0,0 +1,196 @@
+import re
+import requests
+from html.parser import HTMLParser
+from urllib.parse import urljoin
+from requests.adapters import HTTPAdapter
+from app import app
+
+
+SOLD_OUT_PATTERN = re.compile(r"sold out|ausverkauft|no longer available|nicht mehr verfügbar|not available anymore", re.IGNORECASE)
+
+ERROR_PATTERN = re.compile(r'<div[^>]*class="[^"]*alert-danger[^"]*"[^>]*>(.*?)</div>', re.DOTALL)
+
+http_adapter = HTTPAdapter(pool_connections=app.config["PRETIX_HTTP_POOL_SIZE"], pool_maxsize=app.config["PRETIX_HTTP_POOL_SIZE"])
+
+
+class PretixError(Exception):
+    pass
+
+
+class PretixSoldOut(PretixError):
+    pass
+
+
+class PretixSlotUnavailable(PretixError):
+    pass
+
+
+class Form(object):
+
+    def __init__(self, action, method, attrs):
+        self.action = action
+        self.method = method
+        self.attrs = attrs
+        self.fields = {}
+        self.checkboxes = []
+        self.button_ids = []
+
+
+class Page(HTMLParser):
+
+    def __init__(self, url, html):
+        super().__init__()
+        self.url = url
+        self.html = html
+        self.forms = []
+        self.links = []
+        self.current_form = None
+        self.feed(html)
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == "form":
+            self.current_form = Form(attrs.get("action") or "", (attrs.get("method") or "get").lower(), attrs)
+            self.forms.append(self.current_form)
+        elif tag == "a":
+            self.links.append(attrs)
+        elif self.current_form is not None and tag in ("input", "button"):
+            self.add_field(tag, attrs)
+
+    def handle_endtag(self, tag):
+        if tag == "form":
+            self.current_form = None
+
+    def add_field(self, tag, attrs):
+        if attrs.get("id") and tag == "button":
+            self.current_form.button_ids.append(attrs["id"])
+        name = attrs.get("name")
+        if name is None:
+            return
+        input_type = attrs.get("type", "text").lower()
+        if input_type == "checkbox":
+            self.current_form.checkboxes.append(name)
+            if "checked" not in attrs:
+                return
+        if input_type == "radio" and "checked" not in attrs:
+            return
+        if tag == "button":
+            return
+        self.current_form.fields[name] = attrs.get("value", "on" if input_type == "checkbox" else "")
+
+    def find_form(self, field=None, button_id=None):
+        for form in self.forms:
+            if field is not None and field in form.fields:
+                return form
+            if button_id is not None and button_id in form.button_ids:
+                return form
+        return None
+
+    def find_slot_link(self, data_time):
+        for link in self.links:
+            if data_time == link.get("data-time") and "event-time" in link.get("class", ""):
+                return link
+        return None
+
+    def has_error(self):
+        return "alert-danger" in self.html
+
+    def get_error(self):
+        match = ERROR_PATTERN.search(self.html)
+        if match is None:
+            return None
+        return re.sub(r"<[^>]+>", " ", match.group(1)).strip()
+
+    def is_sold_out(self):
+        return SOLD_OUT_PATTERN.search(self.get_error() or "") is not None
+
+
+def create_session():
+    session = requests.Session()
+    session.mount("https://", http_adapter)
+    session.mount("http://", http_adapter)
+    return session
+
+
+def parse_confirmation_code(url):
+    match = re.search(r"/order/([A-Z0-9]+)/", url)
+    if match is None:
+        return None
+    return match.group(1)
+
+
+class PretixClient(object):
+
+    def __init__(self, venue_url, session=None):
+        self.venue_url = venue_url
+        self.session = session or create_session()
+        self.timeout = app.config["PRETIX_HTTP_TIMEOUT"]
+        self.page = None
+
+    def open_shop(self):
+        self.page = self.get(self.venue_url)
+        app.logger.info("http: venue shop opened")
+
+    def choose_slot(self, data_time):
+        shop = self.get(self.venue_url)
+        link = shop.find_slot_link(data_time)
+        if link is None:
+            raise PretixSlotUnavailable(f"slot {data_time} not offered")
+        self.page = self.get(urljoin(shop.url, link["href"]))
+        app.logger.info("http: ticket slot chosen")
+
+    def apply_voucher(self, voucher):
+        voucher_form = self.require_form(field="voucher")
+        self.page = self.submit(voucher_form, {"voucher": voucher})
+        cart_form = self.require_form(button_id="btn-add-to-cart")
+        self.page = self.submit(cart_form)
+        if self.page.is_sold_out():
+            raise PretixSoldOut(f"could not add ticket to cart: {self.page.get_error()}")
+        if self.page.has_error():
+            raise PretixError(f"could not add ticket to cart: {self.page.get_error()}")
+        app.logger.info("http: voucher applied")
+
+    def login(self, email, password):
+        self.page = self.get(f"{self.venue_url}checkout/customer/")
+        if self.page.find_form(field="login-email") is None and not self.page.has_error():
+            app.logger.info("http: venue session still valid, skipping login")
+            return False
+        login_form = self.require_form(field="login-email")
+        self.page = self.submit(login_form, {"customer_mode": "login", "login-email": email, "login-password": password})
+        if self.page.has_error() or self.page.find_form(field="login-email") is not None:
+            raise PretixError("venue login failed")
+        app.logger.info("http: website login completed")
+        return True
+
+    def checkout(self):
+        for _ in range(app.config["PRETIX_HTTP_MAX_CHECKOUT_STEPS"]):
+            confirmation_code = parse_confirmation_code(self.page.url)
+            if confirmation_code is not None:
+                app.logger.info("http: checkout completed")
+                return confirmation_code
+            if self.page.has_error() or not self.page.forms:
+                break
+            form = self.page.forms[-1]
+            self.page = self.submit(form, {name: "on" for name in form.checkboxes})
+        raise PretixError(f"checkout did not reach an order page, stopped at {self.page.url}")
+
+    def require_form(self, field=None, button_id=None):
+        form = self.page.find_form(field=field, button_id=button_id)
+        if form is None:
+            raise PretixError(f"form not found on {self.page.url}")
+        return form
+
+    def get(self, url, params=None):
+        response = self.session.get(url, params=params, timeout=self.timeout)
+        response.raise_for_status()
+        return Page(response.url, response.text)
+
+    def submit(self, form, values=None):
+        data = dict(form.fields)
+        data.update(values or {})
+        url = urljoin(self.page.url, form.action) if form.action else self.page.url
+        if form.method == "post":
+            response = self.session.post(url, data=data, headers={"Referer": self.page.url}, timeout=self.timeout)
+            response.raise_for_status()
+            return Page(response.url, response.text)
+        return self.get(url, params=data)
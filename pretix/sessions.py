@@ -0,0 +1,98 @@
+import base64
+import hashlib
+import json
+import redis
+from functools import lru_cache
+from urllib.parse import urlsplit
+from cryptography.fernet import Fernet, InvalidToken
+from selenium.common.exceptions import WebDriverException
+from app import app
+
+
+def get_fernet():
+    key = app.config["VENUE_SESSION_KEY"]
+    if not key:
+        if not app.config["SECRET_KEY"]:
+            warn_venue_sessions_disabled()
+            return None
+        key = base64.urlsafe_b64encode(hashlib.sha256(f"venue-session:{app.config['SECRET_KEY']}".encode()).digest())
+    return Fernet(key)
+
+
+@lru_cache(maxsize=1)
+def warn_venue_sessions_disabled():
+    app.logger.info("neither VENUE_SESSION_KEY nor SECRET_KEY is set, venue sessions will not be cached")
+
+
+def get_session_key(user_id, venue_url):
+    return f"venue_session:{user_id}:{urlsplit(venue_url).netloc}"
+
+
+def save_venue_cookies(user_id, venue_url, cookies):
+    fernet = get_fernet()
+    if fernet is None:
+        return False
+    token = fernet.encrypt(json.dumps(cookies).encode())
+    try:
+        app.config["COORDINATOR_REDIS"].setex(get_session_key(user_id, venue_url), app.config["VENUE_SESSION_TTL_SECONDS"], token)
+    except redis.RedisError as error:
+        app.logger.info(f"could not store venue session for user {user_id}: {error}")
+        return False
+    app.logger.info(f"stored venue session for user {user_id}, {len(cookies)} cookies")
+    return True
+
+
+def load_venue_cookies(user_id, venue_url):
+    fernet = get_fernet()
+    if fernet is None:
+        return None
+    key = get_session_key(user_id, venue_url)
+    try:
+        token = app.config["COORDINATOR_REDIS"].get(key)
+    except redis.RedisError as error:
+        app.logger.info(f"could not load venue session for user {user_id}: {error}")
+        return None
+    if token is None:
+        return None
+    try:
+        return json.loads(fernet.decrypt(token))
+    except InvalidToken:
+        app.logger.info(f"discarding unreadable venue session for user {user_id}")
+        forget_venue_cookies(user_id, venue_url)
+        return None
+
+
+def forget_venue_cookies(user_id, venue_url):
+    try:
+        app.config["COORDINATOR_REDIS"].delete(get_session_key(user_id, venue_url))
+    except redis.RedisError as error:
+        app.logger.info(f"could not forget venue session for user {user_id}: {error}")
+
+
+def export_http_cookies(session):
+    return [
+        {"name": cookie.name, "value": cookie.value, "domain": cookie.domain, "path": cookie.path, "secure": cookie.secure}
+        for cookie in session.cookies
+    ]
+
+
+def restore_http_cookies(session, cookies):
+    for cookie in cookies:
+        session.cookies.set(cookie["name"], cookie["value"], domain=cookie["domain"], path=cookie["path"], secure=cookie["secure"])
+
+
+def export_driver_cookies(driver, venue_url):
+    cookies = driver.execute_cdp_cmd("Network.getCookies", {"urls": [venue_url]})["cookies"]
+    return [
+        {"name": cookie["name"], "value": cookie["value"], "domain": cookie["domain"], "path": cookie["path"], "secure": cookie["secure"]}
+        for cookie in cookies
+    ]
+
+
+def restore_driver_cookies(driver, cookies):
+    try:
+        driver.execute_cdp_cmd("Network.setCookies", {"cookies": cookies})
+    except WebDriverException as error:
+        app.logger.info(f"could not restore venue session in browser: {error}")
+        return False
+    return True
@@ -0,0 +1,101 @@
+import json
+import time
+import redis
+import requests
+from datetime import datetime, timedelta
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+from app import app
+from pretix.client import create_session
+
+
+class ClockEstimate(object):
+
+    def __init__(self, low, high, rtt):
+        self.low = low
+        self.high = high
+        self.rtt = rtt
+
+    @property
+    def offset(self):
+        return (self.low + self.high) / 2
+
+    @property
+    def error(self):
+        return (self.high - self.low) / 2
+
+    def to_json(self):
+        return json.dumps({"low": self.low, "high": self.high, "rtt": self.rtt})
+
+    @classmethod
+    def from_json(cls, raw):
+        values = json.loads(raw)
+        return cls(values["low"], values["high"], values["rtt"])
+
+
+def sample_clock(session, url):
+    sent = time.time()
+    response = session.head(url, allow_redirects=False, timeout=app.config["CLOCK_SYNC_TIMEOUT"])
+    received = time.time()
+    header = response.headers.get("Date")
+    if header is None:
+        return None
+    server_time = parsedate_to_datetime(header).timestamp()
+    return ClockEstimate(server_time - received, server_time + 1 - sent, received - sent)
+
+
+def estimate_clock_offset(url, session=None):
+    session = session or create_session()
+    samples = app.config["CLOCK_SYNC_SAMPLES"]
+    estimate = None
+    for index in range(samples):
+        sample = sample_clock(session, url)
+        if sample is None:
+            return None
+        if estimate is None:
+            estimate = sample
+        elif sample.low <= estimate.high and sample.high >= estimate.low:
+            estimate = ClockEstimate(max(estimate.low, sample.low), min(estimate.high, sample.high), min(estimate.rtt, sample.rtt))
+        if index < samples - 1:
+            time.sleep(1.0 / samples)
+    return estimate
+
+
+def get_cache_key(url):
+    return f"clock_offset:{urlsplit(url).netloc}"
+
+
+def get_cached_estimate(url):
+    try:
+        raw = app.config["COORDINATOR_REDIS"].get(get_cache_key(url))
+    except redis.RedisError as error:
+        app.logger.info(f"clock offset cache unavailable: {error}")
+        return None
+    return ClockEstimate.from_json(raw) if raw is not None else None
+
+
+def get_clock_offset(url):
+    if url is None:
+        return 0.0
+    estimate = get_cached_estimate(url)
+    if estimate is None:
+        try:
+            estimate = estimate_clock_offset(url)
+        except requests.RequestException as error:
+            app.logger.info(f"could not sample venue clock of {url}: {error}")
+            return 0.0
+        if estimate is None:
+            app.logger.info(f"venue {url} sends no Date header, assuming no clock offset")
+            return 0.0
+        try:
+            app.config["COORDINATOR_REDIS"].setex(get_cache_key(url), app.config["CLOCK_SYNC_TTL_SECONDS"], estimate.to_json())
+        except redis.RedisError as error:
+            app.logger.info(f"could not cache clock offset: {error}")
+        app.logger.info(f"venue clock offset for {url}: {estimate.offset * 1000:.0f}ms +/- {estimate.error * 1000:.0f}ms, rtt {estimate.rtt * 1000:.0f}ms")
+    return estimate.offset
+
+
+def get_venue_now(url):
+    estimate = get_cached_estimate(url) if url is not None else None
+    offset = estimate.offset if estimate is not None else 0.0
+    return datetime.utcnow() + timedelta(seconds=offset)
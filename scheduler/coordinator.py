@@ -0,0 +1,119 @@
+import calendar
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from app import app
+from scheduler.warmstart import wait_until
+
+
+BROWSER_SLOTS_PREFIX = "browser_slots:"
+RELEASE_RESERVATIONS_KEY = "release_reservations"
+
+
+def group_by_release(scheduled_tickets):
+    batches = OrderedDict()
+    for scheduled in scheduled_tickets:
+        batches.setdefault(scheduled.release_at, []).append(scheduled)
+    return batches
+
+
+def get_batch_id(release_at):
+    return release_at.strftime("%Y%m%dT%H%M%S%f")
+
+
+def to_epoch_seconds(release_at):
+    return calendar.timegm(release_at.timetuple()) + release_at.microsecond / 1e6
+
+
+def register_browser_slots(redis, worker, slots):
+    redis.setex(f"{BROWSER_SLOTS_PREFIX}{worker}", app.config["BROWSER_SLOTS_TTL_SECONDS"], slots)
+
+
+def unregister_browser_slots(redis, worker):
+    redis.delete(f"{BROWSER_SLOTS_PREFIX}{worker}")
+
+
+def start_slot_heartbeat(redis, worker, slots):
+    def beat():
+        while True:
+            try:
+                register_browser_slots(redis, worker, slots)
+            except Exception as error:
+                app.logger.info(f"could not advertise browser slots for {worker}: {error}")
+            time.sleep(app.config["BROWSER_SLOTS_TTL_SECONDS"] / 3)
+    thread = threading.Thread(target=beat, name="browser-slot-heartbeat", daemon=True)
+    thread.start()
+    return thread
+
+
+def get_browser_workers(redis):
+    keys = [key.decode() if isinstance(key, bytes) else key for key in redis.scan_iter(f"{BROWSER_SLOTS_PREFIX}*")]
+    if not keys:
+        return {}
+    return {key[len(BROWSER_SLOTS_PREFIX):]: int(value) for key, value in zip(keys, redis.mget(keys)) if value is not None}
+
+
+def get_browser_slots(redis):
+    return sum(get_browser_workers(redis).values())
+
+
+def get_reserved_slots(redis, release_at):
+    fire_at = to_epoch_seconds(release_at)
+    hold = get_slot_hold_seconds()
+    members = redis.zrangebyscore(RELEASE_RESERVATIONS_KEY, fire_at - hold, fire_at + hold)
+    return sum(int((member.decode() if isinstance(member, bytes) else member).split("|")[1]) for member in members)
+
+
+def get_free_slots(redis, release_at):
+    return max(0, get_browser_slots(redis) - get_reserved_slots(redis, release_at))
+
+
+def get_slot_hold_seconds():
+    return app.config["WARM_START_LEAD_SECONDS"] + app.config["RELEASE_SLOT_HOLD_SECONDS"]
+
+
+def reserve_release_slots(redis, release_at, batch_id, size):
+    fire_at = to_epoch_seconds(release_at)
+    redis.zremrangebyscore(RELEASE_RESERVATIONS_KEY, "-inf", time.time() - get_slot_hold_seconds())
+    granted = min(size, get_free_slots(redis, release_at))
+    redis.zadd(RELEASE_RESERVATIONS_KEY, {f"{batch_id}|{granted}|{uuid.uuid4().hex[:8]}": fire_at})
+    if granted < size:
+        app.logger.error(f"release batch {batch_id} needs {size} browser slots but only {granted} are free, "
+                         f"{size - granted} tickets will start late",
+                         extra={"batch_id": batch_id, "tickets": size, "granted": granted, "shortfall": size - granted})
+    return granted
+
+
+class ReleaseBarrier(object):
+
+    def __init__(self, redis, batch_id, offset_seconds=0.0):
+        self.redis = redis
+        self.key = f"release_batch:{batch_id}"
+        self.offset_seconds = offset_seconds
+
+    def open(self, release_at, parties):
+        self.redis.hincrby(self.key, "parties", parties)
+        self.redis.hsetnx(self.key, "fire_at", repr(to_epoch_seconds(release_at)))
+        self.redis.expire(self.key, app.config["RELEASE_BATCH_TTL_SECONDS"])
+
+    def arrive(self):
+        arrived = self.redis.hincrby(self.key, "arrived", 1)
+        parties, fire_at = self.redis.hmget(self.key, "parties", "fire_at")
+        if fire_at is None:
+            return arrived, 0, None
+        return arrived, int(parties), float(fire_at)
+
+    def wait(self):
+        arrived, parties, fire_at = self.arrive()
+        if fire_at is None:
+            app.logger.info(f"{self.key} expired, firing immediately")
+            return False
+        deadline = time.monotonic() + (fire_at - self.offset_seconds - time.time())
+        if deadline <= time.monotonic():
+            app.logger.info(f"{self.key} already released, arrived {arrived}/{parties}")
+            return False
+        app.logger.info(f"{self.key} ready {arrived}/{parties}")
+        lateness = wait_until(deadline)
+        app.logger.info(f"{self.key} released, firing {lateness * 1000:.1f}ms after barrier")
+        return True
@@ -0,0 +1,77 @@
+import os
+import socket
+import uuid
+from collections import namedtuple
+from datetime import timedelta
+from sqlalchemy import or_
+from app import app
+from model.models import db, ScheduledTicket
+
+
+ExecutionLease = namedtuple("ExecutionLease", ["booking_id", "token", "owner", "release_at"])
+
+LEASABLE_STATUSES = ["PENDING", "DISPATCHED", "RUNNING"]
+
+
+class ExecutionLeaseLost(Exception):
+    pass
+
+
+def get_lease_owner():
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:12]}"
+
+
+def acquire_execution_lease(booking_id, current_datetime, owner=None):
+    owner = owner or get_lease_owner()
+    expires_at = current_datetime + timedelta(seconds=app.config["EXECUTION_LEASE_SECONDS"])
+    acquired = db.session.query(ScheduledTicket) \
+        .filter(ScheduledTicket.booking_id == booking_id, ScheduledTicket.status.in_(LEASABLE_STATUSES)) \
+        .filter(or_(ScheduledTicket.lease_expires_at.is_(None), ScheduledTicket.lease_expires_at < current_datetime)) \
+        .update({
+            "lease_token": ScheduledTicket.lease_token + 1,
+            "lease_owner": owner,
+            "lease_expires_at": expires_at,
+            "status": "RUNNING",
+        }, synchronize_session=False)
+    db.session.commit()
+    if not acquired:
+        return None
+    row = db.session.query(ScheduledTicket.lease_token, ScheduledTicket.release_at) \
+        .filter_by(booking_id=booking_id, lease_owner=owner).first()
+    if row is None:
+        return None
+    app.logger.info(f"acquired execution lease for booking_id: {booking_id}, token: {row.lease_token}, owner: {owner}")
+    return ExecutionLease(booking_id, row.lease_token, owner, row.release_at)
+
+
+def holds_execution_lease(lease, current_datetime):
+    return db.session.query(ScheduledTicket.id) \
+        .filter(ScheduledTicket.booking_id == lease.booking_id, ScheduledTicket.lease_token == lease.token,
+                ScheduledTicket.lease_owner == lease.owner, ScheduledTicket.lease_expires_at >= current_datetime) \
+        .first() is not None
+
+
+def renew_execution_lease(lease, current_datetime):
+    expires_at = current_datetime + timedelta(seconds=app.config["EXECUTION_LEASE_SECONDS"])
+    renewed = db.session.query(ScheduledTicket) \
+        .filter(ScheduledTicket.booking_id == lease.booking_id, ScheduledTicket.lease_token == lease.token,
+                ScheduledTicket.lease_owner == lease.owner, ScheduledTicket.lease_expires_at >= current_datetime) \
+        .update({"lease_expires_at": expires_at}, synchronize_session=False)
+    return bool(renewed)
+
+
+def fence_execution_lease(lease, current_datetime):
+    if lease is None or renew_execution_lease(lease, current_datetime):
+        return
+    db.session.rollback()
+    raise ExecutionLeaseLost(f"execution lease for booking_id {lease.booking_id} was taken over, token {lease.token} is stale")
+
+
+def complete_execution_lease(lease, status="EXECUTED"):
+    completed = db.session.query(ScheduledTicket) \
+        .filter(ScheduledTicket.booking_id == lease.booking_id, ScheduledTicket.lease_token == lease.token) \
+        .update({"status": status, "lease_expires_at": None}, synchronize_session=False)
+    db.session.commit()
+    if not completed:
+        app.logger.info(f"execution lease for booking_id: {lease.booking_id} was taken over, token {lease.token} is stale")
+    return bool(completed)
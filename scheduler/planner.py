@@ -0,0 +1,122 @@
+import math
+import redis
+import requests
+from celery.utils import worker_direct
+from collections import namedtuple
+from datetime import timedelta
+from sqlalchemy import and_, func, or_
+from app import app, celery
+from model.models import db, Booking, ScheduledTicket, Venue
+from scheduler.coordinator import get_batch_id, get_browser_workers, get_free_slots
+
+
+DemandSpike = namedtuple("DemandSpike", ["release_at", "venue_type", "tickets", "scheduled"])
+
+
+def get_demand_timeline(start, end):
+    release_at = func.coalesce(ScheduledTicket.release_at, Booking.earliest_ticket_datetime).label("release_at")
+    rows = db.session.query(
+            release_at,
+            Venue.venue_type,
+            func.count(Booking.id).label("tickets"),
+            func.count(ScheduledTicket.id).label("scheduled"),
+        ) \
+        .join(Venue, Venue.id == Booking.venue_id) \
+        .outerjoin(ScheduledTicket, ScheduledTicket.booking_id == Booking.id) \
+        .filter(Booking.confirmation_code.is_(None)) \
+        .filter(or_(ScheduledTicket.id.is_(None), ScheduledTicket.status.in_(["PENDING", "DISPATCHED"]))) \
+        .filter(and_(release_at >= start, release_at <= end)) \
+        .group_by(release_at, Venue.venue_type) \
+        .order_by(release_at) \
+        .all()
+    return [DemandSpike(row.release_at, row.venue_type, row.tickets, row.scheduled) for row in rows]
+
+
+def get_advertised_workers():
+    try:
+        return get_browser_workers(app.config["COORDINATOR_REDIS"])
+    except redis.RedisError as error:
+        app.logger.info(f"could not read advertised browser workers: {error}")
+        return {}
+
+
+def get_slots_per_worker(workers):
+    if workers:
+        return max(1, min(workers.values()))
+    return app.config["CHROME_POOL_SIZE"]
+
+
+def get_required_capacity(tickets, workers=None):
+    return tickets, math.ceil(tickets / get_slots_per_worker(workers))
+
+
+def get_missing_workers(spike, workers):
+    try:
+        free_slots = get_free_slots(app.config["COORDINATOR_REDIS"], spike.release_at)
+    except redis.RedisError as error:
+        app.logger.info(f"could not read free browser slots: {error}")
+        free_slots = 0
+    return math.ceil(max(0, spike.tickets - free_slots) / get_slots_per_worker(workers))
+
+
+def describe_spike(spike):
+    return f"{spike.tickets} tickets at {spike.release_at:%Y-%m-%d %H:%M:%S %a} ({spike.venue_type}, {spike.scheduled} scheduled)"
+
+
+def serialize_spike(spike, advertised=None):
+    browsers, workers = get_required_capacity(spike.tickets, advertised)
+    return {
+        "release_at": spike.release_at.isoformat(),
+        "venue_type": spike.venue_type,
+        "tickets": spike.tickets,
+        "scheduled": spike.scheduled,
+        "browsers": browsers,
+        "workers": workers,
+    }
+
+
+def get_upcoming_spikes(current_datetime):
+    horizon = current_datetime + timedelta(seconds=app.config["CAPACITY_PRESCALE_LEAD_SECONDS"])
+    return [
+        spike for spike in get_demand_timeline(current_datetime, horizon)
+        if spike.tickets >= app.config["CAPACITY_SPIKE_THRESHOLD"]
+    ]
+
+
+def claim_spike(spike):
+    key = f"capacity_prepared:{get_batch_id(spike.release_at)}:{spike.venue_type}"
+    try:
+        return app.config["COORDINATOR_REDIS"].set(key, spike.tickets, nx=True, ex=app.config["RELEASE_BATCH_TTL_SECONDS"])
+    except redis.RedisError as error:
+        app.logger.info(f"could not claim capacity spike {key}: {error}")
+        return True
+
+
+def prepare_capacity(current_datetime):
+    prepared = []
+    for spike in get_upcoming_spikes(current_datetime):
+        if not claim_spike(spike):
+            continue
+        workers = get_advertised_workers()
+        missing = get_missing_workers(spike, workers)
+        if missing:
+            request_scale_up(spike, missing)
+        expires = max(1.0, (spike.release_at - current_datetime).total_seconds())
+        for worker in workers:
+            celery.send_task("app.warm_browsers", queue=worker_direct(worker), expires=expires)
+        app.logger.info(f"preparing capacity for {describe_spike(spike)}: warming {len(workers)} workers, requesting {missing} more")
+        prepared.append(spike)
+    return prepared
+
+
+def request_scale_up(spike, workers):
+    url = app.config["CAPACITY_SCALE_WEBHOOK_URL"]
+    if not url:
+        return False
+    try:
+        response = requests.post(url, json=dict(serialize_spike(spike), missing_workers=workers), timeout=app.config["CAPACITY_SCALE_WEBHOOK_TIMEOUT"])
+        response.raise_for_status()
+    except requests.RequestException as error:
+        app.logger.info(f"scale up request for {describe_spike(spike)} failed: {error}")
+        return False
+    return True
@@ -0,0 +1,71 @@
+from app import app, celery
+from model.models import db, ScheduledTicket
+from scheduler.coordinator import ReleaseBarrier, group_by_release, get_batch_id, reserve_release_slots
+from datetime import timedelta
+
+
+def schedule_ticket(booking_id, user_id, release_at):
+    scheduled = db.session.query(ScheduledTicket).filter_by(booking_id=booking_id).first()
+    if scheduled is None:
+        scheduled = ScheduledTicket(booking_id, user_id, release_at)
+        db.session.add(scheduled)
+    else:
+        scheduled.user_id = user_id
+        scheduled.release_at = release_at
+        scheduled.status = "PENDING"
+        scheduled.dispatched_at = None
+    db.session.commit()
+    app.logger.info(f"scheduled ticket for booking_id: {booking_id}, release_at: {release_at}")
+    return scheduled
+
+
+def schedule_tickets(entries):
+    booking_ids = [booking_id for booking_id, user_id, release_at in entries]
+    existing = {
+        scheduled.booking_id: scheduled
+        for scheduled in db.session.query(ScheduledTicket).filter(ScheduledTicket.booking_id.in_(booking_ids))
+    }
+    for booking_id, user_id, release_at in entries:
+        scheduled = existing.get(booking_id)
+        if scheduled is None:
+            db.session.add(ScheduledTicket(booking_id, user_id, release_at))
+        else:
+            scheduled.user_id = user_id
+            scheduled.release_at = release_at
+            scheduled.status = "PENDING"
+            scheduled.dispatched_at = None
+    db.session.commit()
+    app.logger.info(f"scheduled {len(entries)} tickets in one batch")
+
+
+def get_due_tickets(current_datetime):
+    lead_seconds = app.config["SCHEDULER_DISPATCH_INTERVAL_SECONDS"] + app.config["WARM_START_LEAD_SECONDS"]
+    horizon = current_datetime + timedelta(seconds=lead_seconds)
+    return query_due_tickets(horizon).with_for_update(skip_locked=True).all()
+
+
+def query_due_tickets(horizon):
+    return db.session.query(ScheduledTicket) \
+        .filter(ScheduledTicket.status == "PENDING", ScheduledTicket.release_at <= horizon) \
+        .order_by(ScheduledTicket.release_at)
+
+
+def dispatch_due_tickets(current_datetime):
+    due_tickets = get_due_tickets(current_datetime)
+    for release_at, batch in group_by_release(due_tickets).items():
+        dispatch_release_batch(release_at, batch, current_datetime)
+    db.session.commit()
+    return due_tickets
+
+
+def dispatch_release_batch(release_at, batch, current_datetime):
+    batch_id = get_batch_id(release_at)
+    reserve_release_slots(app.config["COORDINATOR_REDIS"], release_at, batch_id, len(batch))
+    ReleaseBarrier(app.config["COORDINATOR_REDIS"], batch_id).open(release_at, len(batch))
+    for scheduled in batch:
+        celery.send_task("app.execute_ticket", args=[scheduled.booking_id, scheduled.user_id, batch_id])
+        scheduled.status = "DISPATCHED"
+        scheduled.dispatched_at = current_datetime
+    release_in = (release_at - current_datetime).total_seconds()
+    app.logger.info(f"dispatched release batch {batch_id} with {len(batch)} tickets, release in {release_in}s")
+
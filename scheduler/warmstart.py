@@ -0,0 +1,40 @@
+import time
+from datetime import datetime
+from app import app
+
+
+def get_monotonic_deadline(release_at, current_datetime):
+    return time.monotonic() + (release_at - current_datetime).total_seconds()
+
+
+def wait_until(deadline):
+    spin_seconds = app.config["WARM_START_SPIN_SECONDS"]
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return -remaining
+        if remaining > spin_seconds:
+            time.sleep(remaining - spin_seconds)
+        else:
+            time.sleep(0.0005)
+
+
+def wait_for_release(release_at, offset_seconds=0.0):
+    if release_at is None:
+        return False
+    deadline = get_monotonic_deadline(release_at, datetime.utcnow()) - offset_seconds
+    if deadline <= time.monotonic():
+        return False
+    lateness = wait_until(deadline)
+    app.logger.info(f"release reached, firing {lateness * 1000:.1f}ms after {release_at}")
+    return True
+
+
+class ReleaseGate(object):
+
+    def __init__(self, release_at, offset_seconds=0.0):
+        self.release_at = release_at
+        self.offset_seconds = offset_seconds
+
+    def wait(self):
+        return wait_for_release(self.release_at, self.offset_seconds)
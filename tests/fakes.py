@@ -0,0 +1,91 @@
+import fnmatch
+import json
+
+
+class FakePubSub(object):
+
+    def __init__(self, messages):
+        self.messages = messages
+
+    def subscribe(self, channel):
+        self.channel = channel
+
+    def listen(self):
+        for message in self.messages:
+            yield {"type": "message", "data": json.dumps(message)}
+
+
+class FakeRedis(object):
+
+    def __init__(self, messages=()):
+        self.values = {}
+        self.hashes = {}
+        self.sorted_sets = {}
+        self.messages = list(messages)
+
+    def pipeline(self, transaction=True):
+        return self
+
+    def execute(self):
+        return []
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def mget(self, keys):
+        return [self.values.get(key) for key in keys]
+
+    def setex(self, key, ttl, value):
+        self.values[key] = value
+
+    def delete(self, *keys):
+        for key in keys:
+            self.values.pop(key, None)
+            self.hashes.pop(key, None)
+            self.sorted_sets.pop(key, None)
+
+    def expire(self, key, seconds):
+        return True
+
+    def scan_iter(self, pattern):
+        keys = list(self.values) + list(self.hashes) + list(self.sorted_sets)
+        return [key for key in keys if fnmatch.fnmatchcase(key, pattern)]
+
+    def hincrby(self, key, field, amount):
+        values = self.hashes.setdefault(key, {})
+        values[field] = int(values.get(field, 0)) + amount
+        return values[field]
+
+    def hincrbyfloat(self, key, field, amount):
+        values = self.hashes.setdefault(key, {})
+        values[field] = float(values.get(field, 0.0)) + amount
+        return values[field]
+
+    def hsetnx(self, key, field, value):
+        values = self.hashes.setdefault(key, {})
+        if field in values:
+            return 0
+        values[field] = value
+        return 1
+
+    def hmget(self, key, *fields):
+        values = self.hashes.get(key, {})
+        return [values.get(field) for field in fields]
+
+    def hgetall(self, key):
+        return self.hashes.get(key, {})
+
+    def zadd(self, key, mapping):
+        self.sorted_sets.setdefault(key, {}).update(mapping)
+
+    def zrangebyscore(self, key, low, high):
+        members = self.sorted_sets.get(key, {})
+        return [member for member, score in sorted(members.items(), key=lambda item: item[1]) if low <= score <= high]
+
+    def zremrangebyscore(self, key, low, high):
+        members = self.sorted_sets.get(key, {})
+        for member in self.zrangebyscore(key, float(low), float(high)):
+            del members[member]
+
+    def pubsub(self, ignore_subscribe_messages=False):
+        return FakePubSub(self.messages)
@@ -0,0 +1,164 @@
+import json
+import unittest
+from unittest import mock
+from views import *
+from model.models import *
+
+
+class TestListingApi(unittest.TestCase):
+
+    def setUp(self):
+        app.config.from_object("config.TestingConfig")
+        db.session.close()
+        db.drop_all()
+        self.client = app.test_client
+        db.create_all()
+
+    def login(self, current_user, user_id):
+        current_user.return_value = mock.Mock(is_authenticated=True, id=user_id)
+
+    def get_json(self, url):
+        return self.client().get(url, headers={"Content-Type": "application/json"})
+
+    @mock.patch('flask_login.utils._get_user')
+    def test_get_bookings_returns_only_current_users_bookings(self, current_user):
+        self.login(current_user, 1)
+        db.session.add_all([
+            Booking("1", datetime(2022, 4, 1, 20, 0), 1),
+            Booking("1", datetime(2022, 4, 2, 20, 0), 2),
+        ])
+        db.session.commit()
+        data = json.loads(self.get_json("/booking").data)
+        self.assertEqual([booking["user_id"] for booking in data], [1])
+
+    @mock.patch('flask_login.utils._get_user')
+    def test_get_bookings_follows_cursor_to_next_page(self, current_user):
+        self.login(current_user, 1)
+        for day in range(1, 6):
+            db.session.add(Booking("1", datetime(2022, 4, day, 20, 0), 1))
+        db.session.commit()
+
+        first_page = self.get_json("/booking?limit=2")
+        next_url = first_page.headers["Link"].split(">")[0][1:]
+        second_page = self.get_json(next_url)
+        third_page = self.get_json(second_page.headers["Link"].split(">")[0][1:])
+
+        ids = [booking["id"] for page in (first_page, second_page, third_page) for booking in json.loads(page.data)]
+        self.assertEqual(ids, [5, 4, 3, 2, 1])
+        self.assertNotIn("Link", third_page.headers)
+
+    @mock.patch('flask_login.utils._get_user')
+    def test_get_tickets_filters_by_status(self, current_user):
+        self.login(current_user, 1)
+        booking = Booking("1", datetime(2022, 4, 1, 20, 0), 1)
+        db.session.add(booking)
+        db.session.commit()
+        confirmed = Ticket(booking.id, 1)
+        confirmed.status = "CONFIRMED"
+        db.session.add_all([confirmed, Ticket(booking.id, 1)])
+        db.session.commit()
+        data = json.loads(self.get_json("/ticket?status=CONFIRMED").data)
+        self.assertEqual([ticket["status"] for ticket in data], ["CONFIRMED"])
+
+    @mock.patch('flask_login.utils._get_user')
+    def test_given_invalid_cursor_returns_400(self, current_user):
+        self.login(current_user, 1)
+        self.assertEqual(self.get_json("/booking?cursor=notacursor").status_code, 400)
+
+    @mock.patch('flask_login.utils._get_user')
+    def test_get_venues_returns_booking_count_instead_of_bookings(self, current_user):
+        self.login(current_user, 1)
+        venue = Venue("somename", "https://pretix.eu/Baeder/74/", "swimming")
+        db.session.add(venue)
+        db.session.commit()
+        db.session.add_all([Booking(venue.id, datetime(2022, 4, 1, 20, 0), 1), Booking(venue.id, datetime(2022, 4, 2, 20, 0), 2)])
+        db.session.commit()
+        data = json.loads(self.get_json("/venue").data)
+        self.assertEqual(data[0]["bookings"], 2)
+
+    @mock.patch('flask_login.utils._get_user')
+    def test_get_venues_returns_new_etag_given_new_booking(self, current_user):
+        self.login(current_user, 1)
+        venue = Venue("somename", "https://pretix.eu/Baeder/74/", "swimming")
+        db.session.add(venue)
+        db.session.commit()
+        venue_id = venue.id
+        first = self.get_json("/venue")
+        unchanged = self.client().get("/venue", headers={"Content-Type": "application/json", "If-None-Match": first.headers["ETag"]})
+        db.session.add(Booking(venue_id, datetime(2022, 4, 1, 20, 0), 1))
+        db.session.commit()
+        changed = self.client().get("/venue", headers={"Content-Type": "application/json", "If-None-Match": first.headers["ETag"]})
+        self.assertEqual(unchanged.status_code, 304)
+        self.assertEqual(changed.status_code, 200)
+        self.assertEqual(json.loads(changed.data)[0]["bookings"], 1)
+
+    @mock.patch('flask_login.utils._get_user')
+    def test_get_tickets_returns_304_given_matching_etag(self, current_user):
+        self.login(current_user, 1)
+        db.session.add(Ticket(1, 1))
+        db.session.commit()
+        first = self.get_json("/ticket")
+        second = self.client().get("/ticket", headers={"Content-Type": "application/json", "If-None-Match": first.headers["ETag"]})
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(second.data, b"")
+
+    @mock.patch('flask_login.utils._get_user')
+    def test_get_tickets_returns_new_etag_given_status_change(self, current_user):
+        self.login(current_user, 1)
+        ticket = Ticket(1, 1)
+        db.session.add(ticket)
+        db.session.commit()
+        ticket_id = ticket.id
+        first = self.get_json("/ticket")
+        db.session.query(Ticket).filter_by(id=ticket_id).first().status = "CONFIRMED"
+        db.session.commit()
+        second = self.client().get("/ticket", headers={"Content-Type": "application/json", "If-None-Match": first.headers["ETag"]})
+        self.assertEqual(second.status_code, 200)
+        self.assertNotEqual(second.headers["ETag"], first.headers["ETag"])
+        self.assertEqual(json.loads(second.data)[0]["status"], "CONFIRMED")
+
+    @mock.patch('flask_login.utils._get_user')
+    def test_get_tickets_encodes_datetimes_as_iso_8601(self, current_user):
+        self.login(current_user, 1)
+        ticket = Ticket(1, 1)
+        ticket.created_at = datetime(2022, 4, 1, 20, 0, 5)
+        db.session.add(ticket)
+        db.session.commit()
+        data = json.loads(self.get_json("/ticket").data)
+        self.assertEqual(data[0]["created_at"], "2022-04-01T20:00:05")
+
+    @mock.patch('flask_login.utils._get_user')
+    def test_get_booking_of_other_user_returns_404(self, current_user):
+        self.login(current_user, 1)
+        booking = Booking("1", datetime(2022, 4, 1, 20, 0), 2)
+        db.session.add(booking)
+        db.session.commit()
+        self.assertEqual(self.get_json(f"/booking/{booking.id}").status_code, 404)
+        self.assertEqual(self.client().get(f"/booking/{booking.id}").status_code, 404)
+
+    @mock.patch('flask_login.utils._get_user')
+    def test_get_own_booking_returns_it(self, current_user):
+        self.login(current_user, 1)
+        booking = Booking("1", datetime(2022, 4, 1, 20, 0), 1)
+        db.session.add(booking)
+        db.session.commit()
+        response = self.get_json(f"/booking/{booking.id}")
+        self.assertEqual([item["id"] for item in json.loads(response.data)], [booking.id])
+
+    @mock.patch('views.schedule_ticket')
+    @mock.patch('views.run_ticket_task.delay')
+    @mock.patch('flask_login.utils._get_user')
+    def test_create_ticket_for_other_users_booking_returns_404(self, current_user, delay, schedule_ticket):
+        self.login(current_user, 1)
+        booking = Booking("1", datetime(2022, 4, 1, 20, 0), 2)
+        db.session.add(booking)
+        db.session.commit()
+        self.assertEqual(self.client().post(f"/ticket/{booking.id}").status_code, 404)
+        self.assertEqual(db.session.query(Ticket).count(), 0)
+        delay.assert_not_called()
+        schedule_ticket.assert_not_called()
+
+    @mock.patch('flask_login.utils._get_user')
+    def test_create_ticket_for_unknown_booking_returns_404(self, current_user):
+        self.login(current_user, 1)
+        self.assertEqual(self.client().post("/ticket/999").status_code, 404)
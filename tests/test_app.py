@@ -4,6 +4,7 @@ from views import *
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from model.models import *
+from model.context import load_booking_context
 from forms.forms import *
 
 
@@ -25,7 +26,7 @@ class TestApp(unittest.TestCase):
         new_booking = Booking("4", datetime_event_utc, "1")
         db.session.add(new_booking)
         db.session.commit()
-        self.assertEqual(generate_datetime_selector(new_booking.id), ".event-time[data-time='2022-03-07T19:15:00+00:00']")
+        self.assertEqual(generate_datetime_selector(load_booking_context(new_booking.id)), ".event-time[data-time='2022-03-07T19:15:00+00:00']")
 
     def test_returns_confirmation_code_from_url(self):
         with app.app_context():
@@ -46,7 +47,7 @@ class TestApp(unittest.TestCase):
         new_booking.earliest_ticket_datetime = calculate_earliest_ticket_datetime(new_booking)
         db.session.commit()
         current_datetime = datetime(2022, 3, 10, 8, 27, 7, 637999)
-        self.assertFalse(check_if_ticket_possible_now(new_booking.id, current_datetime))
+        self.assertFalse(check_if_ticket_possible_now(load_booking_context(new_booking.id), current_datetime))
 
     def test_should_return_false_given_more_than_96_ahead_2(self):
         datetime_event = datetime(2022, 4, 26, 20, 0)
@@ -57,7 +58,7 @@ class TestApp(unittest.TestCase):
         new_booking.earliest_ticket_datetime = calculate_earliest_ticket_datetime(new_booking)
         db.session.commit()
         current_datetime = datetime(2022, 3, 10, 8, 27, 7, 637999)
-        self.assertFalse(check_if_ticket_possible_now(new_booking.id, current_datetime))
+        self.assertFalse(check_if_ticket_possible_now(load_booking_context(new_booking.id), current_datetime))
 
 
     def test_should_return_true_given_less_than_96_ahead_2(self):
@@ -69,7 +70,7 @@ class TestApp(unittest.TestCase):
         new_booking.earliest_ticket_datetime = calculate_earliest_ticket_datetime(new_booking)
         db.session.commit()
         current_datetime = datetime(2022, 3, 10, 14, 2, 13, 440752)
-        self.assertTrue(check_if_ticket_possible_now(new_booking.id, current_datetime))
+        self.assertTrue(check_if_ticket_possible_now(load_booking_context(new_booking.id), current_datetime))
 
     def test_given_booking_should_return_ticket_time(self):
         datetime_event = datetime(2022, 3, 15, 20, 0).astimezone(pytz.UTC)
@@ -201,7 +202,7 @@ class TestApp(unittest.TestCase):
         db.session.add(bouldering_venue)
         db.session.add(booking)
         db.session.commit()
-        self.assertEqual(generate_datetime_selector(booking.id), "//div[normalize-space()='4']")
+        self.assertEqual(generate_datetime_selector(load_booking_context(booking.id)), "//div[normalize-space()='4']")
 
     def test_given_bouldering_ticket_next_month_returns_correct_datetimeselector(self):
         bouldering_venue = Venue("bla", "blubb", "bouldering")
@@ -209,42 +210,110 @@ class TestApp(unittest.TestCase):
         db.session.add(bouldering_venue)
         db.session.add(booking)
         db.session.commit()
-        self.assertEqual(generate_datetime_selector(booking.id), "//div[normalize-space()='1']")
+        self.assertEqual(generate_datetime_selector(load_booking_context(booking.id)), "//div[normalize-space()='1']")
 
     def test_given_date_is_next_month_returns_true(self):
         booking = Booking("1", datetime(2022, 5, 1, 20, 0), "1")
         db.session.add(booking)
         db.session.commit()
-        self.assertTrue(check_if_next_month(booking.id))
+        self.assertTrue(check_if_next_month(load_booking_context(booking.id)))
 
-    def test_given_timeslot_returns_iterator(self):
+    def test_given_timeslot_returns_slot_start(self):
         bouldering_venue = Venue("bla", "blubb", "bouldering")
         booking = Booking("1", datetime(2022, 4, 5, 14, 45), "1")
         db.session.add(bouldering_venue)
         db.session.add(booking)
         db.session.commit()
-        self.assertEqual(calc_quarter_count(booking.id), 4)
+        self.assertEqual(get_slot_start(load_booking_context(booking.id)), "16:45")
 
-    def test_given_timeslot_returns_iterator_2(self):
+    def test_given_timeslot_on_the_hour_returns_slot_start(self):
         bouldering_venue = Venue("bla", "blubb", "bouldering")
         booking = Booking("1", datetime(2022, 4, 5, 14, 0), "1")
         db.session.add(bouldering_venue)
         db.session.add(booking)
         db.session.commit()
-        self.assertEqual(calc_quarter_count(booking.id), 1)
+        self.assertEqual(get_slot_start(load_booking_context(booking.id)), "16:00")
 
-    def test_given_timeslot_returns_iterator_2(self):
+    def test_given_evening_timeslot_returns_slot_start(self):
         bouldering_venue = Venue("bla", "blubb", "bouldering")
         booking = Booking("1", datetime(2022, 4, 5, 17, 0), "1")
         db.session.add(bouldering_venue)
         db.session.add(booking)
         db.session.commit()
-        self.assertEqual(calc_quarter_count(booking.id), 13)
+        self.assertEqual(get_slot_start(load_booking_context(booking.id)), "19:00")
 
-    def test_given_timeslot_next_day_returns_iterator(self):
+    def test_given_timeslot_next_day_returns_slot_start(self):
         bouldering_venue = Venue("bla", "blubb", "bouldering")
         booking = Booking("1", datetime(2022, 4, 6, 14, 30), "1")
         db.session.add(bouldering_venue)
         db.session.add(booking)
         db.session.commit()
-        self.assertEqual(calc_quarter_count(booking.id), 3)
+        self.assertEqual(get_slot_start(load_booking_context(booking.id)), "16:30")
+
+    def test_given_winter_timeslot_returns_slot_start_in_berlin_time(self):
+        bouldering_venue = Venue("bla", "blubb", "bouldering")
+        booking = Booking("1", datetime(2022, 1, 11, 17, 30), "1")
+        db.session.add(bouldering_venue)
+        db.session.add(booking)
+        db.session.commit()
+        self.assertEqual(get_slot_start(load_booking_context(booking.id)), "18:30")
+
+    def test_given_repeat_until_returns_weekly_dates(self):
+        self.assertEqual(expand_weekly_dates("2022-03-22", "2022-04-05"), ["2022-03-22", "2022-03-29", "2022-04-05"])
+
+    def test_given_repeat_until_before_next_week_returns_single_date(self):
+        self.assertEqual(expand_weekly_dates("2022-03-22", "2022-03-28"), ["2022-03-22"])
+
+    @mock.patch('flask_login.utils._get_user')
+    def test_given_recurring_booking_creates_and_schedules_every_occurrence(self, current_user):
+        current_user.return_value.id = 3
+        venue = Venue("basement", "https://example.com/", "bouldering")
+        db.session.add(venue)
+        db.session.commit()
+
+        bookings = post_recurring_bookings_and_save(str(venue.id), "2022-03-22", "20:00", "2022-04-05")
+
+        datetimes_event = [booking.datetime_event for booking in db.session.query(Booking).order_by(Booking.id)]
+        self.assertEqual(datetimes_event, [datetime(2022, 3, 22, 19, 0), datetime(2022, 3, 29, 18, 0), datetime(2022, 4, 5, 18, 0)])
+        scheduled = db.session.query(ScheduledTicket).order_by(ScheduledTicket.booking_id).all()
+        self.assertEqual([item.booking_id for item in scheduled], [booking.id for booking in bookings])
+
+    @mock.patch('views.run_ticket_task.delay')
+    @mock.patch('flask_login.utils._get_user')
+    def test_given_ticket_possible_now_create_ticket_queues_and_returns_handle(self, current_user, delay):
+        current_user.return_value.id = 3
+        booking = Booking("1", datetime(2022, 3, 22, 19, 0), 3)
+        booking.earliest_ticket_datetime = datetime(2022, 3, 18, 19, 0)
+        db.session.add(booking)
+        db.session.commit()
+        booking_id = booking.id
+
+        with app.test_request_context(f"/ticket/{booking_id}", method="POST"):
+            response = create_ticket(booking_id)
+
+        ticket = db.session.query(Ticket).filter_by(booking_id=booking_id).one()
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.get_json()["ticket_id"], ticket.id)
+        self.assertEqual(response.get_json()["status"], "QUEUED")
+        self.assertEqual(ticket.status, "QUEUED")
+        delay.assert_called_once_with(ticket.id)
+
+    @mock.patch('views.execute_booking')
+    def test_given_queued_ticket_run_ticket_starts_it_in_worker(self, execute_booking):
+        user = User(email="worker@example.com")
+        venue = Venue("pool", "https://example.com/", "swimming")
+        db.session.add_all([user, venue])
+        db.session.commit()
+        booking = Booking(venue.id, datetime(2022, 3, 22, 19, 0), user.id)
+        db.session.add(booking)
+        db.session.commit()
+        ticket = Ticket(booking.id, user.id)
+        ticket.status = "QUEUED"
+        db.session.add(ticket)
+        db.session.commit()
+
+        run_ticket_task(ticket.id)
+
+        self.assertEqual(ticket.status, "STARTED")
+        self.assertIs(execute_booking.call_args.args[1].ticket, ticket)
+        self.assertEqual(db.session.query(Ticket).count(), 1)
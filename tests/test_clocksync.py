@@ -0,0 +1,47 @@
+import time
+import unittest
+from email.utils import formatdate
+from unittest import mock
+from app import app
+from scheduler.clocksync import ClockEstimate, estimate_clock_offset, get_clock_offset, sample_clock
+from benchmarks.pretix_server import StandinVenue, StandinServer, create_pretix_app
+from tests.fakes import FakeRedis
+
+
+class SkewedSession(object):
+
+    def __init__(self, skew_seconds):
+        self.skew_seconds = skew_seconds
+
+    def head(self, url, allow_redirects=False, timeout=None):
+        return mock.Mock(headers={"Date": formatdate(time.time() + self.skew_seconds, usegmt=True)})
+
+
+class TestClockSync(unittest.TestCase):
+
+    def setUp(self):
+        app.config.from_object("config.TestingConfig")
+        app.config["CLOCK_SYNC_SAMPLES"] = 4
+
+    def test_sample_clock_bounds_offset_by_date_resolution_and_round_trip(self):
+        sample = sample_clock(SkewedSession(0), "https://venue.example/")
+        self.assertLessEqual(sample.low, 0)
+        self.assertGreaterEqual(sample.high, 0)
+        self.assertLessEqual(sample.high - sample.low, 1.01)
+
+    def test_given_venue_clock_ahead_estimates_positive_offset(self):
+        estimate = estimate_clock_offset("https://venue.example/", SkewedSession(30))
+        self.assertAlmostEqual(estimate.offset, 30, delta=0.5)
+        self.assertLess(estimate.error, 0.5)
+
+    def test_given_local_standin_estimates_offset_near_zero(self):
+        with StandinServer(create_pretix_app(StandinVenue({}, {}))) as server:
+            estimate = estimate_clock_offset(f"{server.url}/Baeder/74/")
+        self.assertAlmostEqual(estimate.offset, 0, delta=0.5)
+
+    @mock.patch('scheduler.clocksync.estimate_clock_offset', return_value=ClockEstimate(1.5, 2.5, 0.01))
+    def test_get_clock_offset_caches_estimate_per_venue(self, estimate_clock_offset):
+        app.config["COORDINATOR_REDIS"] = FakeRedis()
+        self.assertEqual(get_clock_offset("https://venue.example/Baeder/74/"), 2.0)
+        self.assertEqual(get_clock_offset("https://venue.example/Baeder/75/"), 2.0)
+        estimate_clock_offset.assert_called_once()
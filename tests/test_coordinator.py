@@ -0,0 +1,77 @@
+import threading
+import time
+import unittest
+from datetime import datetime, timedelta
+from app import app
+from scheduler.coordinator import ReleaseBarrier, group_by_release, to_epoch_seconds, register_browser_slots, reserve_release_slots, get_free_slots
+from tests.fakes import FakeRedis
+
+
+class Scheduled(object):
+
+    def __init__(self, booking_id, release_at):
+        self.booking_id = booking_id
+        self.release_at = release_at
+
+
+class TestCoordinator(unittest.TestCase):
+
+    def setUp(self):
+        app.config.from_object("config.TestingConfig")
+        self.redis = FakeRedis()
+
+    def test_group_by_release_keeps_tickets_with_same_release_together(self):
+        release = datetime(2022, 4, 1, 20, 0)
+        tickets = [Scheduled(1, release), Scheduled(2, release + timedelta(minutes=15)), Scheduled(3, release)]
+        batches = group_by_release(tickets)
+        self.assertEqual([[ticket.booking_id for ticket in batch] for batch in batches.values()], [[1, 3], [2]])
+
+    def test_given_overlapping_batches_reserves_only_registered_slots(self):
+        app.config["WARM_START_LEAD_SECONDS"] = 30
+        app.config["RELEASE_SLOT_HOLD_SECONDS"] = 120
+        register_browser_slots(self.redis, "browser@a", 2)
+        register_browser_slots(self.redis, "browser@b", 1)
+        release = datetime.utcnow() + timedelta(minutes=1)
+        self.assertEqual(reserve_release_slots(self.redis, release, "first", 2), 2)
+        with self.assertLogs(app.logger, "ERROR"):
+            self.assertEqual(reserve_release_slots(self.redis, release + timedelta(seconds=15), "second", 2), 1)
+        self.assertEqual(get_free_slots(self.redis, release), 0)
+        self.assertEqual(get_free_slots(self.redis, release + timedelta(hours=1)), 3)
+
+    def test_given_no_browser_workers_reserves_nothing(self):
+        with self.assertLogs(app.logger, "ERROR"):
+            self.assertEqual(reserve_release_slots(self.redis, datetime.utcnow(), "batch", 1), 0)
+
+    def test_given_batch_opened_twice_keeps_first_fire_time_and_adds_parties(self):
+        barrier = ReleaseBarrier(self.redis, "batch")
+        barrier.open(datetime(2022, 4, 1, 20, 0), 2)
+        barrier.open(datetime(2022, 4, 1, 20, 5), 3)
+        arrived, parties, fire_at = barrier.arrive()
+        self.assertEqual((arrived, parties), (1, 5))
+        self.assertEqual(fire_at, to_epoch_seconds(datetime(2022, 4, 1, 20, 0)))
+
+    def test_given_released_barrier_does_not_wait(self):
+        barrier = ReleaseBarrier(self.redis, "batch")
+        barrier.open(datetime.utcnow() - timedelta(seconds=5), 1)
+        self.assertFalse(barrier.wait())
+
+    def test_given_expired_barrier_does_not_wait(self):
+        self.assertFalse(ReleaseBarrier(self.redis, "missing").wait())
+
+    def test_parties_of_one_batch_fire_within_a_few_milliseconds(self):
+        release_at = datetime.utcnow() + timedelta(milliseconds=200)
+        ReleaseBarrier(self.redis, "batch").open(release_at, 3)
+        fired = []
+
+        def run():
+            ReleaseBarrier(self.redis, "batch").wait()
+            fired.append(time.time())
+
+        workers = [threading.Thread(target=run) for _ in range(3)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        fired.sort()
+        self.assertGreaterEqual(fired[0], to_epoch_seconds(release_at))
+        self.assertLess(fired[-1] - fired[0], 0.01)
@@ -0,0 +1,99 @@
+import json
+import queue
+import unittest
+import redis
+from unittest import mock
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import QueuePool
+from app import app
+from model.models import db
+import views
+from api.events import TicketEventHub, publish_ticket_event, format_sse
+from tests.fakes import FakeRedis
+
+
+class Ticket(object):
+
+    def __init__(self, id, booking_id, user_id, status):
+        self.id = id
+        self.booking_id = booking_id
+        self.user_id = user_id
+        self.status = status
+
+
+class TestTicketEvents(unittest.TestCase):
+
+    def setUp(self):
+        app.config.from_object("config.TestingConfig")
+
+    def test_publish_ticket_event_publishes_status_and_step_on_channel(self):
+        client = mock.Mock()
+        app.config["EVENTS_REDIS"] = client
+        publish_ticket_event(Ticket(7, 3, 1, "STARTED"), "slot_chosen")
+        channel, payload = client.publish.call_args.args
+        self.assertEqual(channel, app.config["TICKET_EVENTS_CHANNEL"])
+        self.assertEqual(json.loads(payload)["status"], "STARTED")
+        self.assertEqual(json.loads(payload)["step"], "slot_chosen")
+
+    def test_format_sse_returns_named_event_with_json_data(self):
+        self.assertEqual(format_sse({"ticket_id": 7}), 'event: ticket\ndata: {"ticket_id":7}\n\n')
+
+    def test_hub_delivers_events_only_to_listeners_of_that_user(self):
+        hub = TicketEventHub(FakeRedis(), "ticket-events")
+        hub.thread = mock.Mock(is_alive=lambda: True)
+        mine = hub.subscribe(1)
+        other = hub.subscribe(2)
+        hub.deliver({"user_id": 1, "ticket_id": 7, "status": "CONFIRMED"})
+        self.assertEqual(mine.get_nowait()["status"], "CONFIRMED")
+        self.assertRaises(queue.Empty, other.get_nowait)
+
+    def test_given_many_listeners_hub_uses_one_subscription(self):
+        hub = TicketEventHub(FakeRedis([{"user_id": 1, "ticket_id": 7, "status": "CONFIRMED"}]), "ticket-events")
+        hub.thread = mock.Mock(is_alive=lambda: True)
+        listeners = [hub.subscribe(1) for _ in range(3)]
+        hub.listen()
+        self.assertEqual([listener.get_nowait()["ticket_id"] for listener in listeners], [7, 7, 7])
+
+    def test_given_lost_connection_hub_resubscribes_with_backoff(self):
+        redis_client = FakeRedis([{"user_id": 1, "ticket_id": 7, "status": "CONFIRMED"}])
+        pubsub = redis_client.pubsub
+        redis_client.pubsub = mock.Mock(side_effect=[redis.ConnectionError("reset"), pubsub()])
+        hub = TicketEventHub(redis_client, "ticket-events")
+        hub.thread = mock.Mock(is_alive=lambda: True)
+        listener = hub.subscribe(1)
+        with mock.patch("api.events.time.sleep", side_effect=[None, KeyboardInterrupt]) as sleep:
+            with self.assertRaises(KeyboardInterrupt):
+                hub.run()
+        self.assertEqual(listener.get_nowait()["ticket_id"], 7)
+        self.assertEqual([call.args[0] for call in sleep.call_args_list], [0.5, 1.0])
+
+    def test_stream_sends_keepalive_and_unsubscribes_when_closed(self):
+        app.config["TICKET_EVENTS_HEARTBEAT_SECONDS"] = 0.01
+        hub = TicketEventHub(FakeRedis(), "ticket-events")
+        hub.thread = mock.Mock(is_alive=lambda: True)
+        stream = hub.stream(1)
+        self.assertEqual(next(stream), "retry: 3000\n\n")
+        self.assertEqual(next(stream), ": keepalive\n\n")
+        stream.close()
+        self.assertEqual(hub.listeners, {})
+
+    @mock.patch('flask_login.utils._get_user')
+    def test_open_stream_holds_no_database_connection(self, current_user):
+        app.config.from_object("config.TestingConfig")
+        engine = create_engine(app.config["SQLALCHEMY_DATABASE_URI"], poolclass=QueuePool)
+        hub = TicketEventHub(FakeRedis(), "ticket-events")
+        hub.thread = mock.Mock(is_alive=lambda: True)
+
+        def load_user():
+            db.session.execute(text("select 1"))
+            return mock.Mock(is_authenticated=True, id=1)
+        current_user.side_effect = load_user
+        db.session.remove()
+        with mock.patch.object(db, "get_engine", return_value=engine), mock.patch('views.ticket_event_hub', hub):
+            response = app.test_client().get("/ticket/events")
+            stream = iter(response.response)
+            self.assertEqual(next(stream), b"retry: 3000\n\n")
+            self.assertEqual(engine.pool.checkedout(), 0)
+            self.assertIn(1, hub.listeners)
+            response.close()
+        self.assertEqual(hub.listeners, {})
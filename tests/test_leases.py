@@ -0,0 +1,103 @@
+import unittest
+from unittest import mock
+from views import *
+from model.models import *
+from scheduler.leases import ExecutionLeaseLost, acquire_execution_lease, holds_execution_lease, complete_execution_lease
+from scheduler.scheduler import schedule_ticket
+
+
+class TestExecutionLeases(unittest.TestCase):
+
+    def setUp(self):
+        app.config.from_object("config.TestingConfig")
+        app.config["EXECUTION_LEASE_SECONDS"] = 600
+        db.session.close()
+        db.drop_all()
+        db.create_all()
+        self.user = User(email="lease@example.com")
+        self.venue = Venue("pool", "https://example.com/", "swimming")
+        db.session.add_all([self.user, self.venue])
+        db.session.commit()
+        self.booking = Booking(self.venue.id, datetime(2022, 4, 5, 20, 0), self.user.id)
+        db.session.add(self.booking)
+        db.session.commit()
+        self.booking_id, self.user_id = self.booking.id, self.user.id
+        schedule_ticket(self.booking_id, self.user_id, datetime(2022, 4, 1, 20, 0))
+
+    def test_given_running_lease_second_executor_returns_none(self):
+        lease = acquire_execution_lease(self.booking_id, datetime(2022, 4, 1, 19, 59))
+        self.assertEqual(lease.token, 1)
+        self.assertEqual(lease.release_at, datetime(2022, 4, 1, 20, 0))
+        self.assertIsNone(acquire_execution_lease(self.booking_id, datetime(2022, 4, 1, 20, 0)))
+
+    def test_given_expired_lease_takeover_fences_out_first_executor(self):
+        first = acquire_execution_lease(self.booking_id, datetime(2022, 4, 1, 19, 59))
+        second = acquire_execution_lease(self.booking_id, datetime(2022, 4, 1, 20, 10))
+        self.assertEqual(second.token, first.token + 1)
+        self.assertFalse(holds_execution_lease(first, datetime(2022, 4, 1, 20, 10)))
+        self.assertTrue(holds_execution_lease(second, datetime(2022, 4, 1, 20, 10)))
+        self.assertFalse(complete_execution_lease(first))
+        self.assertTrue(complete_execution_lease(second))
+
+    def test_given_executed_booking_returns_no_lease(self):
+        complete_execution_lease(acquire_execution_lease(self.booking_id, datetime(2022, 4, 1, 19, 59)))
+        self.assertIsNone(acquire_execution_lease(self.booking_id, datetime(2022, 4, 2, 20, 0)))
+        self.assertEqual(db.session.query(ScheduledTicket.status).scalar(), "EXECUTED")
+
+    @mock.patch('views.get_clock_offset', return_value=0.0)
+    @mock.patch('views.start_ticket')
+    def test_given_redelivered_execute_task_starts_ticket_once(self, start_ticket, get_clock_offset):
+        execute_ticket_task(self.booking_id, self.user_id)
+        execute_ticket_task(self.booking_id, self.user_id)
+        self.assertEqual(start_ticket.call_count, 1)
+        self.assertEqual(start_ticket.call_args.kwargs["lease"].token, 1)
+
+    @mock.patch('views.execute_booking')
+    def test_given_stale_lease_start_ticket_creates_no_ticket(self, execute_booking):
+        first = acquire_execution_lease(self.booking_id, datetime.utcnow() - timedelta(hours=1))
+        acquire_execution_lease(self.booking_id, datetime.utcnow())
+        start_ticket(load_booking_context(self.booking_id), self.user, lease=first)
+        execute_booking.assert_not_called()
+        self.assertEqual(db.session.query(Ticket).count(), 0)
+
+    @mock.patch('views.execute_booking')
+    def test_given_redelivered_run_task_starts_ticket_once(self, execute_booking):
+        ticket = Ticket(self.booking_id, self.user_id)
+        ticket.status = "QUEUED"
+        db.session.add(ticket)
+        db.session.commit()
+        run_ticket_task(ticket.id)
+        run_ticket_task(ticket.id)
+        self.assertEqual(execute_booking.call_count, 1)
+        self.assertEqual(db.session.query(Ticket).count(), 1)
+
+    def test_given_held_lease_write_renews_it(self):
+        lease = acquire_execution_lease(self.booking_id, datetime.utcnow() - timedelta(minutes=9))
+        save_confirmation_code(load_booking_context(self.booking_id), "WMHPW", lease)
+        self.assertEqual(db.session.query(Booking.confirmation_code).scalar(), "WMHPW")
+        self.assertTrue(holds_execution_lease(lease, datetime.utcnow() + timedelta(minutes=5)))
+
+    def test_given_stale_lease_writes_are_fenced_out(self):
+        first = acquire_execution_lease(self.booking_id, datetime.utcnow() - timedelta(hours=1))
+        ticket = Ticket(self.booking_id, self.user_id)
+        db.session.add(ticket)
+        db.session.commit()
+        acquire_execution_lease(self.booking_id, datetime.utcnow())
+        with self.assertRaises(ExecutionLeaseLost):
+            save_confirmation_code(load_booking_context(self.booking_id), "WMHPW", first)
+        with self.assertRaises(ExecutionLeaseLost):
+            update_ticket_status(ticket, "CONFIRMED", first)
+        self.assertIsNone(db.session.query(Booking.confirmation_code).scalar())
+        self.assertEqual(db.session.query(Ticket.status).scalar(), "STARTED")
+
+    @mock.patch('views.get_clock_offset', return_value=0.0)
+    @mock.patch('views.execute_booking')
+    def test_given_lease_taken_over_mid_run_execute_task_stops_quietly(self, execute_booking, get_clock_offset):
+        def taken_over(adapter, booking_run):
+            db.session.query(ScheduledTicket).update({"lease_token": ScheduledTicket.lease_token + 1})
+            db.session.commit()
+            update_ticket_status(booking_run.ticket, "CONFIRMED", booking_run.lease)
+        execute_booking.side_effect = taken_over
+        execute_ticket_task(self.booking_id, self.user_id)
+        self.assertEqual(db.session.query(ScheduledTicket.status).scalar(), "RUNNING")
+        self.assertEqual(db.session.query(Ticket.status).scalar(), "STARTED")
@@ -0,0 +1,35 @@
+import unittest
+from selenium.common.exceptions import TimeoutException
+from app import app
+from metrics.steps import timed_step, step_timer, set_step_venue, render_step_metrics
+from tests.fakes import FakeRedis
+
+
+class TestStepMetrics(unittest.TestCase):
+
+    def setUp(self):
+        app.config.from_object("config.TestingConfig")
+        self.redis = FakeRedis()
+        app.config["METRICS_REDIS"] = self.redis
+        app.config["METRICS_STEP_BUCKETS"] = [0.5, 10]
+        set_step_venue("swimming")
+
+    def test_given_step_succeeds_records_ok_histogram(self):
+        timed_step("apply_voucher")(lambda: None)()
+        values = self.redis.hashes["metrics:booking_step:apply_voucher|swimming|ok"]
+        self.assertEqual((values["le:0.5"], values["le:10"], values["count"]), (1, 1, 1))
+
+    def test_given_step_times_out_records_timeout_and_reraises(self):
+        with self.assertRaises(TimeoutException):
+            with step_timer("complete_checkout"):
+                raise TimeoutException()
+        self.assertIn("metrics:booking_step:complete_checkout|swimming|timeout", self.redis.hashes)
+
+    def test_render_step_metrics_returns_prometheus_histogram(self):
+        with step_timer("download_pdf"):
+            pass
+        text = render_step_metrics(self.redis)
+        self.assertIn("# TYPE chelonia_booking_step_seconds histogram", text)
+        self.assertIn('chelonia_booking_step_seconds_bucket{step="download_pdf",venue="swimming",outcome="ok",le="0.5"} 1', text)
+        self.assertIn('chelonia_booking_step_seconds_bucket{step="download_pdf",venue="swimming",outcome="ok",le="+Inf"} 1', text)
+        self.assertIn('chelonia_booking_step_seconds_count{step="download_pdf",venue="swimming",outcome="ok"} 1', text)
@@ -1,8 +1,11 @@
+import time
 import unittest
 from model.models import *
 from views import *
 from werkzeug.security import generate_password_hash, check_password_hash
 from flask_login import current_user
+from sqlalchemy import event
+from model.context import load_booking_context
 
 
 class TestBooking(unittest.TestCase):
@@ -75,3 +78,46 @@ class TestBooking(unittest.TestCase):
                 db.session.commit()
                 self.assertEqual(ticket.booking_id, booking.id)
 
+
+    def test_booking_context_loads_booking_and_venue_in_one_query(self):
+        venue = Venue("somename", "https://pretix.eu/Baeder/74/", "swimming")
+        db.session.add(venue)
+        db.session.commit()
+        booking = Booking(venue.id, datetime(2022, 3, 11, 20, 0), "1")
+        db.session.add(booking)
+        db.session.commit()
+        booking_id = booking.id
+        statements = []
+        listener = lambda *args: statements.append(args[2])
+        event.listen(db.engine, "before_cursor_execute", listener)
+        try:
+            context = load_booking_context(booking_id)
+        finally:
+            event.remove(db.engine, "before_cursor_execute", listener)
+        self.assertEqual(len(statements), 1)
+        self.assertEqual(context.venue_url, "https://pretix.eu/Baeder/74/")
+        self.assertEqual(context.venue_type, "swimming")
+
+    def test_booking_context_is_immutable(self):
+        booking = Booking("1", datetime(2022, 3, 11, 20, 0), "1")
+        db.session.add(booking)
+        db.session.commit()
+        context = load_booking_context(booking.id)
+        with self.assertRaises(AttributeError):
+            context.venue_url = "https://example.com/"
+
+    def test_given_tickets_inserted_at_different_times_stores_each_creation_time(self):
+        booking = Booking("1", datetime(2022, 3, 11, 20, 0), "1")
+        db.session.add(booking)
+        db.session.commit()
+        first = Ticket(booking.id, 1)
+        db.session.add(first)
+        db.session.commit()
+        time.sleep(0.01)
+        second = Ticket(booking.id, 1)
+        later_booking = Booking("1", datetime(2022, 3, 12, 20, 0), "1")
+        db.session.add_all([second, later_booking])
+        db.session.commit()
+        self.assertLess(first.created_at, second.created_at)
+        self.assertLess(booking.created_at, later_booking.created_at)
+        self.assertEqual(db.session.query(Ticket.id).filter(Ticket.created_at > first.created_at).all(), [(second.id,)])
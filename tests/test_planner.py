@@ -0,0 +1,124 @@
+import unittest
+from unittest import mock
+from views import *
+from model.models import *
+from celery.utils import worker_direct
+from scheduler.planner import get_demand_timeline, get_required_capacity, prepare_capacity, describe_spike
+from scheduler.coordinator import register_browser_slots
+from tests.fakes import FakeRedis
+from scheduler.scheduler import schedule_ticket
+
+
+class TestPlanner(unittest.TestCase):
+
+    def setUp(self):
+        app.config.from_object("config.TestingConfig")
+        app.config["CHROME_POOL_SIZE"] = 2
+        app.config["CAPACITY_SPIKE_THRESHOLD"] = 2
+        app.config["CAPACITY_PRESCALE_LEAD_SECONDS"] = 600
+        app.config["CAPACITY_SCALE_WEBHOOK_URL"] = None
+        db.session.close()
+        db.drop_all()
+        db.create_all()
+        self.venue = Venue("Boulderhalle", "https://example.com", "bouldering")
+        db.session.add(self.venue)
+        db.session.commit()
+
+    def add_booking(self, release_at, confirmation_code=None):
+        booking = Booking(self.venue.id, release_at + timedelta(days=7), 1)
+        booking.earliest_ticket_datetime = release_at
+        booking.confirmation_code = confirmation_code
+        db.session.add(booking)
+        db.session.commit()
+        return booking
+
+    def test_given_pending_bookings_returns_demand_per_release(self):
+        release_at = datetime(2022, 4, 5, 18, 0)
+        for _ in range(3):
+            self.add_booking(release_at)
+        self.add_booking(release_at, confirmation_code="ABC12")
+        self.add_booking(datetime(2022, 4, 6, 18, 0))
+
+        timeline = get_demand_timeline(datetime(2022, 4, 5, 0, 0), datetime(2022, 4, 7, 0, 0))
+
+        self.assertEqual([(spike.release_at, spike.tickets) for spike in timeline],
+                         [(release_at, 3), (datetime(2022, 4, 6, 18, 0), 1)])
+        self.assertEqual(describe_spike(timeline[0]), "3 tickets at 2022-04-05 18:00:00 Tue (bouldering, 0 scheduled)")
+
+    def test_given_scheduled_ticket_returns_scheduled_release(self):
+        booking = self.add_booking(datetime(2022, 4, 5, 18, 0))
+        schedule_ticket(booking.id, 1, datetime(2022, 4, 5, 18, 0, 30))
+
+        timeline = get_demand_timeline(datetime(2022, 4, 5, 0, 0), datetime(2022, 4, 7, 0, 0))
+
+        self.assertEqual([(spike.release_at, spike.scheduled) for spike in timeline], [(datetime(2022, 4, 5, 18, 0, 30), 1)])
+
+    def test_given_executed_ticket_returns_no_demand(self):
+        booking = self.add_booking(datetime(2022, 4, 5, 18, 0))
+        schedule_ticket(booking.id, 1, datetime(2022, 4, 5, 18, 0)).status = "EXECUTED"
+        db.session.commit()
+        self.assertEqual(get_demand_timeline(datetime(2022, 4, 5, 0, 0), datetime(2022, 4, 7, 0, 0)), [])
+
+    @mock.patch('scheduler.planner.request_scale_up')
+    @mock.patch('scheduler.planner.claim_spike', return_value=True)
+    @mock.patch('scheduler.planner.celery.send_task')
+    def test_given_spike_within_lead_warms_each_browser_worker(self, send_task, claim, request_scale_up):
+        redis = FakeRedis()
+        register_browser_slots(redis, "celery@browser-1", 2)
+        register_browser_slots(redis, "celery@browser-2", 2)
+        for _ in range(3):
+            self.add_booking(datetime(2022, 4, 5, 18, 0))
+        self.add_booking(datetime(2022, 4, 5, 19, 0))
+
+        with mock.patch.dict(app.config, {"COORDINATOR_REDIS": redis}):
+            prepared = prepare_capacity(datetime(2022, 4, 5, 17, 55))
+
+        self.assertEqual([spike.tickets for spike in prepared], [3])
+        self.assertEqual(sorted(call.kwargs["queue"].name for call in send_task.call_args_list),
+                         [worker_direct("celery@browser-1").name, worker_direct("celery@browser-2").name])
+        send_task.assert_called_with("app.warm_browsers", queue=mock.ANY, expires=300.0)
+        request_scale_up.assert_not_called()
+
+    @mock.patch('scheduler.planner.request_scale_up')
+    @mock.patch('scheduler.planner.claim_spike', return_value=True)
+    @mock.patch('scheduler.planner.celery.send_task')
+    def test_given_spike_above_free_slots_requests_missing_workers(self, send_task, claim, request_scale_up):
+        redis = FakeRedis()
+        register_browser_slots(redis, "celery@browser-1", 2)
+        for _ in range(7):
+            self.add_booking(datetime(2022, 4, 5, 18, 0))
+
+        with mock.patch.dict(app.config, {"COORDINATOR_REDIS": redis}):
+            prepared = prepare_capacity(datetime(2022, 4, 5, 17, 55))
+
+        request_scale_up.assert_called_once_with(prepared[0], 3)
+
+    def test_given_advertised_workers_returns_workers_from_their_slots(self):
+        self.assertEqual(get_required_capacity(9, {"celery@browser-1": 3, "celery@browser-2": 4}), (9, 3))
+        self.assertEqual(get_required_capacity(9), (9, 5))
+
+    @mock.patch('scheduler.planner.claim_spike', return_value=False)
+    @mock.patch('scheduler.planner.celery.send_task')
+    def test_given_prepared_spike_sends_nothing(self, send_task, claim):
+        for _ in range(3):
+            self.add_booking(datetime(2022, 4, 5, 18, 0))
+        self.assertEqual(prepare_capacity(datetime(2022, 4, 5, 17, 55)), [])
+        send_task.assert_not_called()
+
+    @mock.patch('flask_login.utils._get_user')
+    def test_capacity_endpoint_returns_timeline(self, current_user):
+        current_user.return_value = mock.Mock(is_authenticated=True, id=1)
+        with mock.patch('views.get_demand_timeline', return_value=[]) as timeline, \
+                mock.patch('views.get_advertised_workers', return_value={}):
+            response = app.test_client().get("/capacity?hours=24")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()["spikes"], [])
+        start, end = timeline.call_args[0]
+        self.assertEqual(end - start, timedelta(hours=24))
+
+    def test_given_no_login_capacity_endpoint_returns_unauthorized(self):
+        with mock.patch.object(login_manager, "unauthorized", return_value=("", 401)), \
+                mock.patch('views.get_demand_timeline') as timeline:
+            response = app.test_client().get("/capacity")
+        self.assertEqual(response.status_code, 401)
+        timeline.assert_not_called()
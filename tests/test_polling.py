@@ -0,0 +1,60 @@
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+from selenium.common.exceptions import NoSuchElementException
+from app import app
+from browser.polling import poll_until_available, get_poll_deadline
+from pretix.client import PretixError, PretixSlotUnavailable
+
+
+class TestPolling(unittest.TestCase):
+
+    def setUp(self):
+        app.config.from_object("config.TestingConfig")
+        app.config["RELEASE_POLL_INTERVAL_SECONDS"] = 0.01
+        app.config["RELEASE_POLL_WINDOW_SECONDS"] = 1
+
+    def test_given_release_long_past_returns_no_deadline(self):
+        self.assertIsNone(get_poll_deadline(datetime(2022, 4, 1, 20, 0), datetime(2022, 4, 1, 20, 5)))
+
+    def test_given_slot_appears_later_returns_step_result(self):
+        driver = mock.Mock()
+        step = mock.Mock(side_effect=[NoSuchElementException(), NoSuchElementException(), "slot"])
+        result = poll_until_available(driver, datetime.utcnow(), step)
+        self.assertEqual(result, "slot")
+        self.assertEqual(driver.refresh.call_count, 2)
+
+    def test_given_probe_misses_slot_does_not_reload(self):
+        driver = mock.Mock()
+        driver.execute_async_script.side_effect = [False, False, True]
+        step = mock.Mock(side_effect=[NoSuchElementException(), "slot"])
+        self.assertEqual(poll_until_available(driver, datetime.utcnow(), step, marker="19:15"), "slot")
+        self.assertEqual(driver.execute_async_script.call_count, 3)
+        driver.refresh.assert_called_once()
+
+    def test_given_release_outside_window_raises_without_polling(self):
+        driver = mock.Mock()
+        step = mock.Mock(side_effect=NoSuchElementException())
+        with self.assertRaises(NoSuchElementException):
+            poll_until_available(driver, datetime.utcnow() - timedelta(minutes=5), step)
+        step.assert_called_once()
+        driver.refresh.assert_not_called()
+
+    def test_given_slot_never_appears_raises_after_window(self):
+        app.config["RELEASE_POLL_WINDOW_SECONDS"] = 0.1
+        driver = mock.Mock()
+        step = mock.Mock(side_effect=NoSuchElementException())
+        with self.assertRaises(NoSuchElementException):
+            poll_until_available(driver, datetime.utcnow(), step)
+        self.assertGreater(step.call_count, 2)
+
+    def test_given_http_slot_appears_on_second_poll_returns_step_result(self):
+        step = mock.Mock(side_effect=[PretixSlotUnavailable("slot not offered"), "slot"])
+        self.assertEqual(poll_until_available(None, datetime.utcnow(), step, unavailable=(PretixSlotUnavailable,)), "slot")
+        self.assertEqual(step.call_count, 2)
+
+    def test_given_other_http_error_raises_without_polling(self):
+        step = mock.Mock(side_effect=PretixError("form not found"))
+        with self.assertRaises(PretixError):
+            poll_until_available(None, datetime.utcnow(), step, unavailable=(PretixSlotUnavailable,))
+        step.assert_called_once()
@@ -0,0 +1,92 @@
+import unittest
+from unittest import mock
+from selenium.common.exceptions import WebDriverException
+import threading
+from app import app
+from browser.pool import DriverPool, DriverPoolExhausted, start_warmup
+from celery.concurrency.prefork import TaskPool as PreforkPool
+import views
+
+
+def make_driver(healthy=True):
+    driver = mock.Mock()
+    driver.window_handles = ["main"]
+    if healthy:
+        driver.execute_script.return_value = 1
+    else:
+        driver.execute_script.side_effect = WebDriverException("chrome not reachable")
+    return driver
+
+
+class TestDriverPool(unittest.TestCase):
+
+    def test_warm_creates_pool_size_drivers(self):
+        factory = mock.Mock(side_effect=lambda: make_driver())
+        pool = DriverPool(factory, 3)
+        pool.warm()
+        self.assertEqual(factory.call_count, 3)
+        self.assertEqual(pool.idle.qsize(), 3)
+
+    def test_start_warmup_returns_before_drivers_are_ready(self):
+        release = threading.Event()
+        factory = mock.Mock(side_effect=lambda: release.wait(5) and make_driver())
+        pool = DriverPool(factory, 1)
+        thread = start_warmup(pool)
+        self.assertEqual(pool.idle.qsize(), 0)
+        release.set()
+        thread.join(5)
+        self.assertEqual(pool.idle.qsize(), 1)
+
+    def test_checkout_reuses_warm_driver(self):
+        factory = mock.Mock(side_effect=lambda: make_driver())
+        pool = DriverPool(factory, 1)
+        pool.warm()
+        with pool.checkout() as first:
+            pass
+        with pool.checkout() as second:
+            pass
+        self.assertIs(first, second)
+        self.assertEqual(factory.call_count, 1)
+
+    def test_checkin_resets_cookies_and_page(self):
+        pool = DriverPool(make_driver, 1)
+        with pool.checkout() as driver:
+            pass
+        driver.execute_cdp_cmd.assert_called_with("Network.clearBrowserCookies", {})
+        driver.get.assert_called_with("about:blank")
+
+    def test_checkout_replaces_unhealthy_driver(self):
+        unhealthy = make_driver(healthy=False)
+        healthy = make_driver()
+        pool = DriverPool(mock.Mock(side_effect=[unhealthy, healthy]), 1)
+        pool.warm()
+        with pool.checkout() as driver:
+            self.assertIs(driver, healthy)
+        unhealthy.quit.assert_called_once()
+
+    def test_checkout_raises_given_pool_exhausted(self):
+        pool = DriverPool(make_driver, 1, checkout_timeout=0.01)
+        with pool.checkout():
+            with self.assertRaises(DriverPoolExhausted):
+                pool.acquire()
+
+
+class TestWorkerDriverPool(unittest.TestCase):
+
+    def test_given_worker_returns_driver_pool_sized_from_config(self):
+        with mock.patch.dict(app.config, {"CHROME_POOL_SIZE": 3}):
+            pool = views.create_driver_pool()
+        self.assertIsInstance(pool, DriverPool)
+        self.assertEqual(pool.size, 3)
+
+    @mock.patch('views.get_consumed_queues', return_value=["browser"])
+    @mock.patch('views.start_warmup')
+    def test_given_thread_pool_worker_ready_warms_shared_pool(self, start_warmup, get_consumed_queues):
+        views.warm_shared_driver_pool(sender=mock.Mock(pool=mock.Mock()))
+        start_warmup.assert_called_once_with(views.driver_pool)
+
+    @mock.patch('views.get_consumed_queues', return_value=["browser"])
+    @mock.patch('views.start_warmup')
+    def test_given_prefork_worker_ready_leaves_warm_up_to_children(self, start_warmup, get_consumed_queues):
+        views.warm_shared_driver_pool(sender=mock.Mock(pool=mock.Mock(spec=PreforkPool)))
+        start_warmup.assert_not_called()
@@ -0,0 +1,178 @@
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+from app import app
+from views import start_ticket
+from model.models import db, User, Venue, Booking, Ticket
+from model.context import load_booking_context
+from pretix.client import Page, PretixClient, PretixError, PretixSoldOut, parse_confirmation_code
+from pretix.sessions import save_venue_cookies, load_venue_cookies, export_http_cookies, restore_http_cookies
+from benchmarks.pretix_server import StandinVenue, StandinServer, create_pretix_app
+from tests.fakes import FakeRedis
+
+
+SLOT = "2022-03-07T19:15:00+00:00"
+
+
+class TestPretixClient(unittest.TestCase):
+
+    def setUp(self):
+        app.config.from_object("config.TestingConfig")
+        self.venue = StandinVenue({SLOT: 1}, {"alice@wonderland.com": "supersecure"})
+        self.server = StandinServer(create_pretix_app(self.venue))
+        self.server.__enter__()
+        self.venue_url = f"{self.server.url}/Baeder/74/"
+
+    def tearDown(self):
+        self.server.__exit__(None, None, None)
+
+    def book(self, password="supersecure"):
+        client = PretixClient(self.venue_url)
+        client.choose_slot(SLOT)
+        client.apply_voucher("urbansportsclub")
+        client.login("alice@wonderland.com", password)
+        return client.checkout()
+
+    def test_given_free_slot_returns_confirmation_code(self):
+        confirmation_code = self.book()
+        self.assertIn(confirmation_code, self.venue.orders)
+
+    def test_given_sold_out_slot_raises(self):
+        self.book()
+        with self.assertRaises(PretixSoldOut):
+            self.book()
+
+    def test_given_other_cart_error_is_not_sold_out(self):
+        page = Page(self.venue_url, '<div class="alert alert-danger">This voucher code is not known.</div>')
+        self.assertTrue(page.has_error())
+        self.assertFalse(page.is_sold_out())
+
+    def test_given_sold_out_error_is_sold_out(self):
+        page = Page(self.venue_url, '<div class="alert alert-danger">Leider ausverkauft.</div>')
+        self.assertEqual(page.get_error(), "Leider ausverkauft.")
+        self.assertTrue(page.is_sold_out())
+
+    def test_given_wrong_password_raises(self):
+        with self.assertRaises(PretixError):
+            self.book(password="wrong")
+
+    def test_given_unknown_slot_raises(self):
+        with self.assertRaises(PretixError):
+            PretixClient(self.venue_url).choose_slot("2022-03-07T20:00:00+00:00")
+
+    def test_returns_confirmation_code_from_order_url(self):
+        url = "https://pretix.eu/Baeder/74/order/WMHPW/pddi5nhiweavfy3r/?thanks=1"
+        self.assertEqual(parse_confirmation_code(url), "WMHPW")
+
+
+class TestVenueSessions(unittest.TestCase):
+
+    def setUp(self):
+        app.config.from_object("config.TestingConfig")
+        app.config["COORDINATOR_REDIS"] = FakeRedis()
+        secret = mock.patch.dict(app.config, {"SECRET_KEY": "test-secret"})
+        secret.start()
+        self.addCleanup(secret.stop)
+        self.venue = StandinVenue({SLOT: 2}, {"alice@wonderland.com": "supersecure"})
+        self.server = StandinServer(create_pretix_app(self.venue))
+        self.server.__enter__()
+        self.venue_url = f"{self.server.url}/Baeder/74/"
+
+    def tearDown(self):
+        self.server.__exit__(None, None, None)
+
+    def book(self):
+        client = PretixClient(self.venue_url)
+        cookies = load_venue_cookies(1, self.venue_url)
+        if cookies:
+            restore_http_cookies(client.session, cookies)
+        client.choose_slot(SLOT)
+        client.apply_voucher("urbansportsclub")
+        logged_in = client.login("alice@wonderland.com", "supersecure")
+        if logged_in:
+            save_venue_cookies(1, self.venue_url, export_http_cookies(client.session))
+        return logged_in, client.checkout()
+
+    def test_stored_venue_session_is_encrypted(self):
+        save_venue_cookies(1, self.venue_url, [{"name": "session", "value": "secret-value", "domain": "", "path": "/", "secure": False}])
+        stored = list(app.config["COORDINATOR_REDIS"].values.values())[0]
+        self.assertNotIn(b"secret-value", stored)
+        self.assertEqual(load_venue_cookies(1, self.venue_url)[0]["value"], "secret-value")
+
+    def test_given_no_secret_configured_skips_session_caching(self):
+        app.config["SECRET_KEY"] = None
+        app.config["VENUE_SESSION_KEY"] = None
+        cookies = [{"name": "session", "value": "secret-value", "domain": "", "path": "/", "secure": False}]
+        self.assertFalse(save_venue_cookies(1, self.venue_url, cookies))
+        self.assertEqual(app.config["COORDINATOR_REDIS"].values, {})
+        self.assertIsNone(load_venue_cookies(1, self.venue_url))
+
+    def test_given_no_secret_configured_second_booking_logs_in_again(self):
+        app.config["SECRET_KEY"] = None
+        app.config["VENUE_SESSION_KEY"] = None
+        self.assertEqual([self.book()[0], self.book()[0]], [True, True])
+
+    def test_given_unreadable_session_returns_none_and_forgets_it(self):
+        app.config["COORDINATOR_REDIS"].setex(f"venue_session:1:{self.venue_url.split('/')[2]}", 60, b"garbage")
+        self.assertIsNone(load_venue_cookies(1, self.venue_url))
+        self.assertEqual(app.config["COORDINATOR_REDIS"].values, {})
+
+    def test_given_stored_session_second_booking_skips_login(self):
+        first_logged_in, first_code = self.book()
+        second_logged_in, second_code = self.book()
+        self.assertTrue(first_logged_in)
+        self.assertFalse(second_logged_in)
+        self.assertEqual(set(self.venue.orders), {first_code, second_code})
+
+
+class TestStartTicketAgainstStandin(unittest.TestCase):
+
+    def setUp(self):
+        app.config.from_object("config.TestingConfig")
+        app.config["PRETIX_HTTP_ENABLED"] = True
+        db.session.close()
+        db.drop_all()
+        db.create_all()
+        self.venue = StandinVenue({SLOT: 1}, {"alice@wonderland.com": "supersecure"})
+        self.server = StandinServer(create_pretix_app(self.venue))
+        self.server.__enter__()
+
+    def tearDown(self):
+        self.server.__exit__(None, None, None)
+
+    def start(self, earliest_ticket_datetime=datetime(2022, 3, 3, 19, 15)):
+        venue = Venue("standin", f"{self.server.url}/Baeder/74/", "swimming")
+        user = User(email="alice@wonderland.com", venue_email="alice@wonderland.com", venue_password="supersecure")
+        db.session.add_all([venue, user])
+        db.session.commit()
+        booking = Booking(venue.id, datetime(2022, 3, 7, 19, 15), user.id)
+        booking.earliest_ticket_datetime = earliest_ticket_datetime
+        db.session.add(booking)
+        db.session.commit()
+        start_ticket(load_booking_context(booking.id), user)
+        return db.session.query(Booking).filter_by(id=booking.id).one()
+
+    def test_given_free_slot_start_ticket_confirms_over_http(self):
+        booking = self.start()
+        self.assertIn(booking.confirmation_code, self.venue.orders)
+        self.assertEqual(db.session.query(Ticket.status).filter_by(booking_id=booking.id).scalar(), "CONFIRMED")
+
+    @mock.patch('views.driver_pool')
+    def test_given_sold_out_slot_start_ticket_aborts_without_browser(self, driver_pool):
+        self.venue.slots[SLOT] = 0
+        booking = self.start()
+        self.assertEqual(db.session.query(Ticket.status).filter_by(booking_id=booking.id).scalar(), "ABORTED")
+        driver_pool.checkout.assert_not_called()
+
+    @mock.patch('views.driver_pool')
+    def test_given_slot_listed_on_second_poll_books_over_http(self, driver_pool):
+        app.config["RELEASE_POLL_INTERVAL_SECONDS"] = 0.01
+        subevents, self.venue.subevents = self.venue.subevents, {}
+
+        def release(seconds):
+            self.venue.subevents = subevents
+        with mock.patch('browser.polling.time.sleep', side_effect=release) as sleep:
+            booking = self.start(earliest_ticket_datetime=datetime.utcnow())
+        sleep.assert_called_once()
+        self.assertIn(booking.confirmation_code, self.venue.orders)
+        driver_pool.checkout.assert_not_called()
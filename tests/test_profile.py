@@ -0,0 +1,40 @@
+import unittest
+from unittest import mock
+from selenium.common.exceptions import WebDriverException
+from app import app
+from browser.profile import build_chrome_options, get_blocked_urls, apply_resource_rules
+
+
+class TestChromeProfile(unittest.TestCase):
+
+    def setUp(self):
+        app.config.from_object("config.TestingConfig")
+        app.config["CHROME_BLOCKED_URLS"] = ["*.png", "*.svg", "*analytics*"]
+        app.config["VENUE_RESOURCE_RULES"] = {"bouldering": {"allow": ["*.svg"], "deny": ["*fonts*"]}}
+
+    def test_given_lean_mode_uses_eager_page_load_and_small_window(self):
+        app.config["CHROME_WINDOW_SIZE"] = "800,600"
+        chrome_options = build_chrome_options()
+        self.assertEqual(chrome_options.page_load_strategy, "eager")
+        self.assertIn("--window-size=800,600", chrome_options.arguments)
+        self.assertIn("--headless", chrome_options.arguments)
+
+    def test_given_lean_mode_off_keeps_default_profile(self):
+        app.config["CHROME_LEAN_MODE"] = False
+        chrome_options = build_chrome_options()
+        self.assertEqual(chrome_options.page_load_strategy, "normal")
+        self.assertEqual(chrome_options.arguments, ["--headless", "--disable-dev-shm-usage", "--no-sandbox"])
+
+    def test_venue_rules_allow_and_deny_patterns(self):
+        self.assertEqual(get_blocked_urls("bouldering"), ["*.png", "*analytics*", "*fonts*"])
+        self.assertEqual(get_blocked_urls("swimming"), ["*.png", "*.svg", "*analytics*"])
+
+    def test_apply_resource_rules_blocks_urls_via_cdp(self):
+        driver = mock.Mock()
+        apply_resource_rules(driver, "swimming")
+        driver.execute_cdp_cmd.assert_called_with("Network.setBlockedURLs", {"urls": ["*.png", "*.svg", "*analytics*"]})
+
+    def test_given_cdp_unavailable_apply_resource_rules_returns_empty(self):
+        driver = mock.Mock()
+        driver.execute_cdp_cmd.side_effect = WebDriverException("no cdp")
+        self.assertEqual(apply_resource_rules(driver, "swimming"), [])
@@ -0,0 +1,24 @@
+import unittest
+from views import *
+from model.models import *
+from benchmarks.query_plans import get_key_queries, explain, find_plan_regressions
+
+
+class TestQueryPlans(unittest.TestCase):
+
+    def setUp(self):
+        app.config.from_object("config.TestingConfig")
+        db.session.close()
+        db.drop_all()
+        self.client = app.test_client
+        db.create_all()
+
+    def test_key_queries_use_indexes(self):
+        with db.engine.connect() as connection:
+            for name, query in get_key_queries(datetime(2022, 4, 1, 20, 0)).items():
+                plan = explain(connection, query)
+                self.assertEqual(find_plan_regressions(connection.dialect.name, plan), [], f"{name}: {plan}")
+
+    def test_given_full_table_scan_reports_regression(self):
+        plan = ["SCAN booking", "USE TEMP B-TREE FOR ORDER BY"]
+        self.assertEqual(find_plan_regressions("sqlite", plan), plan)
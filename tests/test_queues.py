@@ -0,0 +1,116 @@
+import os
+import tempfile
+import unittest
+import unittest.mock
+from datetime import datetime, timezone
+from types import SimpleNamespace
+import celeryconfig
+from browser import sizing
+from app import app
+from metrics.queues import get_task_latency, observe_task_start, render_queue_metrics
+from tests.fakes import FakeRedis
+
+
+class TestQueueMetrics(unittest.TestCase):
+
+    def setUp(self):
+        app.config.from_object("config.TestingConfig")
+        self.redis = FakeRedis()
+        app.config["METRICS_REDIS"] = self.redis
+        app.config["METRICS_STEP_BUCKETS"] = [0.5, 10]
+
+    def test_given_published_task_returns_latency_since_publish(self):
+        request = SimpleNamespace(published_at=100.0, eta=None)
+        self.assertAlmostEqual(get_task_latency(request, 100.25), 0.25)
+
+    def test_given_eta_task_returns_latency_since_eta(self):
+        eta = datetime.fromtimestamp(200.0, tz=timezone.utc).isoformat()
+        request = SimpleNamespace(published_at=100.0, eta=eta)
+        self.assertAlmostEqual(get_task_latency(request, 201.0), 1.0)
+
+    def test_given_task_without_publish_header_returns_none(self):
+        request = SimpleNamespace(eta=None)
+        self.assertIsNone(get_task_latency(request, 100.0))
+
+    def test_given_started_tasks_returns_depth_and_latency_metrics(self):
+        request = SimpleNamespace(published_at=0.0, eta=None, delivery_info={"routing_key": "browser"})
+        task = SimpleNamespace(name="app.execute_ticket", request=request)
+        with unittest.mock.patch("metrics.queues.time.time", return_value=2.0):
+            observe_task_start(task)
+        body = render_queue_metrics(self.redis, {"browser": 3, "scheduling": 0})
+        self.assertIn('chelonia_queue_depth{queue="browser"} 3', body)
+        self.assertIn('chelonia_queue_depth{queue="scheduling"} 0', body)
+        self.assertIn('chelonia_queue_latency_seconds_bucket{queue="browser",task="app.execute_ticket",le="0.5"} 0', body)
+        self.assertIn('chelonia_queue_latency_seconds_bucket{queue="browser",task="app.execute_ticket",le="10"} 1', body)
+        self.assertIn('chelonia_queue_latency_seconds_count{queue="browser",task="app.execute_ticket"} 1', body)
+
+
+class TestQueueRoutes(unittest.TestCase):
+
+    def test_given_browser_tasks_returns_browser_queue(self):
+        self.assertEqual(celeryconfig.task_routes["app.execute_ticket"]["queue"], "browser")
+        self.assertEqual(celeryconfig.task_routes["app.run_ticket"]["queue"], "browser")
+
+    def test_given_dispatch_task_returns_scheduling_queue(self):
+        self.assertEqual(celeryconfig.task_routes["app.dispatch_due_tickets"]["queue"], "scheduling")
+
+    def test_given_browser_worker_returns_single_prefetch(self):
+        self.assertEqual(celeryconfig.worker_prefetch_multiplier, 1)
+        self.assertGreaterEqual(celeryconfig.get_browser_concurrency(), 1)
+
+
+class TestBrowserSizing(unittest.TestCase):
+
+    def size(self, total_mb, **env):
+        env = dict({"CHROME_MEMORY_MB": "400", "WORKER_RESERVED_MEMORY_MB": "512"}, **env)
+        with unittest.mock.patch.dict("os.environ", env, clear=False), \
+                unittest.mock.patch("browser.sizing.get_memory_total_bytes", return_value=total_mb * 1024 * 1024):
+            return sizing.get_browser_count(), sizing.get_browser_concurrency()
+
+    def test_given_memory_budget_returns_browsers_for_the_whole_worker(self):
+        self.assertEqual(self.size(4512, CHROME_POOL_SIZE=""), (10, 10))
+
+    def test_given_pool_size_above_memory_budget_caps_browsers(self):
+        self.assertEqual(self.size(1312, CHROME_POOL_SIZE="8"), (2, 2))
+
+
+class TestWorkerMemory(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.meminfo = self.write("meminfo", "MemTotal:       65536000 kB\nMemFree:        1000 kB\n")
+        self.missing = os.path.join(self.directory.name, "missing")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, name, content):
+        path = os.path.join(self.directory.name, name)
+        with open(path, "w") as target:
+            target.write(content)
+        return path
+
+    def memory(self, cgroup_paths, meminfo=None):
+        with unittest.mock.patch("browser.sizing.MEMINFO_PATH", meminfo or self.meminfo), \
+                unittest.mock.patch("browser.sizing.CGROUP_MEMORY_LIMIT_PATHS", cgroup_paths):
+            return sizing.get_memory_total_bytes()
+
+    def test_given_cgroup_v2_limit_returns_dyno_memory(self):
+        self.assertEqual(self.memory((self.write("memory.max", "536870912\n"), self.missing)), 536870912)
+
+    def test_given_cgroup_v1_limit_returns_dyno_memory(self):
+        self.assertEqual(self.memory((self.missing, self.write("memory.limit_in_bytes", "2684354560\n"))), 2684354560)
+
+    def test_given_unlimited_cgroup_returns_host_memory(self):
+        self.assertEqual(self.memory((self.write("memory.max", "max\n"), self.missing)), 65536000 * 1024)
+        self.assertEqual(self.memory((self.missing, self.write("memory.limit_in_bytes", "9223372036854771712\n"))), 65536000 * 1024)
+
+    def test_given_no_cgroup_returns_host_memory(self):
+        self.assertEqual(self.memory((self.missing, self.missing)), 65536000 * 1024)
+
+    def test_given_cgroup_only_returns_cgroup_limit(self):
+        self.assertEqual(self.memory((self.write("memory.max", "1073741824"), self.missing), meminfo=self.missing), 1073741824)
+
+    def test_given_no_memory_source_raises(self):
+        with self.assertRaises(OSError):
+            self.memory((self.missing, self.missing), meminfo=self.missing)
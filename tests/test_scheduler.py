@@ -0,0 +1,101 @@
+import unittest
+from unittest import mock
+from views import *
+from model.models import *
+from scheduler.scheduler import schedule_ticket, dispatch_due_tickets
+
+
+class TestScheduler(unittest.TestCase):
+
+    def setUp(self):
+        app.config.from_object("config.TestingConfig")
+        db.session.close()
+        db.drop_all()
+        self.client = app.test_client
+        db.create_all()
+
+    def test_given_booking_schedule_ticket_stores_pending_release(self):
+        booking = Booking("1", datetime(2022, 4, 5, 20, 0), "1")
+        db.session.add(booking)
+        db.session.commit()
+        schedule_ticket(booking.id, 1, datetime(2022, 4, 1, 20, 0))
+        scheduled = db.session.query(ScheduledTicket).filter_by(booking_id=booking.id).first()
+        self.assertEqual(scheduled.status, "PENDING")
+        self.assertEqual(scheduled.release_at, datetime(2022, 4, 1, 20, 0))
+
+    def test_given_booking_scheduled_twice_keeps_one_row(self):
+        booking = Booking("1", datetime(2022, 4, 5, 20, 0), "1")
+        db.session.add(booking)
+        db.session.commit()
+        schedule_ticket(booking.id, 1, datetime(2022, 4, 1, 20, 0))
+        schedule_ticket(booking.id, 1, datetime(2022, 4, 1, 21, 0))
+        self.assertEqual(db.session.query(ScheduledTicket).count(), 1)
+
+    @mock.patch('scheduler.scheduler.reserve_release_slots')
+    @mock.patch('scheduler.scheduler.ReleaseBarrier')
+    @mock.patch('scheduler.scheduler.celery.send_task')
+    def test_dispatch_sends_only_tickets_within_lead_time(self, send_task, barrier, reserve):
+        app.config["WARM_START_LEAD_SECONDS"] = 0
+        app.config["SCHEDULER_DISPATCH_INTERVAL_SECONDS"] = 60
+        due_booking = Booking("1", datetime(2022, 4, 5, 20, 0), "1")
+        later_booking = Booking("1", datetime(2022, 4, 9, 20, 0), "1")
+        db.session.add_all([due_booking, later_booking])
+        db.session.commit()
+        schedule_ticket(due_booking.id, 1, datetime(2022, 4, 1, 20, 0, 30))
+        schedule_ticket(later_booking.id, 1, datetime(2022, 4, 5, 20, 0))
+
+        dispatched = dispatch_due_tickets(datetime(2022, 4, 1, 20, 0))
+
+        self.assertEqual([scheduled.booking_id for scheduled in dispatched], [due_booking.id])
+        send_task.assert_called_once_with("app.execute_ticket", args=[due_booking.id, 1, "20220401T200030000000"])
+        self.assertEqual(db.session.query(ScheduledTicket).filter_by(status="PENDING").count(), 1)
+
+    @mock.patch('scheduler.scheduler.reserve_release_slots')
+    @mock.patch('scheduler.scheduler.ReleaseBarrier')
+    @mock.patch('scheduler.scheduler.celery.send_task')
+    def test_dispatch_sends_ticket_without_countdown_within_one_beat_of_warm_start(self, send_task, barrier, reserve):
+        app.config["WARM_START_LEAD_SECONDS"] = 30
+        app.config["SCHEDULER_DISPATCH_INTERVAL_SECONDS"] = 15
+        booking = Booking("1", datetime(2022, 4, 5, 20, 0), "1")
+        db.session.add(booking)
+        db.session.commit()
+        schedule_ticket(booking.id, 1, datetime(2022, 4, 1, 20, 1, 0))
+        dispatch_due_tickets(datetime(2022, 4, 1, 20, 0))
+        send_task.assert_not_called()
+        dispatch_due_tickets(datetime(2022, 4, 1, 20, 0, 15))
+        send_task.assert_called_once_with("app.execute_ticket", args=[booking.id, 1, "20220401T200100000000"])
+
+    @mock.patch('scheduler.scheduler.reserve_release_slots')
+    @mock.patch('scheduler.scheduler.ReleaseBarrier')
+    @mock.patch('scheduler.scheduler.celery.send_task')
+    def test_dispatch_does_not_send_dispatched_ticket_again(self, send_task, barrier, reserve):
+        booking = Booking("1", datetime(2022, 4, 5, 20, 0), "1")
+        db.session.add(booking)
+        db.session.commit()
+        schedule_ticket(booking.id, 1, datetime(2022, 4, 1, 20, 0))
+        dispatch_due_tickets(datetime(2022, 4, 1, 20, 0))
+        dispatch_due_tickets(datetime(2022, 4, 1, 20, 0, 15))
+        self.assertEqual(send_task.call_count, 1)
+
+    @mock.patch('scheduler.scheduler.reserve_release_slots')
+    @mock.patch('scheduler.scheduler.ReleaseBarrier')
+    @mock.patch('scheduler.scheduler.celery.send_task')
+    def test_dispatch_groups_tickets_sharing_release_into_one_batch(self, send_task, barrier, reserve):
+        app.config["WARM_START_LEAD_SECONDS"] = 30
+        app.config["SCHEDULER_DISPATCH_INTERVAL_SECONDS"] = 15
+        bookings = [Booking("1", datetime(2022, 4, 5, 20, 0), "1") for _ in range(3)]
+        db.session.add_all(bookings)
+        db.session.commit()
+        schedule_ticket(bookings[0].id, 1, datetime(2022, 4, 1, 20, 1, 0))
+        schedule_ticket(bookings[1].id, 2, datetime(2022, 4, 1, 20, 1, 0))
+        schedule_ticket(bookings[2].id, 3, datetime(2022, 4, 1, 20, 1, 15))
+
+        dispatch_due_tickets(datetime(2022, 4, 1, 20, 0, 30))
+
+        barrier.return_value.open.assert_has_calls([
+            mock.call(datetime(2022, 4, 1, 20, 1, 0), 2),
+            mock.call(datetime(2022, 4, 1, 20, 1, 15), 1),
+        ])
+        self.assertEqual([call.kwargs["args"][2] for call in send_task.call_args_list],
+                         ["20220401T200100000000", "20220401T200100000000", "20220401T200115000000"])
+        self.assertTrue(all("countdown" not in call.kwargs and "eta" not in call.kwargs for call in send_task.call_args_list))
@@ -0,0 +1,44 @@
+import unittest
+from unittest import mock
+from selenium.common.exceptions import NoSuchElementException
+from app import app
+from browser.slots import parse_slot_start, read_slot_map, click_slot
+
+
+class TestSlots(unittest.TestCase):
+
+    def setUp(self):
+        app.config.from_object("config.TestingConfig")
+
+    def test_given_slot_label_returns_start_time(self):
+        self.assertEqual(parse_slot_start("14:45"), "14:45")
+        self.assertEqual(parse_slot_start(" 9.30 - 11.00 Uhr "), "09:30")
+        self.assertIsNone(parse_slot_start("ausgebucht"))
+
+    def test_given_rendered_calendar_returns_bookable_slots_by_start(self):
+        first, duplicate, disabled = mock.Mock(), mock.Mock(), mock.Mock()
+        driver = mock.Mock()
+        driver.execute_script.return_value = [
+            {"text": "14:00 - 15:30", "element": first, "disabled": False},
+            {"text": "14:00 - 15:30", "element": duplicate, "disabled": False},
+            {"text": "14:15 - 15:45", "element": disabled, "disabled": True},
+            {"text": "Mehr anzeigen", "element": mock.Mock(), "disabled": False},
+        ]
+        self.assertEqual(read_slot_map(driver, ".drp-course-booking-button"), {"14:00": first})
+
+    def test_given_target_slot_clicks_it_with_one_script_call(self):
+        target = mock.Mock()
+        driver = mock.Mock()
+        driver.execute_script.return_value = [
+            {"text": "14:00", "element": mock.Mock(), "disabled": False},
+            {"text": "17:00", "element": target, "disabled": False},
+        ]
+        click_slot(driver, ".drp-course-booking-button", "17:00")
+        target.click.assert_called_once_with()
+        self.assertEqual(driver.execute_script.call_count, 1)
+
+    def test_given_missing_slot_raises_no_such_element(self):
+        driver = mock.Mock()
+        driver.execute_script.return_value = [{"text": "14:00", "element": mock.Mock(), "disabled": False}]
+        with self.assertRaises(NoSuchElementException):
+            click_slot(driver, ".drp-course-booking-button", "17:00")
@@ -0,0 +1,93 @@
+import unittest
+from datetime import timedelta
+from unittest import mock
+from views import *
+from venues.adapters import VenueAdapter, VenueConfigurationError, register_venue, get_venue_adapter
+from venues.plans import BookingRun, compile_plan
+from selenium.common.exceptions import WebDriverException
+from browser.pool import DriverPoolExhausted
+
+
+class TestVenueAdapters(unittest.TestCase):
+
+    def setUp(self):
+        app.config.from_object("config.TestingConfig")
+
+    def test_given_registered_venues_returns_compiled_plans(self):
+        self.assertEqual([name for name, step in get_venue_adapter("bouldering").browser_plan.steps][2], "choose_calendar_slot")
+        self.assertIsNone(get_venue_adapter("bouldering").http_plan)
+        self.assertIs(get_venue_adapter("swimming").http_plan.steps[0][1], open_shop_http_step)
+
+    def test_given_unknown_venue_type_returns_default_adapter(self):
+        self.assertIs(get_venue_adapter("climbing"), get_venue_adapter("swimming"))
+
+    def test_given_duplicate_venue_type_raises(self):
+        with self.assertRaises(VenueConfigurationError):
+            register_venue(VenueAdapter("swimming", timedelta(hours=1), {}, ["open_venue_website"]))
+
+    def test_given_unknown_step_returns_problem(self):
+        adapter = VenueAdapter("squash", timedelta(hours=48), {}, ["open_venue_website", "book_court"])
+        plan, problems = compile_plan(adapter, "browser", adapter.browser_steps, browser_steps)
+        self.assertIsNone(plan)
+        self.assertEqual(problems, ["squash browser plan uses unknown step book_court"])
+
+    def test_given_step_without_selector_returns_problem(self):
+        adapter = VenueAdapter("squash", timedelta(hours=48), {"date": "#{day}"}, ["choose_calendar_slot"])
+        plan, problems = compile_plan(adapter, "browser", adapter.browser_steps, browser_steps)
+        self.assertEqual(problems, ["squash step choose_calendar_slot needs a next_month selector",
+                                    "squash step choose_calendar_slot needs a slot selector"])
+
+    def test_given_step_returning_false_stops_plan(self):
+        first, second = mock.Mock(return_value=False), mock.Mock()
+        adapter = VenueAdapter("squash", timedelta(hours=48), {}, ["first", "second"])
+        plan, problems = compile_plan(adapter, "browser", adapter.browser_steps, {"first": first, "second": second})
+        self.assertFalse(plan.run(BookingRun(adapter, None, None, None)))
+        second.assert_not_called()
+
+    @mock.patch('views.driver_pool')
+    def test_given_browser_step_times_out_aborts_ticket(self, driver_pool):
+        adapter = VenueAdapter("squash", timedelta(hours=48), {}, ["slow"])
+        adapter.browser_plan, problems = compile_plan(adapter, "browser", adapter.browser_steps,
+                                                      {"slow": mock.Mock(side_effect=TimeoutException())})
+        ticket = mock.Mock(status="STARTED")
+        with mock.patch('views.update_ticket_status') as update_ticket_status:
+            self.assertIsNone(execute_booking(adapter, BookingRun(adapter, None, None, ticket)))
+        update_ticket_status.assert_called_once_with(ticket, "ABORTED", None)
+
+    @mock.patch('views.save_confirmation_code')
+    @mock.patch('views.get_confirmation_code', return_value=None)
+    def test_given_no_confirmation_code_aborts_ticket(self, get_confirmation_code, save_confirmation_code):
+        ticket = mock.Mock(status="STARTED")
+        with mock.patch('views.update_ticket_status') as update_ticket_status:
+            self.assertFalse(save_confirmation_code_step(BookingRun(None, None, None, ticket)))
+        update_ticket_status.assert_called_once_with(ticket, "ABORTED", None)
+
+    @mock.patch('views.driver_pool')
+    def test_given_browser_crashes_aborts_ticket_and_reraises(self, driver_pool):
+        adapter = VenueAdapter("squash", timedelta(hours=48), {}, ["crash"])
+        adapter.browser_plan, problems = compile_plan(adapter, "browser", adapter.browser_steps,
+                                                      {"crash": mock.Mock(side_effect=WebDriverException("tab crashed"))})
+        ticket = mock.Mock(status="STARTED")
+        with mock.patch('views.update_ticket_status') as update_ticket_status:
+            with self.assertRaises(WebDriverException):
+                execute_booking(adapter, BookingRun(adapter, None, None, ticket))
+        update_ticket_status.assert_called_once_with(ticket, "ABORTED", None, step="WebDriverException")
+
+    @mock.patch('views.driver_pool')
+    def test_given_no_driver_available_aborts_ticket(self, driver_pool):
+        driver_pool.checkout.side_effect = DriverPoolExhausted("no driver available")
+        adapter = VenueAdapter("squash", timedelta(hours=48), {}, ["book"])
+        adapter.browser_plan, problems = compile_plan(adapter, "browser", adapter.browser_steps, {"book": mock.Mock()})
+        ticket = mock.Mock(status="STARTED")
+        with mock.patch('views.update_ticket_status') as update_ticket_status:
+            with self.assertRaises(DriverPoolExhausted):
+                execute_booking(adapter, BookingRun(adapter, None, None, ticket))
+        update_ticket_status.assert_called_once_with(ticket, "ABORTED", None, step="DriverPoolExhausted")
+
+    @mock.patch('views.publish_ticket_event')
+    def test_aborted_ticket_publishes_error_step(self, publish_ticket_event):
+        ticket = mock.Mock(status="STARTED")
+        with mock.patch('views.db'):
+            update_ticket_status(ticket, "ABORTED", step="WebDriverException")
+        self.assertEqual(ticket.status, "ABORTED")
+        publish_ticket_event.assert_called_once_with(ticket, "WebDriverException")
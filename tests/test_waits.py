@@ -0,0 +1,39 @@
+import unittest
+from unittest import mock
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from app import app
+from browser.waits import wait_for, get_step_settings
+
+
+class TestWaits(unittest.TestCase):
+
+    def setUp(self):
+        app.config.from_object("config.TestingConfig")
+
+    def test_given_unknown_step_returns_default_settings(self):
+        self.assertEqual(get_step_settings("unknown"), (app.config["WAIT_DEFAULT_TIMEOUT"], app.config["WAIT_DEFAULT_POLL"]))
+
+    def test_given_configured_step_returns_step_timeout(self):
+        self.assertEqual(get_step_settings("download_pdf"), (30, 0.25))
+
+    @mock.patch('browser.waits.record_wait')
+    def test_wait_returns_as_soon_as_condition_is_met(self, record_wait):
+        attempts = iter([False, False, "element"])
+        result = wait_for(mock.Mock(), "apply_voucher", lambda driver: next(attempts))
+        self.assertEqual(result, "element")
+        step, waited_seconds, outcome = record_wait.call_args[0]
+        self.assertEqual((step, outcome), ("apply_voucher", "ok"))
+        self.assertLess(waited_seconds, 1)
+
+    @mock.patch('browser.waits.record_wait')
+    @mock.patch('browser.waits.get_step_settings', return_value=(0.05, 0.01))
+    def test_wait_raises_and_records_timeout(self, get_step_settings, record_wait):
+        with self.assertRaises(TimeoutException):
+            wait_for(mock.Mock(), "apply_voucher", lambda driver: False)
+        self.assertEqual(record_wait.call_args[0][2], "timeout")
+
+    @mock.patch('browser.waits.record_wait')
+    def test_wait_raises_and_records_error_when_condition_fails(self, record_wait):
+        with self.assertRaises(WebDriverException):
+            wait_for(mock.Mock(), "apply_voucher", mock.Mock(side_effect=WebDriverException("chrome not reachable")))
+        self.assertEqual(record_wait.call_args[0][2], "error")
@@ -0,0 +1,34 @@
+import time
+import unittest
+from datetime import datetime, timedelta
+from app import app
+from scheduler.warmstart import wait_until, wait_for_release
+
+
+class TestWarmStart(unittest.TestCase):
+
+    def setUp(self):
+        app.config.from_object("config.TestingConfig")
+
+    def test_wait_until_fires_within_a_few_milliseconds_of_deadline(self):
+        deadline = time.monotonic() + 0.2
+        lateness = wait_until(deadline)
+        self.assertGreaterEqual(time.monotonic(), deadline)
+        self.assertLess(lateness, 0.01)
+
+    def test_given_release_in_past_does_not_wait(self):
+        self.assertFalse(wait_for_release(datetime.utcnow() - timedelta(seconds=5)))
+
+    def test_given_no_release_does_not_wait(self):
+        self.assertFalse(wait_for_release(None))
+
+    def test_given_release_ahead_waits_until_release(self):
+        release_at = datetime.utcnow() + timedelta(milliseconds=150)
+        self.assertTrue(wait_for_release(release_at))
+        self.assertGreaterEqual(datetime.utcnow(), release_at)
+
+    def test_given_venue_clock_ahead_fires_earlier_by_offset(self):
+        release_at = datetime.utcnow() + timedelta(milliseconds=300)
+        started = time.monotonic()
+        self.assertTrue(wait_for_release(release_at, offset_seconds=0.2))
+        self.assertLess(time.monotonic() - started, 0.2)
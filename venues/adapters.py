@@ -0,0 +1,102 @@
+from datetime import timedelta
+from app import app
+
+
+DEFAULT_VENUE_TYPE = "swimming"
+
+
+class VenueConfigurationError(Exception):
+    pass
+
+
+class VenueAdapter(object):
+
+    def __init__(self, venue_type, release_delta, selectors, browser_steps=(), http_steps=()):
+        self.venue_type = venue_type
+        self.release_delta = release_delta
+        self.selectors = selectors
+        self.browser_steps = tuple(browser_steps)
+        self.http_steps = tuple(http_steps)
+        self.browser_plan = None
+        self.http_plan = None
+
+    @property
+    def supports_browser(self):
+        return bool(self.browser_steps)
+
+    @property
+    def supports_http(self):
+        return bool(self.http_steps)
+
+    def get_selector(self, name, **values):
+        return self.selectors[name].format(**values)
+
+    def __repr__(self):
+        return f"<VenueAdapter {self.venue_type}>"
+
+
+venue_adapters = {}
+
+
+def register_venue(adapter):
+    if adapter.venue_type in venue_adapters:
+        raise VenueConfigurationError(f"venue type {adapter.venue_type} is already registered")
+    venue_adapters[adapter.venue_type] = adapter
+    return adapter
+
+
+def get_venue_adapter(venue_type):
+    adapter = venue_adapters.get(venue_type)
+    if adapter is None:
+        app.logger.info(f"unknown venue type {venue_type}, using {DEFAULT_VENUE_TYPE}")
+        return venue_adapters[DEFAULT_VENUE_TYPE]
+    return adapter
+
+
+def get_venue_choices():
+    return [(venue_type, venue_type) for venue_type in venue_adapters]
+
+
+register_venue(VenueAdapter(
+    "bouldering",
+    release_delta=timedelta(days=7),
+    selectors={
+        "next_month": ".drp-course-month-selector-next",
+        "date": "//div[normalize-space()='{day}']",
+        "slot": ".drp-course-booking-button",
+    },
+    browser_steps=[
+        "open_venue_website",
+        "wait_for_release",
+        "choose_calendar_slot",
+        "enter_user_data",
+        "accept_privacy_and_book",
+        "check_booking_confirmed",
+    ],
+))
+
+register_venue(VenueAdapter(
+    "swimming",
+    release_delta=timedelta(hours=96),
+    selectors={
+        "date": ".event-time[data-time='{slot_time}']",
+    },
+    browser_steps=[
+        "restore_session",
+        "open_venue_website",
+        "wait_for_release",
+        "choose_event_slot",
+        "apply_voucher",
+        "complete_checkout",
+        "save_confirmation_code",
+        "download_pdf",
+    ],
+    http_steps=[
+        "open_venue_website",
+        "wait_for_release",
+        "choose_event_slot",
+        "apply_voucher",
+        "website_login",
+        "complete_checkout",
+    ],
+))
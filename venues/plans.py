@@ -0,0 +1,73 @@
+from app import app
+from venues.adapters import VenueConfigurationError, venue_adapters
+
+
+REQUIRED_SELECTORS = {
+    "choose_calendar_slot": ["next_month", "date", "slot"],
+    "choose_event_slot": ["date"],
+}
+
+
+class BookingRun(object):
+
+    def __init__(self, adapter, context, user, ticket, release=None, lease=None):
+        self.adapter = adapter
+        self.context = context
+        self.user = user
+        self.ticket = ticket
+        self.release = release
+        self.lease = lease
+        self.driver = None
+        self.client = None
+
+
+class BookingPlan(object):
+
+    def __init__(self, venue_type, mode, steps):
+        self.venue_type = venue_type
+        self.mode = mode
+        self.steps = tuple(steps)
+
+    def run(self, booking_run):
+        for name, step in self.steps:
+            if step(booking_run) is False:
+                app.logger.info(f"{self.mode} plan for {self.venue_type} stopped after {name}")
+                return False
+        return True
+
+    def __repr__(self):
+        return f"<BookingPlan {self.venue_type}/{self.mode} {[name for name, step in self.steps]}>"
+
+
+def compile_plan(adapter, mode, step_names, step_table):
+    problems = []
+    if len(set(step_names)) != len(step_names):
+        problems.append(f"{adapter.venue_type} {mode} plan repeats a step")
+    for name in step_names:
+        if name not in step_table:
+            problems.append(f"{adapter.venue_type} {mode} plan uses unknown step {name}")
+        for selector in REQUIRED_SELECTORS.get(name, []):
+            if selector not in adapter.selectors:
+                problems.append(f"{adapter.venue_type} step {name} needs a {selector} selector")
+    if problems:
+        return None, problems
+    return BookingPlan(adapter.venue_type, mode, [(name, step_table[name]) for name in step_names]), []
+
+
+def compile_venue_plans(browser_step_table, http_step_table):
+    problems = []
+    for adapter in venue_adapters.values():
+        if not adapter.supports_browser and not adapter.supports_http:
+            problems.append(f"{adapter.venue_type} has neither a browser nor an http plan")
+        if adapter.release_delta.total_seconds() <= 0:
+            problems.append(f"{adapter.venue_type} release delta must be positive")
+        if adapter.supports_browser:
+            adapter.browser_plan, browser_problems = compile_plan(adapter, "browser", adapter.browser_steps, browser_step_table)
+            problems += browser_problems
+        if adapter.supports_http:
+            adapter.http_plan, http_problems = compile_plan(adapter, "http", adapter.http_steps, http_step_table)
+            problems += http_problems
+    if problems:
+        raise VenueConfigurationError("invalid venue adapters: " + "; ".join(problems))
+    app.logger.info(f"compiled booking plans for {len(venue_adapters)} venue types")
+    return venue_adapters
@@ -1,19 +1,45 @@
 from app import app, login_manager, celery
-import time
-import json
 import os
+import time
+import click
 import pytz
+import requests
 from pytz import timezone
 from functools import wraps
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.common.action_chains import ActionChains
-from selenium.common.exceptions import NoSuchElementException
-from flask import Flask, g, render_template, request, redirect, flash, url_for, session, jsonify
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import NoSuchElementException, TimeoutException
+from celery.concurrency.prefork import TaskPool as PreforkPool
+from celery.signals import worker_process_init, worker_process_shutdown, worker_ready, worker_shutdown, before_task_publish, task_prerun
+from flask import Flask, g, render_template, request, redirect, flash, url_for, session, jsonify, Response, abort
 from flask_login import LoginManager, login_user, current_user, logout_user, login_required
+from sqlalchemy import func, and_
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import aliased
 from model.models import db, Booking, User, Venue, Ticket
+from api.pagination import paginate, filter_datetime_range, add_next_link, get_next_url
+from api.events import TicketEventHub, publish_ticket_event
+from api.serializers import booking_schema, ticket_schema, venue_schema, json_response, get_watermark, compute_etag, not_modified_response
+from browser.pool import DriverPool, start_warmup
+from metrics.steps import timed_step, step_timer, set_step_venue, render_step_metrics
+from metrics.queues import observe_task_start, get_queue_depths, render_queue_metrics
+from browser.profile import build_chrome_options, apply_resource_rules
+from browser.polling import poll_until_available
+from browser.slots import click_slot
+from browser.waits import wait_for, file_downloaded
+from pretix.client import PretixClient, PretixError, PretixSlotUnavailable, PretixSoldOut, parse_confirmation_code
+from pretix.sessions import load_venue_cookies, save_venue_cookies, export_http_cookies, restore_http_cookies, export_driver_cookies, restore_driver_cookies
+from model.context import load_booking_context
+from scheduler.scheduler import schedule_ticket, schedule_tickets, dispatch_due_tickets
+from scheduler.leases import ExecutionLeaseLost, acquire_execution_lease, complete_execution_lease, fence_execution_lease
+from scheduler.warmstart import ReleaseGate
+from scheduler.coordinator import ReleaseBarrier, start_slot_heartbeat, unregister_browser_slots
+from scheduler.clocksync import get_clock_offset, get_venue_now
+from venues.adapters import get_venue_adapter
+from venues.plans import BookingRun, compile_venue_plans
+from scheduler.planner import get_demand_timeline, get_advertised_workers, prepare_capacity, describe_spike, serialize_spike
 from forms.forms import RegistrationForm, LoginForm, VenueForm, BookingForm
 from datetime import datetime, timedelta
 
@@ -118,83 +144,73 @@ def create_venue():
 @app.route('/venue', methods=['GET'])
 @login_required
 def get_venues():
-    venues = db.session.query(Venue).all()
-    data = []
-    for venue in venues:
-        obj = {
-            'id': venue.id,
-            'venue_name': venue.venue_name,
-            'venue_url': venue.venue_url,
-            'venue_type': venue.venue_type,
-            'created_at': venue.created_at,
-            'bookings': venue.bookings
-        }
-        data.append(obj)
-    response = app.response_class(
-        response=json.dumps(data, default=str),
-        status=200,
-        mimetype='application/json'
-    )
+    query = db.session.query(*venue_schema.columns)
     content_type = request.headers.get('Content-Type')
+    venues, next_cursor = paginate(query, Venue.id, Venue.id)
+    booking_counts = dict(
+        db.session.query(Booking.venue_id, func.count(Booking.id))
+        .filter(Booking.venue_id.in_([venue.id for venue in venues]))
+        .group_by(Booking.venue_id)
+        .all()
+    )
+    data = venue_schema.dump_many(venues)
+    for obj in data:
+        obj['bookings'] = booking_counts.get(obj['id'], 0)
     if content_type == 'application/json':
-        return response
-    return render_template("venues.html", venues=data)
+        etag = compute_etag(request.full_path, next_cursor, *[sorted(obj.items()) for obj in data])
+        not_modified = not_modified_response(etag)
+        if not_modified is not None:
+            return not_modified
+        return add_next_link(json_response(data, etag), next_cursor)
+    return render_template("venues.html", venues=data, next_url=get_next_url(next_cursor))
 
 
 @app.route('/booking')
 @login_required
 def get_bookings():
-    bookings = db.session.query(Booking).all()
-    data = []
-    for booking in bookings:
-        booking.datetime_event = booking.datetime_event.astimezone(pytz.timezone('CET'))
-        booking.earliest_ticket_datetime = booking.earliest_ticket_datetime.astimezone(pytz.timezone('CET'))
-        obj = {
-            'id': booking.id,
-            'venue_id': booking.venue_id,
-            'datetime_event': booking.datetime_event,
-            'user_id': booking.user_id,
-            'created_at': booking.created_at,
-            'confirmation_code': booking.confirmation_code,
-            'ticket': booking.ticket
-        }
-        data.append(obj)
-    response = app.response_class(
-        response=json.dumps(data, default=str),
-        status=200,
-        mimetype='application/json'
-    )
+    query = query_bookings().filter(Booking.user_id == current_user.id)
+    query = filter_datetime_range(query, Booking.datetime_event)
+    status = request.args.get("status")
+    if status is not None:
+        query = query.filter(Ticket.status == status)
     content_type = request.headers.get('Content-Type')
     if content_type == 'application/json':
-        return response
-    return render_template("bookings.html", bookings=bookings, user=current_user)
+        etag = compute_etag(request.full_path, current_user.id, *get_watermark(query, Booking.updated_at, Ticket.updated_at))
+        not_modified = not_modified_response(etag)
+        if not_modified is not None:
+            return not_modified
+    bookings, next_cursor = paginate(query, Booking.datetime_event, Booking.id)
+    data = booking_schema.dump_many(bookings)
+    if content_type == 'application/json':
+        return add_next_link(json_response(data, etag), next_cursor)
+    return render_template("bookings.html", bookings=data, next_url=get_next_url(next_cursor), user=current_user)
+
+
+def query_bookings():
+    latest_ticket = aliased(Ticket)
+    latest_ticket_id = db.session.query(func.max(latest_ticket.id)) \
+        .filter(latest_ticket.booking_id == Booking.id) \
+        .scalar_subquery()
+    return db.session.query(*booking_schema.columns) \
+        .outerjoin(Ticket, and_(Ticket.booking_id == Booking.id, Ticket.id == latest_ticket_id))
 
 
 @app.route('/booking/<booking_id>')
 @login_required
 def get_booking_by_id(booking_id):
-    booking = db.session.query(Booking).filter_by(id=booking_id).first()
-    data = []
-    booking.datetime_event = booking.datetime_event.astimezone(pytz.timezone('CET'))
-    booking.earliest_ticket_datetime = booking.earliest_ticket_datetime.astimezone(pytz.timezone('CET'))
-    obj = {
-        'id': booking.id,
-        'venue_id': booking.venue_id,
-        'datetime_event': booking.datetime_event,
-        'user_id': booking.user_id,
-        'created_at': booking.created_at,
-        'confirmation_code': booking.confirmation_code,
-        'ticket': booking.ticket
-    }
-    data.append(obj)
-    response = app.response_class(
-        response=json.dumps(data, default=str),
-        status=200,
-        mimetype='application/json'
-    )
+    if db.session.query(Booking.id).filter_by(id=booking_id, user_id=current_user.id).first() is None:
+        abort(404)
     content_type = request.headers.get('Content-Type')
     if content_type == 'application/json':
-        return response
+        query = query_bookings().filter(Booking.id == booking_id, Booking.user_id == current_user.id)
+        etag = compute_etag(request.full_path, *get_watermark(query, Booking.updated_at, Ticket.updated_at))
+        not_modified = not_modified_response(etag)
+        if not_modified is not None:
+            return not_modified
+        return json_response(booking_schema.dump_many(query.all()), etag)
+    booking = db.session.query(Booking).filter_by(id=booking_id, user_id=current_user.id).first()
+    booking.datetime_event = booking.datetime_event.astimezone(pytz.timezone('CET'))
+    booking.earliest_ticket_datetime = booking.earliest_ticket_datetime.astimezone(pytz.timezone('CET'))
     return render_template("booking_show.html", booking=booking)
 
 
@@ -206,6 +222,9 @@ def create_booking():
     form = BookingForm()
     form.venue_id.choices = venue_choices
     if request.method == 'POST':
+        if request.form.get("repeat_until"):
+            get_recurring_bookings_from_form()
+            return redirect(url_for('get_bookings'))
         booking = get_booking_from_form()
         create_ticket(booking.id)
         return render_template("booking_show.html", booking=booking)
@@ -221,6 +240,39 @@ def get_booking_from_form():
     return booking
 
 
+def get_recurring_bookings_from_form():
+    venue_id = request.form.get("venue_id")
+    date_event = request.form.get("date_event")
+    time_event = request.form.get("time_event")
+    repeat_until = request.form.get("repeat_until")
+    app.logger.info("collected recurring booking data from form")
+    return post_recurring_bookings_and_save(venue_id, date_event, time_event, repeat_until)
+
+
+def post_recurring_bookings_and_save(venue_id, date_event, time_event, repeat_until):
+    dates_event = expand_weekly_dates(date_event, repeat_until)
+    datetimes_event_utc = [change_to_correct_timezone(date, time_event) for date in dates_event]
+    venue_type = db.session.query(Venue.venue_type).filter_by(id=venue_id).scalar()
+    earliest_ticket_datetimes = calculate_earliest_ticket_datetimes(venue_type, datetimes_event_utc)
+    bookings = []
+    for datetime_event_utc, earliest_ticket_datetime in zip(datetimes_event_utc, earliest_ticket_datetimes):
+        booking = Booking(venue_id, datetime_event_utc, current_user.id)
+        booking.earliest_ticket_datetime = earliest_ticket_datetime
+        bookings.append(booking)
+    db.session.add_all(bookings)
+    db.session.flush()
+    schedule_tickets([(booking.id, current_user.id, booking.earliest_ticket_datetime) for booking in bookings])
+    app.logger.info(f"added {len(bookings)} recurring bookings: venue_id: {venue_id}, first: {dates_event[0]}, last: {dates_event[-1]}, time: {time_event}")
+    return bookings
+
+
+def expand_weekly_dates(date_event, repeat_until):
+    first = datetime.strptime(date_event, "%Y-%m-%d").date()
+    last = datetime.strptime(repeat_until, "%Y-%m-%d").date()
+    occurrences = min((last - first).days // 7 + 1, app.config["RECURRING_MAX_OCCURRENCES"])
+    return [str(first + timedelta(weeks=week)) for week in range(max(occurrences, 1))]
+
+
 def post_booking_and_save(venue_id, date_event, time_event):
     datetime_event_utc = change_to_correct_timezone(date_event, time_event)
     booking = Booking(venue_id, datetime_event_utc, current_user.id)
@@ -244,166 +296,433 @@ def change_to_correct_timezone(date_event, time_event):
 @app.route('/ticket')
 @login_required
 def get_tickets():
-    tickets = db.session.query(Ticket).all()
-    data = []
-    for ticket in tickets:
-        obj = {
-            'id': ticket.id,
-            'booking_id': ticket.booking_id,
-            'created_at': ticket.created_at,
-            'user_id': ticket.user_id,
-            'status': ticket.status
-        }
-        data.append(obj)
-    response = app.response_class(
-        response=json.dumps(data, default=str),
-        status=200,
-        mimetype='application/json'
-    )
+    query = db.session.query(*ticket_schema.columns).filter(Ticket.user_id == current_user.id)
+    query = filter_datetime_range(query, Ticket.created_at)
+    status = request.args.get("status")
+    if status is not None:
+        query = query.filter(Ticket.status == status)
     content_type = request.headers.get('Content-Type')
     if content_type == 'application/json':
-        return response
-    return render_template("tickets.html", tickets=tickets, user=current_user)
+        etag = compute_etag(request.full_path, current_user.id, *get_watermark(query, Ticket.updated_at))
+        not_modified = not_modified_response(etag)
+        if not_modified is not None:
+            return not_modified
+    tickets, next_cursor = paginate(query, Ticket.created_at, Ticket.id)
+    data = ticket_schema.dump_many(tickets)
+    if content_type == 'application/json':
+        return add_next_link(json_response(data, etag), next_cursor)
+    return render_template("tickets.html", tickets=data, next_url=get_next_url(next_cursor), user=current_user)
+
+
+@app.route('/metrics')
+def get_metrics():
+    try:
+        depths = get_queue_depths(celery, [queue.name for queue in celery.conf.task_queues])
+    except Exception as error:
+        app.logger.info(f"could not read queue depths: {error}")
+        depths = {}
+    body = render_step_metrics(app.config["METRICS_REDIS"]) + render_queue_metrics(app.config["METRICS_REDIS"], depths)
+    return Response(body, mimetype="text/plain; version=0.0.4")
+
+
+@app.route('/capacity')
+@login_required
+def get_capacity_plan():
+    start = datetime.utcnow()
+    hours = request.args.get("hours", app.config["CAPACITY_PLAN_HORIZON_HOURS"], type=int)
+    timeline = get_demand_timeline(start, start + timedelta(hours=hours))
+    workers = get_advertised_workers()
+    return jsonify({"from": start.isoformat(), "hours": hours, "workers": workers,
+                    "spikes": [serialize_spike(spike, workers) for spike in timeline]})
+
+
+@app.cli.command("capacity-plan")
+@click.option("--hours", default=None, type=int, help="How far ahead to forecast.")
+def print_capacity_plan(hours):
+    start = datetime.utcnow()
+    hours = hours or app.config["CAPACITY_PLAN_HORIZON_HOURS"]
+    for spike in get_demand_timeline(start, start + timedelta(hours=hours)):
+        click.echo(describe_spike(spike))
+
+
+@app.route('/ticket/events')
+@login_required
+def stream_ticket_events():
+    user_id = current_user.id
+    db.session.remove()
+    response = Response(ticket_event_hub.stream(user_id), mimetype="text/event-stream")
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
 
 
 @app.route('/ticket/<booking_id>', methods=['POST'])
 @login_required
 def create_ticket(booking_id):
-    venue_type = db.session.query(Venue.venue_type).join(Booking).filter_by(id=booking_id).first()[0]
-    if venue_type == "bouldering":
-        if check_if_ticket_possible_now(booking_id, datetime.utcnow()):
-            return start_ticket_bouldering(booking_id)
-        app.logger.info("here comes the scheduler")
+    context = load_booking_context(booking_id)
+    if context is None or context.user_id != current_user.id:
+        abort(404)
+    if check_if_ticket_possible_now(context, get_venue_now(context.venue_url)):
+        ticket = enqueue_ticket(context, current_user)
+        return ticket_handle_response(context, ticket.id, ticket.status)
+    schedule_ticket(context.booking_id, current_user.id, context.earliest_ticket_datetime)
+    return ticket_handle_response(context, None, "SCHEDULED")
+
+
+def enqueue_ticket(context, user):
+    ticket = Ticket(context.booking_id, user.id)
+    ticket.status = "QUEUED"
+    db.session.add(ticket)
+    db.session.commit()
+    publish_ticket_event(ticket)
+    run_ticket_task.delay(ticket.id)
+    app.logger.info(f"queued ticket, id: {ticket.id}, booking_id: {context.booking_id}, user: {user.id}")
+    return ticket
 
-    if venue_type == "swimming":
-        if check_if_ticket_possible_now(booking_id, datetime.utcnow()):
-            return start_ticket_swimming(booking_id, current_user.id)
-        schedule_ticket(booking_id, str(datetime.utcnow()), current_user.id)
 
+def ticket_handle_response(context, ticket_id, status):
+    response = jsonify({
+        "ticket_id": ticket_id,
+        "booking_id": context.booking_id,
+        "status": status,
+        "status_url": url_for("get_booking_by_id", booking_id=context.booking_id),
+    })
+    response.status_code = 202
+    return response
 
-def start_ticket_bouldering(booking_id):
-    ticket = Ticket(booking_id, current_user.id)
-    db.session.add(ticket)
+
+def start_ticket(context, user, release=None, ticket=None, lease=None):
+    try:
+        fence_execution_lease(lease, datetime.utcnow())
+    except ExecutionLeaseLost as error:
+        app.logger.info(f"lost before start: {error}")
+        return
+    if ticket is None:
+        ticket = Ticket(context.booking_id, user.id)
+        db.session.add(ticket)
+    else:
+        ticket.status = "STARTED"
     db.session.commit()
-    app.logger.info(f"added ticket, id: {ticket.id}, user: {current_user.id}")
+    publish_ticket_event(ticket)
+    set_step_venue(context.venue_type)
+    app.logger.info(f"started ticket: id: {ticket.id}, booking_id: {context.booking_id}, user id: {user.id}")
+    adapter = get_venue_adapter(context.venue_type)
+    return execute_booking(adapter, BookingRun(adapter, context, user, ticket, release, lease))
 
-    driver = initialize_chrome_driver()
-    open_venue_website(driver, booking_id)
 
+def execute_booking(adapter, booking_run):
+    if adapter.http_plan is not None and app.config["PRETIX_HTTP_ENABLED"]:
+        try:
+            adapter.http_plan.run(booking_run)
+            return booking_run.ticket
+        except PretixSoldOut as error:
+            app.logger.info(f"ticket slot not available, aborting: {error}")
+            update_ticket_status(booking_run.ticket, "ABORTED", booking_run.lease)
+            return
+        except (PretixError, requests.RequestException) as error:
+            app.logger.info(f"http booking failed, falling back to browser: {error}")
+    if adapter.browser_plan is None:
+        app.logger.info(f"{adapter.venue_type} cannot be booked in a browser, aborting")
+        update_ticket_status(booking_run.ticket, "ABORTED", booking_run.lease)
+        return
     try:
-        choose_ticket_slot_bouldering(driver, booking_id)
-        enter_user_data(driver)
-        accept_privacy_and_book(driver)
-        if "Glückwunsch" in driver.page_source:
-            ticket.status = "CONFIRMED"
-            db.session.commit()
-    except NoSuchElementException:
-        app.logger.info(f"an error occured, aborting, {NoSuchElementException}")
-        ticket.status = "ABORTED"
-        db.session.commit()
+        with driver_pool.checkout() as driver:
+            booking_run.driver = driver
+            adapter.browser_plan.run(booking_run)
+    except ExecutionLeaseLost:
+        raise
+    except (NoSuchElementException, TimeoutException) as error:
+        if booking_run.ticket.status == "CONFIRMED":
+            app.logger.info(f"step after confirmation failed, keeping booking, {error}")
+            return booking_run.ticket
+        app.logger.info(f"an error occured, aborting, {error}")
+        update_ticket_status(booking_run.ticket, "ABORTED", booking_run.lease)
         return
-    return ticket
+    except Exception as error:
+        db.session.rollback()
+        if booking_run.ticket.status == "CONFIRMED":
+            app.logger.info(f"browser failed after confirmation, keeping booking, {error!r}")
+            return booking_run.ticket
+        app.logger.error(f"browser booking failed, aborting ticket {booking_run.ticket.id}: {error!r}")
+        update_ticket_status(booking_run.ticket, "ABORTED", booking_run.lease, step=type(error).__name__)
+        raise
+    return booking_run.ticket
+
+
+def update_ticket_status(ticket, status, lease=None, step=None):
+    fence_execution_lease(lease, datetime.utcnow())
+    ticket.status = status
+    db.session.commit()
+    publish_ticket_event(ticket, step)
+
+
+def restore_session_step(booking_run):
+    cookies = load_venue_cookies(booking_run.user.id, booking_run.context.venue_url)
+    if cookies:
+        restore_driver_cookies(booking_run.driver, cookies)
+
+
+def open_venue_website_step(booking_run):
+    open_venue_website(booking_run.driver, booking_run.context)
+
+
+def wait_for_release_step(booking_run):
+    if booking_run.release is not None and booking_run.release.wait():
+        booking_run.driver.refresh()
+
+
+def choose_calendar_slot_step(booking_run):
+    driver, context = booking_run.driver, booking_run.context
+    poll_until_available(driver, context.earliest_ticket_datetime, lambda: choose_ticket_slot_bouldering(driver, context))
+    publish_ticket_event(booking_run.ticket, "slot_chosen")
+
+
+def enter_user_data_step(booking_run):
+    enter_user_data(booking_run.driver, booking_run.user)
+    publish_ticket_event(booking_run.ticket, "user_data_entered")
+
+
+def accept_privacy_and_book_step(booking_run):
+    accept_privacy_and_book(booking_run.driver)
+
+
+def check_booking_confirmed_step(booking_run):
+    if "Glückwunsch" in booking_run.driver.page_source:
+        update_ticket_status(booking_run.ticket, "CONFIRMED", booking_run.lease)
+
+
+def choose_event_slot_step(booking_run):
+    driver, context = booking_run.driver, booking_run.context
+    poll_until_available(driver, context.earliest_ticket_datetime, lambda: choose_ticket_slot_swimming(driver, context),
+                         marker=generate_slot_time(context.datetime_event))
+    publish_ticket_event(booking_run.ticket, "slot_chosen")
+
+
+def apply_voucher_step(booking_run):
+    apply_voucher(booking_run.driver)
+
+
+def complete_checkout_step(booking_run):
+    complete_checkout(booking_run.driver, booking_run.context, booking_run.user)
+    publish_ticket_event(booking_run.ticket, "checkout_completed")
+
+
+def save_confirmation_code_step(booking_run):
+    confirmation_code = get_confirmation_code(booking_run.driver)
+    save_confirmation_code(booking_run.context, confirmation_code, booking_run.lease)
+    if confirmation_code is None:
+        app.logger.info("no confirmation code on order page, an error occurred")
+        update_ticket_status(booking_run.ticket, "ABORTED", booking_run.lease)
+        return False
+    update_ticket_status(booking_run.ticket, "CONFIRMED", booking_run.lease)
+
+
+def download_pdf_step(booking_run):
+    download_pdf(booking_run.driver, booking_run.context)
+    app.logger.info("pdf downloaded")
 
 
-def choose_ticket_slot_bouldering(driver, booking_id):
-    next_button = driver.find_element(By.CSS_SELECTOR, ".drp-course-month-selector-next")
-    if check_if_next_month(booking_id):
+def open_shop_http_step(booking_run):
+    booking_run.client = PretixClient(booking_run.context.venue_url)
+    cookies = load_venue_cookies(booking_run.user.id, booking_run.context.venue_url)
+    if cookies:
+        restore_http_cookies(booking_run.client.session, cookies)
+    with step_timer("open_venue_website"):
+        booking_run.client.open_shop()
+
+
+def wait_for_release_http_step(booking_run):
+    if booking_run.release is not None:
+        booking_run.release.wait()
+
+
+def choose_event_slot_http_step(booking_run):
+    client, slot_time = booking_run.client, generate_slot_time(booking_run.context.datetime_event)
+
+    def choose_slot():
+        with step_timer("choose_ticket_slot"):
+            client.choose_slot(slot_time)
+    poll_until_available(None, booking_run.context.earliest_ticket_datetime, choose_slot, unavailable=(PretixSlotUnavailable,))
+    publish_ticket_event(booking_run.ticket, "slot_chosen")
+
+
+def apply_voucher_http_step(booking_run):
+    with step_timer("apply_voucher"):
+        booking_run.client.apply_voucher(app.config["PRETIX_VOUCHER_CODE"])
+
+
+def website_login_http_step(booking_run):
+    user = booking_run.user
+    with step_timer("website_login"):
+        logged_in = booking_run.client.login(user.venue_email, user.venue_password)
+    if logged_in:
+        save_venue_cookies(user.id, booking_run.context.venue_url, export_http_cookies(booking_run.client.session))
+
+
+def complete_checkout_http_step(booking_run):
+    with step_timer("complete_checkout"):
+        confirmation_code = booking_run.client.checkout()
+    save_confirmation_code(booking_run.context, confirmation_code, booking_run.lease)
+    update_ticket_status(booking_run.ticket, "CONFIRMED", booking_run.lease)
+    app.logger.info(f"http booking confirmed, booking_id: {booking_run.context.booking_id}")
+
+
+browser_steps = {
+    "restore_session": restore_session_step,
+    "open_venue_website": open_venue_website_step,
+    "wait_for_release": wait_for_release_step,
+    "choose_calendar_slot": choose_calendar_slot_step,
+    "enter_user_data": enter_user_data_step,
+    "accept_privacy_and_book": accept_privacy_and_book_step,
+    "check_booking_confirmed": check_booking_confirmed_step,
+    "choose_event_slot": choose_event_slot_step,
+    "apply_voucher": apply_voucher_step,
+    "complete_checkout": complete_checkout_step,
+    "save_confirmation_code": save_confirmation_code_step,
+    "download_pdf": download_pdf_step,
+}
+
+http_steps = {
+    "open_venue_website": open_shop_http_step,
+    "wait_for_release": wait_for_release_http_step,
+    "choose_event_slot": choose_event_slot_http_step,
+    "apply_voucher": apply_voucher_http_step,
+    "website_login": website_login_http_step,
+    "complete_checkout": complete_checkout_http_step,
+}
+
+compile_venue_plans(browser_steps, http_steps)
+
+
+@timed_step("choose_ticket_slot")
+def choose_ticket_slot_bouldering(driver, context):
+    adapter = get_venue_adapter(context.venue_type)
+    next_button = driver.find_element(By.CSS_SELECTOR, adapter.get_selector("next_month"))
+    if check_if_next_month(context):
         next_button.click()
-    date_selector = generate_datetime_selector(booking_id)
+    date_selector = generate_datetime_selector(context)
     date_field = driver.find_element(By.XPATH, date_selector)
     date_field.click()
-    click_booking_button(driver, booking_id, next_button)
-    time.sleep(1)
+    click_booking_button(driver, context)
+    wait_for(driver, "choose_ticket_slot_bouldering", EC.element_to_be_clickable((By.NAME, "first-name")))
     app.logger.info("ticket slot chosen")
 
 
 
-def enter_user_data(driver):
-    driver.find_element(By.NAME, "first-name").send_keys(current_user.first_name)
-    app.logger.info(f"entered first name: {current_user.first_name}")
-    driver.find_element(By.NAME, "last-name").send_keys(current_user.last_name)
-    app.logger.info(f"entered last name: {current_user.last_name}")
-    driver.find_element(By.NAME, "email").send_keys(current_user.venue_email)
+@timed_step("enter_user_data")
+def enter_user_data(driver, user):
+    driver.find_element(By.NAME, "first-name").send_keys(user.first_name)
+    app.logger.info(f"entered first name: {user.first_name}")
+    driver.find_element(By.NAME, "last-name").send_keys(user.last_name)
+    app.logger.info(f"entered last name: {user.last_name}")
+    driver.find_element(By.NAME, "email").send_keys(user.venue_email)
     app.logger.info(f"entered venue_email")
 
     driver.find_element(By.CSS_SELECTOR, "option[value='155589630']").click()
-    driver.find_element(By.NAME, "participant-additional-field-value").send_keys(current_user.urban_sports_membership_no)
+    driver.find_element(By.NAME, "participant-additional-field-value").send_keys(user.urban_sports_membership_no)
     app.logger.info(f"entered urban_sports_membership_no")
     driver.find_element(By.CSS_SELECTOR, "button[type='submit']").click()
-    time.sleep(2)
+    wait_for(driver, "enter_user_data", EC.element_to_be_clickable((By.ID, "drp-booking-data-processing-cb")))
     app.logger.info("user data entered")
 
 
+@timed_step("accept_privacy_and_book")
 def accept_privacy_and_book(driver):
     privacy_field = driver.find_element(By.XPATH, "//input[@id='drp-booking-data-processing-cb']")
     privacy_field.click()
-    driver.find_element(By.CSS_SELECTOR, "button[type='submit']").click()
-    time.sleep(1)
+    submit_button = driver.find_element(By.CSS_SELECTOR, "button[type='submit']")
+    submit_button.click()
+    wait_for(driver, "accept_privacy_and_book", EC.staleness_of(submit_button))
     app.logger.info("privacy accepted and booking finalized")
 
 
-def click_booking_button(driver, booking_id, next_button):
-    iterator = ActionChains(driver).move_to_element(next_button)
-    count = calc_quarter_count(booking_id)
-    for x in range(0, count):
-        iterator.send_keys(Keys.TAB).perform()
-    iterator.send_keys(Keys.ENTER).perform()
-    app.logger.info(f"clicked booking button at position {count}")
+def click_booking_button(driver, context):
+    click_slot(driver, get_venue_adapter(context.venue_type).get_selector("slot"), get_slot_start(context))
+
+
+def get_slot_start(context):
+    return to_venue_time(context.datetime_event).strftime("%H:%M")
 
 
-def calc_quarter_count(booking_id):
-    minutes = calc_minutes(booking_id)
-    count = int(minutes / 15 + 1)
-    return count
+def to_venue_time(datetime_utc):
+    return pytz.UTC.localize(datetime_utc).astimezone(timezone("Europe/Berlin"))
 
 
-def check_if_next_month(booking_id):
-    booking_created = db.session.query(Booking.created_at).filter_by(id=booking_id).first()[0]
-    booking_date = db.session.query(Booking.datetime_event).filter_by(id=booking_id).first()[0]
-    if booking_date.month == booking_created.month:
+def check_if_next_month(context):
+    if context.datetime_event.month == context.created_at.month:
         return False
     app.logger.info("booking_date next month, changing calendar view")
     return True
 
 
-def calc_minutes(booking_id):
-    booking_datetime = db.session.query(Booking.datetime_event).filter_by(id=booking_id).first()[0]
-    minutes = booking_datetime.minute
-    hours_normalized = booking_datetime - timedelta(hours=14)
-    total_minutes = hours_normalized.hour * 60 + minutes
-    app.logger.info(f"total_minutes: {total_minutes}")
-    return total_minutes
+@celery.task(name='app.dispatch_due_tickets')
+def dispatch_due_tickets_task():
+    due_tickets = dispatch_due_tickets(datetime.utcnow())
+    app.logger.info(f"dispatched {len(due_tickets)} due tickets")
 
 
-def schedule_ticket(booking_id, current_datetime_str, current_user_id):
-    create_ticket_schedule_task.delay(booking_id, current_datetime_str, current_user_id)
+@celery.task(name='app.prepare_capacity')
+def prepare_capacity_task():
+    prepared = prepare_capacity(datetime.utcnow())
+    app.logger.info(f"prepared capacity for {len(prepared)} release spikes")
 
 
-@celery.task(name='app.schedule_ticket')
-def create_ticket_schedule_task(booking_id, current_datetime_str, current_user_id):
-    app.logger.info(f"creating task: ticket for booking_id {booking_id}")
-    current_datetime = datetime.strptime(current_datetime_str, '%Y-%m-%d %H:%M:%S.%f')
-    app.logger.info(f"current_datetime: {current_datetime}")
-    booking = db.session.query(Booking).filter_by(id=booking_id).first()
-    app.logger.info(f"ticket for booking_id: {booking_id} will start on {booking.earliest_ticket_datetime}")
-    sleep_seconds = calculate_timedelta_in_seconds(booking.earliest_ticket_datetime, current_datetime)
-    app.logger.info(f"sleep seconds: {sleep_seconds}")
-    time.sleep(sleep_seconds)
-    start_ticket_swimming(booking_id, current_user_id)
+@celery.task(name='app.warm_browsers')
+def warm_browsers_task():
+    driver_pool.warm()
+
+
+@celery.task(name='app.execute_ticket', acks_late=True)
+def execute_ticket_task(booking_id, user_id, batch_id=None):
+    app.logger.info(f"executing ticket for booking_id {booking_id}, batch {batch_id}")
+    lease = acquire_execution_lease(booking_id, datetime.utcnow())
+    if lease is None:
+        app.logger.info(f"booking_id {booking_id} is already executing or executed, skipping duplicate delivery")
+        return
+    context = load_booking_context(booking_id)
+    offset_seconds = get_clock_offset(context.venue_url)
+    if batch_id is not None:
+        release = ReleaseBarrier(app.config["COORDINATOR_REDIS"], batch_id, offset_seconds)
+    else:
+        release = ReleaseGate(lease.release_at, offset_seconds)
+    user = db.session.query(User).filter_by(id=user_id).first()
+    try:
+        start_ticket(context, user, release, lease=lease)
+    except ExecutionLeaseLost as error:
+        app.logger.info(f"stopped executing booking_id {booking_id}: {error}")
+        return
+    except Exception:
+        complete_execution_lease(lease, "FAILED")
+        raise
+    complete_execution_lease(lease)
+
+
+@celery.task(name='app.run_ticket', acks_late=True)
+def run_ticket_task(ticket_id):
+    claimed = db.session.query(Ticket).filter_by(id=ticket_id, status="QUEUED") \
+        .update({"status": "STARTED", "updated_at": datetime.utcnow()}, synchronize_session=False)
+    db.session.commit()
+    if not claimed:
+        app.logger.info(f"ticket {ticket_id} is not queued, skipping")
+        return
+    ticket = db.session.query(Ticket).filter_by(id=ticket_id).first()
+    user = db.session.query(User).filter_by(id=ticket.user_id).first()
+    start_ticket(load_booking_context(ticket.booking_id), user, ticket=ticket)
 
 
 def calculate_earliest_ticket_datetime(booking):
-    result = db.session.query(Venue.venue_type).filter_by(id=booking.venue_id)
-    for venue_type, in result:
-        if venue_type == "bouldering":
-            delta = timedelta(days=7)
-            local = booking.datetime_event - delta
-            app.logger.info(f"venue_type: {venue_type}, timedelta: {delta}")
-            return local.astimezone(pytz.UTC)
-    delta = timedelta(hours=96)
-    local = booking.datetime_event - delta
-    app.logger.info(f"venue_type {venue_type}, timedelta: {delta}")
-    return local.astimezone(pytz.UTC)
+    venue_type = db.session.query(Venue.venue_type).filter_by(id=booking.venue_id).scalar()
+    return calculate_earliest_ticket_datetimes(venue_type, [booking.datetime_event])[0]
+
+
+def calculate_earliest_ticket_datetimes(venue_type, datetime_events):
+    delta = get_release_delta(venue_type)
+    app.logger.info(f"venue_type: {venue_type}, timedelta: {delta}")
+    return [(datetime_event - delta).astimezone(pytz.UTC) for datetime_event in datetime_events]
+
+
+def get_release_delta(venue_type):
+    return get_venue_adapter(venue_type).release_delta
 
 
 def calculate_timedelta_in_seconds(earliest_ticket_time, current_datetime):
@@ -411,143 +730,182 @@ def calculate_timedelta_in_seconds(earliest_ticket_time, current_datetime):
     return delta.total_seconds()
 
 
-def check_if_ticket_possible_now(booking_id, current_datetime):
-    booking = db.session.query(Booking).filter_by(id=booking_id).first()
-    possible_now = booking.earliest_ticket_datetime <= current_datetime
+def check_if_ticket_possible_now(context, current_datetime):
+    possible_now = context.earliest_ticket_datetime <= current_datetime
     if not possible_now:
-        app.logger.info(f"ticket for booking_id: {booking.id} not possible yet. scheduling for later...")
+        app.logger.info(f"ticket for booking_id: {context.booking_id} not possible yet. scheduling for later...")
     return possible_now
 
 
-def start_ticket_swimming(booking_id, current_user_id):
-    ticket = Ticket(booking_id, current_user.id)
-    db.session.add(ticket)
+def save_confirmation_code(context, confirmation_code, lease=None):
+    fence_execution_lease(lease, datetime.utcnow())
+    db.session.query(Booking).filter_by(id=context.booking_id).update({"confirmation_code": confirmation_code, "updated_at": datetime.utcnow()})
     db.session.commit()
 
-    app.logger.info(f"started ticket: id: {ticket.id}, booking_id: {booking_id}, user id: {current_user_id}")
 
-    driver = initialize_chrome_driver()
+@timed_step("driver_init")
+def initialize_chrome_driver():
+    chrome_options = build_chrome_options()
+    driver = webdriver.Chrome(executable_path=os.environ.get('CHROMEDRIVER_PATH'), chrome_options=chrome_options)
+    app.logger.info(f"initialized chrome driver")
+    return driver
 
-    try:
-        choose_ticket_slot_swimming(driver, booking_id)
-        apply_voucher(driver)
-        complete_checkout(driver, booking_id)
-    except NoSuchElementException:
-        app.logger.info("ticket slot not available, aborting")
-        ticket.status = "ABORTED"
-        db.session.commit()
-        return
 
-    booking = db.session.query(Booking).filter_by(id=booking_id).first()
-    booking.confirmation_code = get_confirmation_code(driver)
+ticket_event_hub = TicketEventHub(app.config["EVENTS_REDIS"], app.config["TICKET_EVENTS_CHANNEL"])
 
-    if booking.confirmation_code is not None and not "re_co":
-        ticket.status = "CONFIRMED"
-        db.session.commit()
-        download_pdf(driver, booking_id)
-        app.logger.info("pdf downloaded")
-    app.logger.info("an error occurred")
 
-    return ticket
+def create_driver_pool():
+    return DriverPool(initialize_chrome_driver, app.config["CHROME_POOL_SIZE"], app.config["CHROME_POOL_CHECKOUT_TIMEOUT"])
 
 
-def initialize_chrome_driver():
-    chrome_options = webdriver.ChromeOptions()
-    chrome_options.binary_location = os.environ.get("GOOGLE_CHROME_BIN")
-    chrome_options.add_argument("--headless")
-    chrome_options.add_argument("--disable-dev-shm-usage")
-    chrome_options.add_argument("--no-sandbox")
-    driver = webdriver.Chrome(executable_path=os.environ.get('CHROMEDRIVER_PATH'), chrome_options=chrome_options)
-    app.logger.info(f"initialized chrome driver")
-    return driver
+driver_pool = create_driver_pool()
+
+
+@worker_process_init.connect
+def warm_driver_pool(**kwargs):
+    if "browser" in get_consumed_queues():
+        start_warmup(driver_pool)
+
+
+@worker_ready.connect
+def warm_shared_driver_pool(sender=None, **kwargs):
+    if "browser" in get_consumed_queues() and not isinstance(sender.pool, PreforkPool):
+        start_warmup(driver_pool)
 
 
-def choose_ticket_slot_swimming(driver, booking_id):
-    datetime_selector = generate_datetime_selector(booking_id)
+@worker_ready.connect
+def advertise_browser_slots(sender=None, **kwargs):
+    if "browser" in get_consumed_queues():
+        start_slot_heartbeat(app.config["COORDINATOR_REDIS"], sender.hostname, sender.pool.limit)
+
+
+@worker_shutdown.connect
+def withdraw_browser_slots(sender=None, **kwargs):
+    if "browser" in get_consumed_queues():
+        unregister_browser_slots(app.config["COORDINATOR_REDIS"], sender.hostname)
+
+
+def get_consumed_queues():
+    return list(celery.amqp.queues.consume_from)
+
+
+@before_task_publish.connect
+def stamp_published_at(headers=None, **kwargs):
+    headers.setdefault("published_at", time.time())
+
+
+@task_prerun.connect
+def record_queue_latency(task=None, **kwargs):
+    observe_task_start(task)
+
+
+@worker_process_shutdown.connect
+@worker_shutdown.connect
+def close_driver_pool(**kwargs):
+    driver_pool.close()
+
+
+@timed_step("choose_ticket_slot")
+def choose_ticket_slot_swimming(driver, context):
+    datetime_selector = generate_datetime_selector(context)
     date_field = driver.find_element(By.CSS_SELECTOR, datetime_selector)
     date_field.click()
-    time.sleep(2)
+    wait_for(driver, "choose_ticket_slot_swimming", EC.element_to_be_clickable((By.ID, "voucher")))
     app.logger.info("ticket slot chosen")
 
 
-def open_venue_website(driver, booking_id):
-    booking_venue = db.session.query(Venue).join(Booking).filter_by(id=booking_id).first()
-    driver.get(booking_venue.venue_url)
+@timed_step("open_venue_website")
+def open_venue_website(driver, context):
+    apply_resource_rules(driver, context.venue_type)
+    driver.get(context.venue_url)
     app.logger.info("venue website opened")
 
 
-def generate_datetime_selector(booking_id):
-    booking = db.session.query(Booking).filter_by(id=booking_id).first()
-    result = db.session.query(Venue.venue_type).filter_by(id=booking.venue_id)
-    for venue_type, in result:
-        if venue_type == "bouldering":
-            return f"//div[normalize-space()='{booking.datetime_event.date().day}']"
-    return f".event-time[data-time='{booking.datetime_event.date()}T{booking.datetime_event.time()}+00:00']"
+def generate_datetime_selector(context):
+    return get_venue_adapter(context.venue_type).get_selector(
+        "date", day=context.datetime_event.date().day, slot_time=generate_slot_time(context.datetime_event))
+
 
+def generate_slot_time(datetime_event):
+    return f"{datetime_event.date()}T{datetime_event.time()}+00:00"
 
+
+@timed_step("apply_voucher")
 def apply_voucher(driver):
     voucher_field = driver.find_element(By.ID, "voucher")
     voucher_field.click()
-    voucher_field.send_keys("urbansportsclub")
+    voucher_field.send_keys(app.config["PRETIX_VOUCHER_CODE"])
 
     voucher_submit_button = driver.find_element(By.CSS_SELECTOR, "button[class='btn btn-block btn-primary']")
     voucher_submit_button.click()
 
     add_to_cart_button = driver.find_element(By.ID, "btn-add-to-cart")
     add_to_cart_button.click()
+    wait_for(driver, "apply_voucher", EC.staleness_of(add_to_cart_button))
     app.logger.info("voucher applied")
-    time.sleep(2)
 
 
-def complete_checkout(driver, booking_id):
-    venue_url = db.session.query(Venue.venue_url).join(Booking).filter_by(id=booking_id).first()[0]
-    checkout_url = f"{venue_url}checkout/customer/"
+@timed_step("complete_checkout")
+def complete_checkout(driver, context, user):
+    checkout_url = f"{context.venue_url}checkout/customer/"
     driver.get(checkout_url)
 
-    login_radio = driver.find_element(By.ID, "input_customer_login")
-    login_radio.click()
-    time.sleep(2)
+    if driver.find_elements(By.ID, "input_customer_login"):
+        login_radio = driver.find_element(By.ID, "input_customer_login")
+        login_radio.click()
+        wait_for(driver, "complete_checkout", EC.element_to_be_clickable((By.ID, "id_login-email")))
+        website_login(driver, user)
+        save_venue_cookies(user.id, context.venue_url, export_driver_cookies(driver, context.venue_url))
+    else:
+        app.logger.info("venue session still valid, skipping login")
 
-    website_login(driver)
+    confirm_customer_profile(driver)
 
     confirmation_checkbox = driver.find_element(By.ID, "input_confirm_confirm_text_0")
     confirmation_checkbox.click()
     confirmation_checkbox.send_keys(Keys.TAB)
     confirmation_checkbox.send_keys(Keys.ENTER)
+    wait_for(driver, "complete_checkout", EC.url_contains("/order/"))
     app.logger.info("checkout completed")
-    time.sleep(2)
 
 
-def website_login(driver):
+@timed_step("website_login")
+def website_login(driver, user):
     user_email = driver.find_element(By.ID, "id_login-email")
-    user_email.send_keys(current_user.venue_email)
+    user_email.send_keys(user.venue_email)
     user_password = driver.find_element(By.ID, "id_login-password")
-    user_password.send_keys(current_user.venue_password)
+    user_password.send_keys(user.venue_password)
     user_password.send_keys(Keys.TAB)
     user_password.send_keys(Keys.TAB)
     user_password.send_keys(Keys.TAB)
     user_password.send_keys(Keys.ENTER)
-    time.sleep(2)
+    wait_for(driver, "website_login", EC.element_to_be_clickable((By.CSS_SELECTOR, "input[type='checkbox']")))
+    app.logger.info("website login completed")
 
+
+def confirm_customer_profile(driver):
+    wait_for(driver, "confirm_customer_profile", EC.element_to_be_clickable((By.CSS_SELECTOR, "input[type='checkbox']")))
     checkbox_save = driver.find_element(By.CSS_SELECTOR, "input[type='checkbox']")
     checkbox_save.click()
     checkbox_save.send_keys(Keys.TAB)
     checkbox_save.send_keys(Keys.TAB)
     checkbox_save.send_keys(Keys.TAB)
     checkbox_save.send_keys(Keys.ENTER)
-    app.logger.info("website login completed")
-    time.sleep(2)
+    wait_for(driver, "confirm_customer_profile", EC.element_to_be_clickable((By.ID, "input_confirm_confirm_text_0")))
+    app.logger.info("customer profile confirmed")
 
 
 def get_confirmation_code(driver):
-    current_url = driver.current_url
-    confirmation_code = current_url[34:39]
+    confirmation_code = parse_confirmation_code(driver.current_url)
     app.logger.info(f"confirmation code generated")
     return confirmation_code
 
 
-def download_pdf(driver, booking_id):
+@timed_step("download_pdf")
+def download_pdf(driver, context):
+    download_dir = os.path.join(app.config["PDF_DOWNLOAD_DIR"], str(context.booking_id))
+    driver.execute_cdp_cmd("Page.setDownloadBehavior", {"behavior": "allow", "downloadPath": download_dir})
     pdf_download_button = driver.find_element(By.CSS_SELECTOR, "button[class='btn btn-sm btn-primary']")
     pdf_download_button.click()
-    time.sleep(8)
-    app.logger.info(f"downloaded PDF for booking {booking_id}")
+    wait_for(driver, "download_pdf", file_downloaded(download_dir, ".pdf"))
+    app.logger.info(f"downloaded PDF for booking {context.booking_id}")